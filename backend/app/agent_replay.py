@@ -0,0 +1,299 @@
+"""
+Record / replay of Bedrock agent streams and Lambda payloads.
+
+AGENT_CLIENT_MODE selects what _get_bedrock() / _get_lambda() hand out:
+
+  live    plain boto3 clients (default)
+  record  boto3 clients wrapped so every invoke_agent completion stream
+          (trace + chunk events with their arrival offsets) and every
+          lambda.invoke payload is written to AGENT_FIXTURE_DIR
+  replay  fixture-backed clients; no AWS calls. Streams are re-emitted with
+          the recorded inter-arrival gaps divided by AGENT_REPLAY_SPEED
+          (1 = real time, 10 = ten times faster, 0 = no delays)
+
+One JSON file per call, named by agent / function and a hash of the input.
+Replay looks up the exact input first; a prompt that was never recorded
+(different config, edited template) falls back to that agent's recordings
+in recorded order, so a fixture set from one run drives any pipeline config.
+"""
+import io
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+from app.config import (
+    AGENT_CLIENT_MODE,
+    AGENT_FIXTURE_DIR,
+    AGENT_REPLAY_SPEED,
+    PLANNER_AGENT_ID,
+    AYUSH_AGENT_ID,
+    ALLOPATHY_AGENT_ID,
+    REASONING_AGENT_ID,
+    RESEARCH_AGENT_ID,
+)
+
+logger = logging.getLogger(__name__)
+
+_AGENT_KEYS = {
+    PLANNER_AGENT_ID: "planner",
+    AYUSH_AGENT_ID: "ayush",
+    ALLOPATHY_AGENT_ID: "allopathy",
+    REASONING_AGENT_ID: "reasoning",
+    RESEARCH_AGENT_ID: "research",
+}
+
+
+def _input_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+# ──────────────────────────────────────────────────────────────
+# Fixture store
+# ──────────────────────────────────────────────────────────────
+
+class FixtureStore:
+    """Reads and writes per-call fixture files under one directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._by_input: dict = {}
+        self._by_target: dict = {}
+        self._cursor: dict = {}
+
+    def write(self, fixture: dict) -> str:
+        name = f"{fixture['kind']}-{fixture['target']}-{fixture['input_sha']}.json"
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(fixture, f, default=str)
+            os.replace(tmp, path)
+        logger.info(f"Recorded {fixture['kind']} fixture {name}")
+        return path
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        fixtures = []
+        if os.path.isdir(self.directory):
+            for name in sorted(os.listdir(self.directory)):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(self.directory, name)) as f:
+                        fixtures.append(json.load(f))
+                except (IOError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable fixture {name}: {e}")
+        fixtures.sort(key=lambda fx: fx.get("recorded_at", 0))
+        for fx in fixtures:
+            key = (fx["kind"], fx["target"])
+            self._by_input[key + (fx["input_sha"],)] = fx
+            self._by_target.setdefault(key, []).append(fx)
+        self._loaded = True
+        logger.info(f"Loaded {len(fixtures)} replay fixtures from {self.directory}")
+
+    def lookup(self, kind: str, target: str, input_text: str) -> Optional[dict]:
+        """Exact input match, else the next recording for this target (cycling)."""
+        with self._lock:
+            self._load()
+            fx = self._by_input.get((kind, target, _input_hash(input_text)))
+            if fx is not None:
+                return fx
+            candidates = self._by_target.get((kind, target))
+            if not candidates:
+                return None
+            idx = self._cursor.get((kind, target), 0)
+            self._cursor[(kind, target)] = idx + 1
+            fx = candidates[idx % len(candidates)]
+            logger.debug(f"No exact {kind} fixture for {target}; replaying {fx['input_sha']}")
+            return fx
+
+
+_stores: dict = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(directory: str = None) -> FixtureStore:
+    directory = os.path.abspath(directory or AGENT_FIXTURE_DIR)
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = FixtureStore(directory)
+        return _stores[directory]
+
+
+# ──────────────────────────────────────────────────────────────
+# Recording clients
+# ──────────────────────────────────────────────────────────────
+
+def _event_to_fixture(event: dict, offset: float) -> dict:
+    if "chunk" in event:
+        data = event["chunk"].get("bytes", b"")
+        text = data.decode("utf-8", errors="replace") if isinstance(data, bytes) else str(data)
+        return {"t": round(offset, 4), "chunk": text}
+    return {"t": round(offset, 4), **event}
+
+
+class RecordingBedrockClient:
+    """bedrock-agent-runtime client that records each completion stream it serves."""
+
+    def __init__(self, client, store: FixtureStore):
+        self._client = client
+        self._store = store
+
+    def invoke_agent(self, **kwargs):
+        start = time.perf_counter()
+        resp = self._client.invoke_agent(**kwargs)
+        first_byte = time.perf_counter() - start
+        resp = dict(resp)
+        resp["completion"] = self._record(resp["completion"], kwargs, start, first_byte)
+        return resp
+
+    def _record(self, completion, kwargs: dict, start: float, first_byte: float):
+        events = []
+        for event in completion:
+            events.append(_event_to_fixture(event, time.perf_counter() - start))
+            yield event
+        # Only complete streams are written; a consumer that bails out early leaves no fixture
+        input_text = kwargs.get("inputText", "")
+        self._store.write({
+            "kind": "agent",
+            "target": _AGENT_KEYS.get(kwargs.get("agentId"), kwargs.get("agentId", "unknown")),
+            "agent_id": kwargs.get("agentId"),
+            "input_sha": _input_hash(input_text),
+            "input_preview": input_text[:300],
+            "recorded_at": time.time(),
+            "first_byte": round(first_byte, 4),
+            "duration": round(time.perf_counter() - start, 4),
+            "events": events,
+        })
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class RecordingLambdaClient:
+    """Lambda client that records each synchronous invoke payload and response."""
+
+    def __init__(self, client, store: FixtureStore):
+        self._client = client
+        self._store = store
+
+    def invoke(self, **kwargs):
+        start = time.perf_counter()
+        resp = self._client.invoke(**kwargs)
+        body = resp["Payload"].read()
+        duration = time.perf_counter() - start
+        payload = kwargs.get("Payload", b"")
+        payload_text = payload.decode("utf-8") if isinstance(payload, bytes) else str(payload)
+        self._store.write({
+            "kind": "lambda",
+            "target": kwargs.get("FunctionName", "unknown"),
+            "input_sha": _input_hash(payload_text),
+            "input_preview": payload_text[:300],
+            "recorded_at": time.time(),
+            "duration": round(duration, 4),
+            "status_code": resp.get("StatusCode", 200),
+            "response": body.decode("utf-8", errors="replace"),
+        })
+        resp = dict(resp)
+        resp["Payload"] = io.BytesIO(body)
+        return resp
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# ──────────────────────────────────────────────────────────────
+# Replay clients
+# ──────────────────────────────────────────────────────────────
+
+def _sleep_until(start: float, offset: float, speed: float) -> None:
+    if speed <= 0:
+        return
+    delay = start + offset / speed - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+
+
+class ReplayBedrockClient:
+    """Serves invoke_agent from recorded fixtures with the recorded event timing."""
+
+    def __init__(self, store: FixtureStore, speed: float = None):
+        self._store = store
+        self.speed = AGENT_REPLAY_SPEED if speed is None else speed
+
+    def invoke_agent(self, **kwargs):
+        agent_id = kwargs.get("agentId", "")
+        target = _AGENT_KEYS.get(agent_id, agent_id)
+        fx = self._store.lookup("agent", target, kwargs.get("inputText", ""))
+        if fx is None:
+            raise RuntimeError(f"No replay fixture for agent '{target}' in {self._store.directory}")
+        start = time.perf_counter()
+        _sleep_until(start, fx.get("first_byte", 0.0), self.speed)
+        return {
+            "completion": self._stream(fx["events"], start),
+            "contentType": "application/json",
+            "sessionId": kwargs.get("sessionId", ""),
+        }
+
+    def _stream(self, events: list, start: float):
+        for ev in events:
+            _sleep_until(start, ev.get("t", 0.0), self.speed)
+            if "chunk" in ev:
+                yield {"chunk": {"bytes": ev["chunk"].encode("utf-8")}}
+            else:
+                yield {k: v for k, v in ev.items() if k != "t"}
+
+
+class ReplayLambdaClient:
+    """Serves lambda.invoke from recorded fixtures after the recorded duration."""
+
+    def __init__(self, store: FixtureStore, speed: float = None):
+        self._store = store
+        self.speed = AGENT_REPLAY_SPEED if speed is None else speed
+
+    def invoke(self, **kwargs):
+        function = kwargs.get("FunctionName", "unknown")
+        payload = kwargs.get("Payload", b"")
+        payload_text = payload.decode("utf-8") if isinstance(payload, bytes) else str(payload)
+        fx = self._store.lookup("lambda", function, payload_text)
+        if fx is None:
+            raise RuntimeError(f"No replay fixture for Lambda '{function}' in {self._store.directory}")
+        _sleep_until(time.perf_counter(), fx.get("duration", 0.0), self.speed)
+        return {
+            "StatusCode": fx.get("status_code", 200),
+            "Payload": io.BytesIO(fx["response"].encode("utf-8")),
+        }
+
+
+# ──────────────────────────────────────────────────────────────
+# Client factories
+# ──────────────────────────────────────────────────────────────
+
+def bedrock_client(factory, mode: str = None):
+    """bedrock-agent-runtime client for the configured mode; factory builds the boto3 client."""
+    mode = mode or AGENT_CLIENT_MODE
+    if mode == "replay":
+        return ReplayBedrockClient(get_store())
+    client = factory()
+    if mode == "record":
+        return RecordingBedrockClient(client, get_store())
+    return client
+
+
+def lambda_client(factory, mode: str = None):
+    """Lambda client for the configured mode; factory builds the boto3 client."""
+    mode = mode or AGENT_CLIENT_MODE
+    if mode == "replay":
+        return ReplayLambdaClient(get_store())
+    client = factory()
+    if mode == "record":
+        return RecordingLambdaClient(client, get_store())
+    return client
@@ -18,6 +18,7 @@ import uuid
 import time
 import logging
 import threading
+from collections import OrderedDict
 from urllib.parse import quote
 from typing import Generator, Tuple, Any, List, Optional
 
@@ -38,6 +39,21 @@ from app.config import (
     AGENT_RETRY_BASE_WAIT,
     INPUT_MAX_LENGTH,
     INPUT_MIN_LENGTH,
+    PROPOSER_CACHE_ENABLED,
+    PROPOSER_CACHE_TTL_SECONDS,
+    PROPOSER_CACHE_MAX_ENTRIES,
+    MAX_REASONING_SOURCES,
+    MAX_RESULT_SOURCES,
+    REASONING_TOOLS_MODE,
+    REASONING_TOOLS_LAMBDA,
+    REASONING_EVIDENCE_PACKING,
+    REASONING_EVIDENCE_TOKEN_BUDGET,
+    REASONING_INCREMENTAL,
+    SPECULATIVE_PROPOSERS,
+    PIPELINED_EVALUATOR,
+    REASONING_STREAM_DELTAS,
+    PRE_EVAL_ENABLED,
+    PRE_EVAL_MAX_RERUNS,
 )
 from app.cloudwatch_logger import (
     log_pipeline_start,
@@ -46,6 +62,20 @@ from app.cloudwatch_logger import (
     log_agent_trace,
     log_iteration_gap,
 )
+from app.db import lookup_agent_output, save_agent_output
+from app.sources import extract_sources, normalize_sources, format_sources_for_prompt
+from app.evidence import (
+    MATERIAL_FACT_TYPES,
+    extract_facts, source_facts, pack_evidence, summarize_facts, dedupe_facts,
+    diff_facts, fingerprint_facts, compact_analysis, prescore_facts, cyp_effects,
+    phytochemical_names, estimate_tokens, legacy_prompt_tokens,
+)
+from app import reasoning_tools
+from app import agent_replay
+from app import instrumentation
+from app import hedging
+from app import checkpoints
+from app.json_stream import JSONFieldStream
 
 logger = logging.getLogger(__name__)
 
@@ -67,16 +97,18 @@ _BOTO_CONFIG = Config(
 def _get_bedrock():
     global _bedrock_runtime
     if _bedrock_runtime is None:
-        _bedrock_runtime = boto3.client(
+        _bedrock_runtime = agent_replay.bedrock_client(lambda: boto3.client(
             "bedrock-agent-runtime", region_name=REGION, config=_BOTO_CONFIG
-        )
+        ))
     return _bedrock_runtime
 
 
 def _get_lambda():
     global _lambda_client
     if _lambda_client is None:
-        _lambda_client = boto3.client("lambda", region_name=REGION)
+        _lambda_client = agent_replay.lambda_client(
+            lambda: boto3.client("lambda", region_name=REGION)
+        )
     return _lambda_client
 
 
@@ -197,12 +229,42 @@ def resolve_and_validate_ayush_drug(
 # Agent Trace Parsing
 # ──────────────────────────────────────────────────────────────
 
+# Trace types run_comas_pipeline reads itself, built at every verbosity so
+# the result never depends on the client's display preference: the
+# "message" / "response" / "_full_result" text of thinking, tool_call,
+# tool_result and agent_complete traces is scanned for DrugBank URLs and
+# sources, and model_output carries token usage. Only model_input (a fixed
+# message plus a prompt preview) is left out.
+_PIPELINE_TRACE_TYPES = frozenset({"thinking", "tool_call", "tool_result", "agent_complete", "model_output"})
+
+# Client verbosity -> trace types streamed to it. "full" streams everything;
+# "status" adds pipeline_status events; "result_only" sends only done / error.
+# The server's pipeline runs at full and /ws/{session_id} filters per client
+# (verbosity_allows); run_check(verbosity=...) callers that consume the
+# events directly skip building the agent trace types they would drop.
+VERBOSITY_TRACE_TYPES = {
+    "status": frozenset({"agent_complete"}),
+    "result_only": frozenset(),
+}
+
+
+def verbosity_allows(verbosity: str, event_type: str, data) -> bool:
+    """Whether a client at `verbosity` receives this event; unknown values mean full."""
+    trace_types = VERBOSITY_TRACE_TYPES.get(verbosity)
+    if trace_types is None:
+        return True
+    return event_type in ("done", "error") \
+        or (event_type == "pipeline_status" and verbosity == "status") \
+        or (event_type == "trace" and isinstance(data, dict) and data.get("type") in trace_types)
+
+
 def _parse_trace(trace_event: dict, agent_label: str,
-                 _pending_fn: list = None) -> dict:
+                 _pending_fn: list = None, want: Optional[frozenset] = None) -> dict:
     """Extract a human-readable trace log entry from a Bedrock trace event.
 
     _pending_fn is an optional single-element list used to correlate the most
-    recent tool call function name with the subsequent tool result.
+    recent tool call function name with the subsequent tool result. With
+    want, only those trace types are built; None builds every type.
     """
     outer = trace_event.get("trace", {})
     trace = outer.get("trace", outer)
@@ -210,10 +272,14 @@ def _parse_trace(trace_event: dict, agent_label: str,
     orchestration = trace.get("orchestrationTrace", {})
     if orchestration:
         if "rationale" in orchestration:
+            if want is not None and "thinking" not in want:
+                return None
             text = orchestration["rationale"].get("text", "")[:500]
             return {"type": "thinking", "agent": agent_label, "message": text}
 
         if "modelInvocationInput" in orchestration:
+            if want is not None and "model_input" not in want:
+                return None
             inv_input = orchestration["modelInvocationInput"]
             text = inv_input.get("text", "")
             return {
@@ -224,6 +290,8 @@ def _parse_trace(trace_event: dict, agent_label: str,
             }
 
         if "modelInvocationOutput" in orchestration:
+            if want is not None and "model_output" not in want:
+                return None
             out = orchestration["modelInvocationOutput"]
             usage = out.get("metadata", {}).get("usage", {})
             return {
@@ -241,10 +309,12 @@ def _parse_trace(trace_event: dict, agent_label: str,
             ag = inv.get("actionGroupInvocationInput", {})
             if ag:
                 func = ag.get("function", "")
-                group = ag.get("actionGroupName", "")
-                params = {p["name"]: p["value"] for p in ag.get("parameters", [])}
                 if _pending_fn is not None:
                     _pending_fn[:] = [func]
+                if want is not None and "tool_call" not in want:
+                    return None
+                group = ag.get("actionGroupName", "")
+                params = {p["name"]: p["value"] for p in ag.get("parameters", [])}
                 return {
                     "type": "tool_call",
                     "agent": agent_label,
@@ -257,10 +327,12 @@ def _parse_trace(trace_event: dict, agent_label: str,
             obs = orchestration["observation"]
             ag_obs = obs.get("actionGroupInvocationOutput", {})
             if ag_obs:
-                full_text = ag_obs.get("text", "")
                 fn_name = _pending_fn[0] if _pending_fn else ""
                 if _pending_fn:
                     _pending_fn[:] = []
+                if want is not None and "tool_result" not in want:
+                    return None
+                full_text = ag_obs.get("text", "")
                 return {
                     "type": "tool_result",
                     "agent": agent_label,
@@ -271,6 +343,8 @@ def _parse_trace(trace_event: dict, agent_label: str,
 
             final_resp = obs.get("finalResponse", {})
             if final_resp:
+                if want is not None and "agent_complete" not in want:
+                    return None
                 text = final_resp.get("text", "")
                 return {
                     "type": "agent_complete",
@@ -287,38 +361,75 @@ def _parse_trace(trace_event: dict, agent_label: str,
 # ──────────────────────────────────────────────────────────────
 
 def _invoke_agent(agent_key: str, input_text: str, session_id: str,
-                  yield_traces: bool = True) -> Generator:
+                  yield_traces=True,
+                  cancel_event: Optional[threading.Event] = None,
+                  agent_session_id: Optional[str] = None,
+                  stream_chunks: bool = False) -> Generator:
     """Invoke a Bedrock agent and yield trace events + final response.
 
     Yields tuples of (event_type, data):
       ("trace", trace_dict)
+      ("chunk", text)          only with stream_chunks, as each chunk arrives
+      ("chunk_reset", {})      a retry discarded the chunks streamed so far
       ("response", response_text)
       ("error", error_dict)
+
+    yield_traces is True (every trace), False (none) or a set of trace types:
+    only those are parsed and yielded.
+
+    Setting cancel_event stops reading the stream (and any retry wait) and
+    yields ("error", {"code": "Cancelled", ...}). agent_session_id overrides
+    the Bedrock session (hedged duplicates); timings still go to session_id.
     """
     agent = AGENTS[agent_key]
     _pending_fn = []
+    want = None if isinstance(yield_traces, bool) else frozenset(yield_traces)
+    start = time.perf_counter()
+    invoke_kwargs = {}
+    if stream_chunks:
+        invoke_kwargs["streamingConfigurations"] = {"streamFinalResponse": True}
+    streamed = False
 
     for attempt in range(AGENT_INVOKE_MAX_RETRIES + 1):
+        if streamed:
+            streamed = False
+            yield ("chunk_reset", {})
         try:
             resp = _get_bedrock().invoke_agent(
                 agentId=agent["id"],
                 agentAliasId=agent["alias"],
-                sessionId=session_id,
+                sessionId=agent_session_id or session_id,
                 inputText=input_text,
                 enableTrace=True,
+                **invoke_kwargs,
             )
 
             full_response = ""
             for event in resp["completion"]:
+                if cancel_event is not None and cancel_event.is_set():
+                    close = getattr(resp["completion"], "close", None)
+                    if close is not None:
+                        close()
+                    instrumentation.record_phase(session_id, agent_key, time.perf_counter() - start,
+                                                 attempts=attempt + 1, error="Cancelled")
+                    yield ("error", {"message": f"{agent_key} agent cancelled", "code": "Cancelled"})
+                    return
                 if "trace" in event:
-                    parsed = _parse_trace(event, agent["label"], _pending_fn)
+                    parsed = _parse_trace(event, agent["label"], _pending_fn, want)
+                    if parsed and parsed.get("type") == "model_output":
+                        instrumentation.record_tokens(session_id, agent_key, parsed.get("tokens"))
                     if parsed and yield_traces:
                         yield ("trace", parsed)
 
                 if "chunk" in event:
                     chunk = event["chunk"].get("bytes", b"").decode("utf-8", errors="replace")
                     full_response += chunk
+                    if stream_chunks and chunk:
+                        streamed = True
+                        yield ("chunk", chunk)
 
+            elapsed = time.perf_counter() - start
+            instrumentation.record_phase(session_id, agent_key, elapsed, attempts=attempt + 1)
             yield ("response", full_response)
             return
 
@@ -329,21 +440,37 @@ def _invoke_agent(agent_key: str, input_text: str, session_id: str,
             ):
                 wait = AGENT_RETRY_BASE_WAIT * (2 ** attempt)
                 logger.warning(f"{agent_key} throttled, retry {attempt+1} in {wait}s")
-                time.sleep(wait)
+                instrumentation.record_retry(session_id, agent_key, err_code == "ThrottlingException")
+                if err_code == "ThrottlingException":
+                    hedging.note_throttle()
+                if cancel_event is not None:
+                    if cancel_event.wait(wait):
+                        yield ("error", {"message": f"{agent_key} agent cancelled", "code": "Cancelled"})
+                        return
+                else:
+                    time.sleep(wait)
                 continue
+            instrumentation.record_phase(session_id, agent_key, time.perf_counter() - start,
+                                         attempts=attempt + 1, error=err_code)
             yield ("error", {"message": f"{agent_key} agent error: {str(e)}", "code": err_code})
             return
         except Exception as e:
             logger.exception(f"Unexpected error invoking {agent_key}")
+            instrumentation.record_phase(session_id, agent_key, time.perf_counter() - start,
+                                         attempts=attempt + 1, error=type(e).__name__)
             yield ("error", {"message": str(e)})
             return
 
 
-def _invoke_agent_collect(agent_key: str, input_text: str, session_id: str) -> Tuple[str, List]:
+def _invoke_agent_collect(agent_key: str, input_text: str, session_id: str,
+                          cancel_event: Optional[threading.Event] = None,
+                          agent_session_id: Optional[str] = None,
+                          yield_traces=True) -> Tuple[str, List]:
     """Invoke agent, collect all traces and the final response text."""
     traces = []
     response = ""
-    for event_type, data in _invoke_agent(agent_key, input_text, session_id):
+    for event_type, data in _invoke_agent(agent_key, input_text, session_id, yield_traces=yield_traces,
+                                          cancel_event=cancel_event, agent_session_id=agent_session_id):
         if event_type == "trace":
             traces.append(data)
         elif event_type == "response":
@@ -381,7 +508,7 @@ def _parse_planner_output(planner_response: str) -> dict:
 
 def _parse_reasoning_output(reasoning_response: str, compile_result: dict = None) -> dict:
     """Parse reasoning agent output or use the compile_and_validate_output result."""
-    # If orchestrator directly called compile lambda, use that result
+    # If orchestrator ran compile_and_validate_output, use that result
     if compile_result and isinstance(compile_result, dict):
         output_str = compile_result.get("output_str", "")
         if output_str:
@@ -439,57 +566,6 @@ def _extract_drugbank_url(traces: list, response_text: str = "") -> str:
     return ""
 
 
-def _extract_source_urls(traces: list, response_text: str = "") -> list:
-    """Extract source URLs from agent traces and response text."""
-    url_re = re.compile(
-        r'https?://(?:pubmed\.ncbi\.nlm\.nih\.gov|'
-        r'www\.ncbi\.nlm\.nih\.gov/(?:pubmed|pmc)|'
-        r'(?:go\.)?drugbank\.com|'
-        r'cb\.imsc\.res\.in/imppat|'
-        r'examine\.com|'
-        r'scholar\.google\.com|'
-        r'clinicaltrials\.gov|'
-        r'www\.webmd\.com|'
-        r'www\.drugs\.com|'
-        r'doi\.org)'
-        r'[^\s"\',<>)\]]*'
-    )
-
-    seen = set()
-    sources = []
-
-    all_text = response_text or ""
-    for trace in traces:
-        for field in ("_full_result", "message", "response"):
-            text = trace.get(field, "")
-            if text:
-                all_text += "\n" + text
-
-    for match in url_re.finditer(all_text):
-        url = match.group(0).rstrip(".")
-        if url not in seen:
-            seen.add(url)
-            source_type = "research"
-            if "pubmed" in url or "ncbi" in url or "pmc" in url:
-                source_type = "PubMed"
-            elif "drugbank" in url:
-                source_type = "DrugBank"
-            elif "imppat" in url or "imsc.res.in" in url:
-                source_type = "IMPPAT"
-            elif "clinicaltrials" in url:
-                source_type = "ClinicalTrials"
-            elif "doi.org" in url:
-                source_type = "DOI"
-            sources.append({
-                "url": url,
-                "title": "",
-                "snippet": "",
-                "source_type": source_type,
-            })
-
-    return sources
-
-
 def _extract_allopathy_info(traces: list, allopathy_response: str) -> dict:
     """Extract allopathy drug info from agent traces and response."""
     drugbank_url = _extract_drugbank_url(traces, allopathy_response)
@@ -960,9 +1036,58 @@ def _format_final_json(
 
 
 # ──────────────────────────────────────────────────────────────
-# Lambda direct invocation for compile step
+# Reasoning tools: severity + compile (in-process or Lambda)
 # ──────────────────────────────────────────────────────────────
 
+def _call_compile(
+    ayush_name: str,
+    allopathy_name: str,
+    severity_result: dict,
+    knowledge_graph: dict,
+    analysis_data: dict,
+) -> dict:
+    """Assemble the final JSON via compile_and_validate_output.
+
+    Runs in-process unless REASONING_TOOLS_MODE=remote or reasoning_core
+    cannot be imported, in which case the reasoning_tools Lambda is invoked.
+    An in-process exception also falls back to the Lambda.
+    """
+    start = time.perf_counter()
+    result, mode = None, "remote"
+    if REASONING_TOOLS_MODE != "remote":
+        try:
+            result = reasoning_tools.compile_and_validate_output(
+                ayush_name, allopathy_name, severity_result, knowledge_graph, analysis_data,
+            )
+            mode = "local"
+        except Exception as e:
+            logger.error(f"In-process compile failed, falling back to the Lambda: {e}")
+            result = None
+    if result is None:
+        result = _call_compile_lambda(
+            ayush_name, allopathy_name, severity_result, knowledge_graph, analysis_data,
+        )
+    logger.info(f"compile_and_validate_output ({mode}) took {(time.perf_counter() - start) * 1000:.1f} ms")
+    return result
+
+
+def _call_severity(interactions_data_str: str, allopathy_name: str) -> dict:
+    """calculate_severity, in-process unless REASONING_TOOLS_MODE=remote (Lambda on failure)."""
+    start = time.perf_counter()
+    result, mode = None, "remote"
+    if REASONING_TOOLS_MODE != "remote":
+        try:
+            result = reasoning_tools.calculate_severity(interactions_data_str, allopathy_name)
+            mode = "local"
+        except Exception as e:
+            logger.error(f"In-process severity calculation failed, falling back to the Lambda: {e}")
+            result = None
+    if result is None:
+        result = _call_severity_lambda(interactions_data_str, allopathy_name)
+    logger.info(f"calculate_severity ({mode}) took {(time.perf_counter() - start) * 1000:.1f} ms")
+    return result
+
+
 def _call_compile_lambda(
     ayush_name: str,
     allopathy_name: str,
@@ -972,46 +1097,22 @@ def _call_compile_lambda(
 ) -> dict:
     """Directly invoke the compile_and_validate_output Lambda function."""
     try:
-        import json as _json
-
         payload = {
             "function": "compile_and_validate_output",
             "actionGroup": "reasoning_tools",
             "parameters": [
                 {"name": "ayush_name", "value": ayush_name},
                 {"name": "allopathy_name", "value": allopathy_name},
-                {"name": "severity_result_str", "value": _json.dumps(severity_result)},
-                {"name": "knowledge_graph_str", "value": _json.dumps(knowledge_graph)},
-                {"name": "analysis_data_str", "value": _json.dumps(analysis_data)},
+                {"name": "severity_result_str", "value": json.dumps(severity_result)},
+                {"name": "knowledge_graph_str", "value": json.dumps(knowledge_graph)},
+                {"name": "analysis_data_str", "value": json.dumps(analysis_data)},
             ],
         }
-
-        lambda_fn = "ausadhi-reasoning-tools"
-        response = _get_lambda().invoke(
-            FunctionName=lambda_fn,
-            InvocationType="RequestResponse",
-            Payload=_json.dumps(payload).encode(),
-        )
-        result_raw = response["Payload"].read().decode("utf-8")
-        outer = _json.loads(result_raw)
+        outer = _invoke_reasoning_tools_lambda(payload)
         logger.info(f"compile_lambda outer keys: {list(outer.keys()) if isinstance(outer, dict) else 'not dict'}")
-
-        # Lambda returns Bedrock Action Group format:
-        # {"messageVersion": "1.0", "response": {"functionResponse": {"responseBody": {"TEXT": {"body": "..."}}}}}
-        body_str = (
-            outer.get("response", {})
-                 .get("functionResponse", {})
-                 .get("responseBody", {})
-                 .get("TEXT", {})
-                 .get("body", "")
-        )
-        if body_str:
-            result = _json.loads(body_str)
-            logger.info(f"compile_lambda result keys: {list(result.keys()) if isinstance(result, dict) else 'not dict'}")
-            return result
-
-        # Fallback: maybe direct response (older Lambda format)
-        return outer
+        result = _unwrap_action_group_response(outer)
+        logger.info(f"compile_lambda result keys: {list(result.keys()) if isinstance(result, dict) else 'not dict'}")
+        return result
     except Exception as e:
         logger.error(f"Failed to call compile Lambda: {e}")
         return {}
@@ -1028,28 +1129,39 @@ def _call_severity_lambda(interactions_data_str: str, allopathy_name: str) -> di
                 {"name": "allopathy_name", "value": allopathy_name},
             ],
         }
-        response = _get_lambda().invoke(
-            FunctionName="ausadhi-reasoning-tools",
-            InvocationType="RequestResponse",
-            Payload=json.dumps(payload).encode(),
-        )
-        result_raw = response["Payload"].read().decode("utf-8")
-        outer = json.loads(result_raw)
-        body_str = (
-            outer.get("response", {})
-                 .get("functionResponse", {})
-                 .get("responseBody", {})
-                 .get("TEXT", {})
-                 .get("body", "")
-        )
-        if body_str:
-            return json.loads(body_str)
-        return outer
+        return _unwrap_action_group_response(_invoke_reasoning_tools_lambda(payload))
     except Exception as e:
         logger.error(f"Failed to call severity Lambda: {e}")
         return {}
 
 
+def _invoke_reasoning_tools_lambda(payload: dict) -> dict:
+    response = _get_lambda().invoke(
+        FunctionName=REASONING_TOOLS_LAMBDA,
+        InvocationType="RequestResponse",
+        Payload=json.dumps(payload).encode(),
+    )
+    return json.loads(response["Payload"].read().decode("utf-8"))
+
+
+def _unwrap_action_group_response(outer: dict) -> dict:
+    """Pull the result out of the Bedrock Action Group envelope.
+
+    {"messageVersion": "1.0", "response": {"functionResponse": {"responseBody": {"TEXT": {"body": "..."}}}}}
+    """
+    body_str = (
+        outer.get("response", {})
+             .get("functionResponse", {})
+             .get("responseBody", {})
+             .get("TEXT", {})
+             .get("body", "")
+    )
+    if body_str:
+        return json.loads(body_str)
+    # Fallback: maybe direct response (older Lambda format)
+    return outer
+
+
 # ──────────────────────────────────────────────────────────────
 # Reasoning Agent invocation with compile step
 # ──────────────────────────────────────────────────────────────
@@ -1062,7 +1174,7 @@ def _invoke_reasoning_with_compile(
     imppat_url: str,
     allopathy_traces: list,
 ) -> Tuple[dict, list]:
-    """Invoke Reasoning agent, capture tool results, then call compile Lambda directly.
+    """Invoke Reasoning agent, capture tool results, then compile the final JSON.
 
     Returns: (final_output_dict, all_traces)
     """
@@ -1115,14 +1227,15 @@ def _invoke_reasoning_with_compile(
     if drugbank_url:
         analysis_data.setdefault("drugbank_url", drugbank_url)
 
-    # Call compile Lambda directly to assemble final JSON
-    compile_result = _call_compile_lambda(
-        ayush_name=ayush_name,
-        allopathy_name=allopathy_name,
-        severity_result=severity_result,
-        knowledge_graph=knowledge_graph,
-        analysis_data=analysis_data,
-    )
+    # Assemble final JSON deterministically
+    with instrumentation.phase(session_id, "compile"):
+        compile_result = _call_compile(
+            ayush_name=ayush_name,
+            allopathy_name=allopathy_name,
+            severity_result=severity_result,
+            knowledge_graph=knowledge_graph,
+            analysis_data=analysis_data,
+        )
 
     # Parse the compiled output
     final_output = _parse_reasoning_output(reasoning_response, compile_result)
@@ -1139,21 +1252,300 @@ def _invoke_reasoning_with_compile(
     return final_output, all_traces
 
 
+# ──────────────────────────────────────────────────────────────
+# Proposer prompts (iteration 1 and gap-driven re-runs)
+# ──────────────────────────────────────────────────────────────
+
+_PROPOSER_KEYS = ("ayush", "allopathy", "research")
+
+
+def _initial_proposer_prompt(agent_key: str, scientific_name: str, allopathy_name: str,
+                             imppat_url: str) -> str:
+    """Iteration-1 proposer prompt; independent of the plan."""
+    if agent_key == "ayush":
+        return (
+            f"Get comprehensive phytochemical data for {scientific_name}. "
+            f"Include IMPPAT data, CYP enzyme interactions, and key bioactive compounds. "
+            f"IMPPAT URL: {imppat_url}"
+        )
+    if agent_key == "allopathy":
+        return (
+            f"Get comprehensive data for {allopathy_name}. "
+            f"Include CYP metabolism pathways, NTI status, mechanism of action. "
+            f"Search DrugBank (domain: drugbank) for the drug page URL."
+        )
+    return (
+        f"Search for clinical evidence of interactions between {scientific_name} "
+        f"and {allopathy_name}. "
+        f"Find PubMed articles, clinical trials, and pharmacological studies."
+    )
+
+
+# Gap keywords routed to each proposer
+_PROPOSER_GAP_KEYWORDS = {
+    "ayush": ["phytochemical", "ayush", "cyp enzyme effect", "admet"],
+    "allopathy": ["allopathy", "severity", "metabolism", "nti", "cyp"],
+    "research": ["source", "evidence", "research", "pubmed", "clinical", "mechanism", "reasoning"],
+}
+
+
+def _proposers_for_gaps(gaps: list) -> List[str]:
+    """Proposers whose gap keywords match at least one of `gaps`."""
+    return [
+        key for key, keywords in _PROPOSER_GAP_KEYWORDS.items()
+        if any(kw in g.lower() for g in gaps for kw in keywords)
+    ]
+
+
+def _targeted_proposer_prompt(
+    agent_key: str,
+    gaps: list,
+    iteration: int,
+    scientific_name: str,
+    allopathy_name: str,
+    imppat_url: str,
+) -> str:
+    """TARGETED SEARCH prompt focusing one proposer on the gaps it can fill."""
+    agent_gaps = [g for g in gaps if any(kw in g.lower() for kw in _PROPOSER_GAP_KEYWORDS[agent_key])]
+    if agent_key == "ayush":
+        gap_detail = "; ".join(agent_gaps) if agent_gaps else "more detailed CYP enzyme interaction data"
+        return (
+            f"TARGETED SEARCH (iteration {iteration}): Previous analysis had gaps. "
+            f"Focus on: {gap_detail}. "
+            f"Get specific phytochemicals from {scientific_name} and their exact effects "
+            f"on CYP450 enzymes (inhibition/induction). Include ADMET properties. "
+            f"IMPPAT URL: {imppat_url}"
+        )
+    if agent_key == "allopathy":
+        gap_detail = "; ".join(agent_gaps) if agent_gaps else "more detailed CYP metabolism data"
+        return (
+            f"TARGETED SEARCH (iteration {iteration}): Previous analysis had gaps. "
+            f"Focus on: {gap_detail}. "
+            f"Get specific CYP450 metabolism pathways for {allopathy_name}, NTI status, "
+            f"and ADMET properties. "
+            f"Search DrugBank (domain: drugbank) for the drug page URL."
+        )
+    gap_detail = "; ".join(agent_gaps) if agent_gaps else "clinical interaction evidence and PubMed sources"
+    return (
+        f"TARGETED SEARCH (iteration {iteration}): Previous analysis had gaps. "
+        f"Focus on: {gap_detail}. "
+        f"Search PubMed and clinical databases for specific interaction evidence "
+        f"between {scientific_name} and {allopathy_name}. "
+        f"Provide URLs and detailed findings."
+    )
+
+
+# ──────────────────────────────────────────────────────────────
+# Proposer output cache (cross-session)
+# ──────────────────────────────────────────────────────────────
+#
+# AYUSH output depends only on the scientific name and Allopathy output only on
+# the drug, so iteration-1 results are reused across every pairing. Entries live
+# in process memory and in PostgreSQL (agent_output_cache) so they survive
+# restarts and are shared between workers.
+
+_CACHEABLE_PROPOSERS = ("ayush", "allopathy")
+_CACHED_TRACE_TYPES = ("tool_result", "agent_complete")
+_CACHED_TRACE_TEXT_LIMIT = 8000
+
+# (agent_key, cache_key) -> entry, least recently used first
+_proposer_cache: OrderedDict = OrderedDict()
+_proposer_cache_lock = threading.Lock()
+
+
+def _proposer_cache_key(name: str) -> str:
+    """Normalize a drug / scientific name for cache lookups."""
+    return " ".join((name or "").lower().split())
+
+
+def _summarize_traces(traces: list) -> list:
+    """Keep only the trace fields needed to re-derive URLs and sources later."""
+    summary = []
+    for trace in traces:
+        if trace.get("type") not in _CACHED_TRACE_TYPES:
+            continue
+        summary.append({
+            "type": trace.get("type"),
+            "agent": trace.get("agent", ""),
+            "message": trace.get("message", "")[:300],
+            "_fn": trace.get("_fn", ""),
+            "_full_result": trace.get("_full_result", "")[:_CACHED_TRACE_TEXT_LIMIT],
+            "response": trace.get("response", "")[:_CACHED_TRACE_TEXT_LIMIT],
+        })
+    return summary
+
+
+def _get_cached_proposer(agent_key: str, name: str) -> Optional[dict]:
+    """Return a cached proposer entry {response, source_url, traces} or None."""
+    if not PROPOSER_CACHE_ENABLED or agent_key not in _CACHEABLE_PROPOSERS:
+        return None
+    cache_key = _proposer_cache_key(name)
+    if not cache_key:
+        return None
+
+    now = time.time()
+    with _proposer_cache_lock:
+        entry = _proposer_cache.get((agent_key, cache_key))
+        if entry and entry["expires_at"] > now:
+            _proposer_cache.move_to_end((agent_key, cache_key))
+            return entry
+        _proposer_cache.pop((agent_key, cache_key), None)
+
+    try:
+        row = lookup_agent_output(agent_key, cache_key)
+    except Exception as e:
+        logger.warning(f"Proposer cache lookup failed for {agent_key}/{cache_key}: {e}")
+        return None
+    if not row or not row.get("response_text"):
+        return None
+
+    expires_at = row.get("expires_at")
+    entry = {
+        "response": row["response_text"],
+        "source_url": row.get("source_url") or "",
+        "traces": row.get("traces_summary") or [],
+        "expires_at": expires_at.timestamp() if hasattr(expires_at, "timestamp")
+        else now + PROPOSER_CACHE_TTL_SECONDS,
+    }
+    _remember_proposer((agent_key, cache_key), entry)
+    return entry
+
+
+def _remember_proposer(key: tuple, entry: dict) -> None:
+    """Insert into the in-memory cache, sweeping expired entries first.
+
+    Beyond PROPOSER_CACHE_MAX_ENTRIES the least recently used entries go;
+    PostgreSQL still has them for the next lookup.
+    """
+    now = time.time()
+    with _proposer_cache_lock:
+        for stale in [k for k, e in _proposer_cache.items() if e["expires_at"] <= now]:
+            del _proposer_cache[stale]
+        _proposer_cache[key] = entry
+        _proposer_cache.move_to_end(key)
+        while len(_proposer_cache) > PROPOSER_CACHE_MAX_ENTRIES:
+            _proposer_cache.popitem(last=False)
+
+
+def _cached_proposer_response(agent_key: str, entry: dict) -> str:
+    """The cached response, with its DrugBank / IMPPAT URL appended when the text lacks it."""
+    response, url = entry["response"], entry.get("source_url", "")
+    if url and url not in response:
+        label = "DrugBank URL" if agent_key == "allopathy" else "IMPPAT URL"
+        response = f"{response}\n\n{label}: {url}"
+    return response
+
+
+def _put_cached_proposer(agent_key: str, name: str, response: str, traces: list) -> None:
+    """Store a substantive iteration-1 proposer output in memory and PostgreSQL.
+
+    Refusals, "no data found" replies and error text would be served to
+    every later pair with the drug, so only an output with a DrugBank /
+    IMPPAT URL or material facts (see evidence.MATERIAL_FACT_TYPES) is kept.
+    """
+    if not PROPOSER_CACHE_ENABLED or agent_key not in _CACHEABLE_PROPOSERS:
+        return
+    cache_key = _proposer_cache_key(name)
+    if not cache_key or not response:
+        return
+
+    if agent_key == "allopathy":
+        source_url = _extract_allopathy_info(traces, response).get("drugbank_url", "")
+    else:
+        source_url = _extract_ayush_info(traces, response).get("imppat_url", "")
+    facts = extract_facts(agent_key, response, phytochemical_names(traces))
+    if not source_url and not any(f["type"] in MATERIAL_FACT_TYPES for f in facts):
+        logger.info(f"Not caching {agent_key} output for {cache_key}: no source URL or material facts")
+        return
+
+    traces_summary = _summarize_traces(traces)
+    entry = {
+        "response": response,
+        "source_url": source_url,
+        "traces": traces_summary,
+        "expires_at": time.time() + PROPOSER_CACHE_TTL_SECONDS,
+    }
+    _remember_proposer((agent_key, cache_key), entry)
+
+    try:
+        save_agent_output(
+            agent_key, cache_key, response, source_url,
+            traces_summary, PROPOSER_CACHE_TTL_SECONDS,
+        )
+    except Exception as e:
+        logger.warning(f"Proposer cache save failed for {agent_key}/{cache_key}: {e}")
+
+
 # ──────────────────────────────────────────────────────────────
 # CO-MAS Pipeline
 # ──────────────────────────────────────────────────────────────
 
+_CYP_MENTION_RE = re.compile(r'CYP\d[A-Z]\d+', re.IGNORECASE)
+
+
+def _cyp_mentions(*texts: str) -> list:
+    """CYP enzymes named anywhere in `texts`, as calculate_severity cyp_enzymes entries."""
+    found = sorted({m.upper() for text in texts for m in _CYP_MENTION_RE.findall(text or "")})
+    return [{"name": cyp, "effect": "interaction"} for cyp in found]
+
+
+def _herb_drug_cyp_overlap(ayush_response: str, allopathy_response: str) -> list:
+    """calculate_severity cyp_enzymes for enzymes the herb inhibits / induces that also metabolize the drug.
+
+    Only the AYUSH evidence's cyp_effect facts count as effects (with their
+    direction); the Allopathy text supplies the drug's enzymes. Empty when
+    the herb has no reported CYP effect on them.
+    """
+    drug_enzymes = {m.upper() for m in _CYP_MENTION_RE.findall(allopathy_response or "")}
+    herb = cyp_effects(extract_facts("ayush", ayush_response or ""))
+    return [{"name": enzyme, "effect": "inhibitor" if effect == "inhibits" else "inducer"}
+            for enzyme, effect in sorted(herb.items()) if enzyme in drug_enzymes]
+
+
+def _reasoning_tool_output(trace: dict) -> Tuple[str, dict]:
+    """("severity" | "graph", result) for a successful Reasoning tool_result trace, else ("", {})."""
+    if trace.get("type") != "tool_result" or not trace.get("_full_result"):
+        return "", {}
+    try:
+        result = json.loads(trace["_full_result"])
+    except (json.JSONDecodeError, TypeError):
+        return "", {}
+    if not isinstance(result, dict) or not result.get("success"):
+        return "", {}
+    fn = trace.get("_fn", "")
+    if fn == "calculate_severity":
+        return "severity", result
+    if fn == "build_knowledge_graph":
+        return "graph", result.get("graph", result)
+    return "", {}
+
+
+def _reasoning_prompt(scientific_name: str, allopathy_name: str, evidence_block: str) -> str:
+    return (
+        f"Analyze the pharmacological interaction between AYUSH drug '{scientific_name}' "
+        f"and allopathy drug '{allopathy_name}'.\n\n"
+        f"{evidence_block}"
+        f"Provide a detailed analysis including: interaction mechanisms (pharmacokinetic & "
+        f"pharmacodynamic), severity assessment, phytochemicals responsible, clinical effects, "
+        f"and evidence-based reasoning chain. Return a concise analysis JSON."
+    )
+
+
 def run_comas_pipeline(
     ayush_name: str,
     allopathy_name: str,
     scientific_name: str,
     imppat_url: str,
     session_id: str,
+    trace_types: Optional[frozenset] = None,
 ) -> Generator:
     """Main CO-MAS iterative pipeline.
 
-    Yields (event_type, data) tuples for the UI to consume.
+    Yields (event_type, data) tuples for the UI to consume. With trace_types
+    (see VERBOSITY_TRACE_TYPES) agent calls only build those trace types
+    plus the ones the pipeline reads itself.
     """
+    trace_filter = True if trace_types is None else _PIPELINE_TRACE_TYPES | trace_types
     iteration = 0
     gaps_history = []
     last_output = {}
@@ -1163,6 +1555,103 @@ def run_comas_pipeline(
         "data_collected": {},
         "source_urls": [],
     }
+    reasoning_stats: list = []
+    pre_eval_stats: list = []
+    # Evidence diff state (incremental Evaluator on iterations 2+)
+    known_facts: dict = {}
+    agent_fingerprints: dict = {}
+    last_reasoning_response = ""
+    last_severity_result: dict = {}
+    last_knowledge_graph: dict = {}
+
+    speculation_stats: list = []
+    hedge_stats: list = []
+    run_checkpoints = checkpoints.RunCheckpoints(
+        checkpoints.interaction_key(scientific_name, allopathy_name), session_id,
+    )
+
+    def _run_agent(key, prompt, store, cancel_event=None, step=None):
+        step = step or f"proposer:{key}"
+        restored = run_checkpoints.lookup(step, iteration, prompt)
+        if restored:
+            store.update(response=restored["response"], traces=list(restored["traces"]), restored=True)
+            return
+        started = time.perf_counter()
+        if hedging.enabled_for(key):
+            r, t, store["hedge"] = hedging.invoke(
+                key,
+                lambda agent_session_id, cancel: _invoke_agent_collect(
+                    key, prompt, session_id, cancel_event=cancel, agent_session_id=agent_session_id,
+                    yield_traces=trace_filter,
+                ),
+                cancel_event,
+            )
+        else:
+            r, t = _invoke_agent_collect(key, prompt, session_id, cancel_event=cancel_event,
+                                         yield_traces=trace_filter)
+        store["response"] = r
+        store["traces"] = t
+        if r and not (cancel_event is not None and cancel_event.is_set()):
+            run_checkpoints.save(step, iteration, prompt, {
+                "response": r,
+                "traces": _summarize_traces(t),
+                "seconds": round(time.perf_counter() - started, 2),
+            })
+
+    def _run_reasoning(prompt, store):
+        restored = run_checkpoints.lookup("reasoning_early", iteration, prompt)
+        if restored:
+            store.update(response=restored["response"], traces=list(restored["traces"]),
+                         severity=restored.get("severity") or {}, graph=restored.get("graph") or {},
+                         restored=True, finished=time.time())
+            return
+        started = time.perf_counter()
+        r, t = _invoke_agent_collect("reasoning", prompt, session_id, yield_traces=trace_filter)
+        severity, graph = {}, {}
+        for trace in t:
+            kind, tool_output = _reasoning_tool_output(trace)
+            if kind == "severity":
+                severity = tool_output
+            elif kind == "graph":
+                graph = tool_output
+        store.update(response=r, traces=t, severity=severity, graph=graph, finished=time.time())
+        if r:
+            run_checkpoints.save("reasoning_early", iteration, prompt, {
+                "response": r,
+                "traces": _summarize_traces(t),
+                "severity": severity,
+                "graph": graph,
+                "seconds": round(time.perf_counter() - started, 2),
+            })
+
+    def _collect_proposers(stores, results, keys):
+        """Move finished proposer stores into results, yielding their traces once."""
+        for key in keys:
+            store = stores[key]
+            if store.get("collected"):
+                continue
+            store["collected"] = True
+            resp = store.get("response", "")
+            traces = store.get("traces", [])
+            results[key] = {"response": resp, "traces": traces}
+            if store.get("hedge"):
+                hedge_stats.append({**store["hedge"], "iteration": iteration})
+            if store.get("cached"):
+                continue
+            if store.get("restored"):
+                yield ("trace", {
+                    "type": "thinking",
+                    "agent": AGENTS[key]["label"],
+                    "agent_key": key,
+                    "iteration": iteration,
+                    "message": f"{AGENTS[key]['label']} output restored from checkpoint (skipping agent call)",
+                })
+            for trace in traces:
+                yield ("trace", {**trace, "agent_key": key, "iteration": iteration})
+            if iteration == 1 and key in _CACHEABLE_PROPOSERS:
+                cache_name = scientific_name if key == "ayush" else allopathy_name
+                with instrumentation.phase(session_id, "db_save", agent=key):
+                    _put_cached_proposer(key, cache_name, resp, traces)
 
     yield ("pipeline_status", {
         "status": "iteration_start",
@@ -1170,8 +1659,18 @@ def run_comas_pipeline(
         "message": f"Starting CO-MAS pipeline iteration 1 of {MAX_COMAS_ITERATIONS}",
     })
 
+    if run_checkpoints.available:
+        yield ("pipeline_status", {
+            "status": "checkpoint_resume",
+            "message": (
+                f"Resuming an interrupted run: {run_checkpoints.available} completed agent call(s) "
+                f"checkpointed, {run_checkpoints.completed_iterations} iteration(s) scored"
+            ),
+        })
+
     while iteration < MAX_COMAS_ITERATIONS:
         iteration += 1
+        instrumentation.set_iteration(session_id, iteration)
 
         yield ("pipeline_status", {
             "status": "iteration_start",
@@ -1179,6 +1678,38 @@ def run_comas_pipeline(
             "message": f"CO-MAS iteration {iteration}/{MAX_COMAS_ITERATIONS}",
         })
 
+        # ── PHASE 0: SPECULATIVE PROPOSERS (iteration 1) ────────
+        # Iteration-1 prompts are fixed templates, so proposers can start
+        # alongside the Planner; the plan is reconciled against them below.
+        speculative: dict = {}
+        if iteration == 1:
+            for key in SPECULATIVE_PROPOSERS:
+                if key not in _PROPOSER_KEYS:
+                    continue
+                if key in _CACHEABLE_PROPOSERS:
+                    with instrumentation.phase(session_id, "db_lookup", agent=key):
+                        entry = _get_cached_proposer(key, scientific_name if key == "ayush" else allopathy_name)
+                    if entry:
+                        speculative[key] = {"cached_entry": entry}
+                        continue
+                store, cancel = {}, threading.Event()
+                t = threading.Thread(
+                    target=_run_agent,
+                    args=(key, _initial_proposer_prompt(key, scientific_name, allopathy_name, imppat_url),
+                          store, cancel),
+                    daemon=True,
+                )
+                t.start()
+                speculative[key] = {"thread": t, "store": store, "cancel": cancel,
+                                    "started": time.perf_counter()}
+                yield ("trace", {
+                    "type": "thinking",
+                    "agent": AGENTS[key]["label"],
+                    "agent_key": key,
+                    "iteration": iteration,
+                    "message": f"{AGENTS[key]['label']} agent running alongside Planner…",
+                })
+
         # ── PHASE 1: PLANNER ────────────────────────────────────
         yield ("pipeline_status", {"status": "phase_proposer", "iteration": iteration,
                                     "message": "Planner generating execution plan..."})
@@ -1248,14 +1779,32 @@ def run_comas_pipeline(
 
         # ── Stream planner traces directly (no buffering) ────────
         planner_response = ""
-        for ev_type, ev_data in _invoke_agent("planner", planner_prompt, session_id):
-            if ev_type == "trace":
-                yield ("trace", {**ev_data, "agent_key": "planner", "iteration": iteration})
-            elif ev_type == "response":
-                planner_response = ev_data
-            elif ev_type == "error":
-                logger.error(f"Planner error: {ev_data}")
-                planner_response = ""
+        restored = run_checkpoints.lookup("planner", iteration, planner_prompt)
+        if restored:
+            planner_response = restored["response"]
+            yield ("trace", {
+                "type": "thinking",
+                "agent": AGENTS["planner"]["label"],
+                "agent_key": "planner",
+                "iteration": iteration,
+                "message": "Plan restored from checkpoint (skipping agent call)",
+            })
+        else:
+            planner_started = time.perf_counter()
+            for ev_type, ev_data in _invoke_agent("planner", planner_prompt, session_id,
+                                                  yield_traces=trace_filter):
+                if ev_type == "trace":
+                    yield ("trace", {**ev_data, "agent_key": "planner", "iteration": iteration})
+                elif ev_type == "response":
+                    planner_response = ev_data
+                elif ev_type == "error":
+                    logger.error(f"Planner error: {ev_data}")
+                    planner_response = ""
+            if planner_response:
+                run_checkpoints.save("planner", iteration, planner_prompt, {
+                    "response": planner_response,
+                    "seconds": round(time.perf_counter() - planner_started, 2),
+                })
 
         plan = _parse_planner_output(planner_response)
         agents_cfg = plan.get("agents", {})
@@ -1263,6 +1812,33 @@ def run_comas_pipeline(
         run_ayush = agents_cfg.get("ayush", {}).get("run", True)
         run_allopathy = agents_cfg.get("allopathy", {}).get("run", True)
         run_research = agents_cfg.get("research", {}).get("run", True)
+        run_flags = {"ayush": run_ayush, "allopathy": run_allopathy, "research": run_research}
+
+        # Reconcile speculative proposers with the plan: cancel the ones it
+        # skips; proposers it wants that were not speculated start below
+        for key, spec in speculative.items():
+            wanted = run_flags[key]
+            if "thread" in spec:
+                outcome = "used" if wanted else "cancelled"
+                if not wanted:
+                    spec["cancel"].set()
+                    yield ("trace", {
+                        "type": "thinking",
+                        "agent": AGENTS[key]["label"],
+                        "agent_key": key,
+                        "iteration": iteration,
+                        "message": f"{AGENTS[key]['label']} cancelled: plan skips it",
+                    })
+            else:
+                outcome = "cached"
+            speculation_stats.append({
+                "agent": key,
+                "outcome": outcome,
+                "head_start_s": round(time.perf_counter() - spec["started"], 2) if "started" in spec else 0.0,
+            })
+            instrumentation.count("ausadhi_speculative_proposers_total",
+                                  "Proposers started alongside the Planner, by outcome",
+                                  agent=key, outcome=outcome)
 
         # ── PHASE 2: PROPOSER (parallel agents) ─────────────────
         yield ("pipeline_status", {"status": "phase_proposer", "iteration": iteration,
@@ -1277,82 +1853,60 @@ def run_comas_pipeline(
 
         agent_results = {}
         threads = []
-
-        def _run_agent(key, prompt, store):
-            r, t = _invoke_agent_collect(key, prompt, session_id)
-            store["response"] = r
-            store["traces"] = t
-
+        speculative_threads = []
         proposer_stores = {}
 
-        if run_ayush:
-            proposer_stores["ayush"] = {}
-            if iteration == 1:
-                ayush_prompt = (
-                    f"Get comprehensive phytochemical data for {scientific_name}. "
-                    f"Include IMPPAT data, CYP enzyme interactions, and key bioactive compounds. "
-                    f"IMPPAT URL: {imppat_url}"
-                )
-            else:
-                ayush_gaps = [g for g in latest_gap_list if any(
-                    kw in g.lower() for kw in ["phytochemical", "ayush", "cyp enzyme effect", "admet"]
-                )]
-                gap_detail = "; ".join(ayush_gaps) if ayush_gaps else "more detailed CYP enzyme interaction data"
-                ayush_prompt = (
-                    f"TARGETED SEARCH (iteration {iteration}): Previous analysis had gaps. "
-                    f"Focus on: {gap_detail}. "
-                    f"Get specific phytochemicals from {scientific_name} and their exact effects "
-                    f"on CYP450 enzymes (inhibition/induction). Include ADMET properties. "
-                    f"IMPPAT URL: {imppat_url}"
-                )
-            t = threading.Thread(target=_run_agent, args=("ayush", ayush_prompt, proposer_stores["ayush"]))
-            threads.append(("ayush", t))
-
-        if run_allopathy:
-            proposer_stores["allopathy"] = {}
-            if iteration == 1:
-                allopathy_prompt = (
-                    f"Get comprehensive data for {allopathy_name}. "
-                    f"Include CYP metabolism pathways, NTI status, mechanism of action. "
-                    f"Search DrugBank (domain: drugbank) for the drug page URL."
-                )
-            else:
-                allo_gaps = [g for g in latest_gap_list if any(
-                    kw in g.lower() for kw in ["allopathy", "severity", "metabolism", "nti", "cyp"]
-                )]
-                gap_detail = "; ".join(allo_gaps) if allo_gaps else "more detailed CYP metabolism data"
-                allopathy_prompt = (
-                    f"TARGETED SEARCH (iteration {iteration}): Previous analysis had gaps. "
-                    f"Focus on: {gap_detail}. "
-                    f"Get specific CYP450 metabolism pathways for {allopathy_name}, NTI status, "
-                    f"and ADMET properties. "
-                    f"Search DrugBank (domain: drugbank) for the drug page URL."
-                )
-            t = threading.Thread(target=_run_agent, args=("allopathy", allopathy_prompt, proposer_stores["allopathy"]))
-            threads.append(("allopathy", t))
+        # Iteration-1 AYUSH / Allopathy prompts are fixed templates, so their
+        # output can be served from the cross-session cache. Gap-targeted
+        # re-runs on later iterations always invoke the agent.
+        cached_keys = []
+        if iteration == 1:
+            for key, run_flag, name in (
+                ("ayush", run_ayush, scientific_name),
+                ("allopathy", run_allopathy, allopathy_name),
+            ):
+                if not run_flag:
+                    continue
+                if key in speculative:
+                    entry = speculative[key].get("cached_entry")
+                else:
+                    with instrumentation.phase(session_id, "db_lookup", agent=key):
+                        entry = _get_cached_proposer(key, name)
+                if entry:
+                    proposer_stores[key] = {
+                        "response": _cached_proposer_response(key, entry),
+                        "traces": list(entry["traces"]),
+                        "cached": True,
+                    }
+                    cached_keys.append(key)
+
+        for key in cached_keys:
+            agent_label = AGENTS[key]["label"]
+            yield ("trace", {
+                "type": "thinking",
+                "agent": agent_label,
+                "agent_key": key,
+                "iteration": iteration,
+                "message": f"{agent_label} data served from cache (skipping agent call)",
+            })
 
-        if run_research:
-            proposer_stores["research"] = {}
+        for key in _PROPOSER_KEYS:
+            if not run_flags[key] or key in cached_keys:
+                continue
+            spec = speculative.get(key, {})
+            if "thread" in spec:
+                proposer_stores[key] = spec["store"]
+                speculative_threads.append((key, spec["thread"]))
+                continue
+            proposer_stores[key] = {}
             if iteration == 1:
-                research_prompt = (
-                    f"Search for clinical evidence of interactions between {scientific_name} "
-                    f"and {allopathy_name}. "
-                    f"Find PubMed articles, clinical trials, and pharmacological studies."
-                )
+                prompt = _initial_proposer_prompt(key, scientific_name, allopathy_name, imppat_url)
             else:
-                research_gaps = [g for g in latest_gap_list if any(
-                    kw in g.lower() for kw in ["source", "evidence", "research", "pubmed", "clinical", "mechanism", "reasoning"]
-                )]
-                gap_detail = "; ".join(research_gaps) if research_gaps else "clinical interaction evidence and PubMed sources"
-                research_prompt = (
-                    f"TARGETED SEARCH (iteration {iteration}): Previous analysis had gaps. "
-                    f"Focus on: {gap_detail}. "
-                    f"Search PubMed and clinical databases for specific interaction evidence "
-                    f"between {scientific_name} and {allopathy_name}. "
-                    f"Provide URLs and detailed findings."
+                prompt = _targeted_proposer_prompt(
+                    key, latest_gap_list, iteration, scientific_name, allopathy_name, imppat_url,
                 )
-            t = threading.Thread(target=_run_agent, args=("research", research_prompt, proposer_stores["research"]))
-            threads.append(("research", t))
+            t = threading.Thread(target=_run_agent, args=(key, prompt, proposer_stores[key]))
+            threads.append((key, t))
 
         for key, t in threads:
             t.start()
@@ -1367,15 +1921,79 @@ def run_comas_pipeline(
                 "message": f"{agent_label} agent running…",
             })
 
-        for key, t in threads:
+        running = speculative_threads + threads
+        early_reasoning = None
+        pharmacology_keys = [k for k in ("ayush", "allopathy") if k in proposer_stores]
+
+        # Pipelined Evaluator: when only Research is still out, start Reasoning
+        # on the AYUSH / Allopathy evidence now and fold research in afterwards
+        # through the incremental (delta) prompt
+        if (
+            PIPELINED_EVALUATOR and REASONING_EVIDENCE_PACKING and pharmacology_keys
+            and any(k == "research" for k, _ in running)
+            and not (REASONING_INCREMENTAL and iteration > 1 and last_reasoning_response)
+        ):
+            for key, t in running:
+                if key != "research":
+                    t.join(timeout=300)
+            yield from _collect_proposers(proposer_stores, agent_results, pharmacology_keys)
+            pharmacology = {k: agent_results[k] for k in pharmacology_keys}
+
+            # Provisional only when the herb affects an enzyme the drug depends
+            # on; the drug's own CYP profile (plus NTI) is no interaction
+            cyp_data = _herb_drug_cyp_overlap(pharmacology.get("ayush", {}).get("response", ""),
+                                              pharmacology.get("allopathy", {}).get("response", ""))
+            if cyp_data:
+                with instrumentation.phase(session_id, "severity", provisional=True):
+                    provisional = _call_severity(json.dumps({"cyp_enzymes": cyp_data}), allopathy_name)
+                if isinstance(provisional, dict) and provisional.get("success"):
+                    yield ("pipeline_status", {
+                        "status": "provisional_severity",
+                        "iteration": iteration,
+                        "severity": provisional.get("severity"),
+                        "severity_score": provisional.get("severity_score"),
+                        "message": (
+                            f"Provisional severity {provisional.get('severity')} "
+                            f"({provisional.get('severity_score')}) from AYUSH / Allopathy data; "
+                            f"research evidence pending"
+                        ),
+                    })
+
+            early_facts = []
+            early_candidates = []
+            for key, r in pharmacology.items():
+                early_facts.extend(extract_facts(key, r["response"], phytochemical_names(r["traces"])))
+                early_candidates.extend(extract_sources(r["traces"], r["response"], key))
+            early_facts.extend(source_facts(normalize_sources(early_candidates, limit=MAX_REASONING_SOURCES)))
+            agent_fingerprints.update(fingerprint_facts(early_facts))
+            for fact in dedupe_facts(early_facts):
+                known_facts.setdefault(fact["key"], fact)
+            packed_early = pack_evidence(list(known_facts.values()), latest_gap_list,
+                                         REASONING_EVIDENCE_TOKEN_BUDGET)
+            early_prompt = _reasoning_prompt(
+                scientific_name, allopathy_name,
+                f"Evidence (deduplicated, most relevant first):\n\n{packed_early['text']}\n\n",
+            )
+            early_reasoning = {"prompt": early_prompt, "started": time.time()}
+            t = threading.Thread(target=_run_reasoning, args=(early_prompt, early_reasoning), daemon=True)
+            t.start()
+            early_reasoning["thread"] = t
+            yield ("trace", {
+                "type": "thinking",
+                "agent": AGENTS["reasoning"]["label"],
+                "agent_key": "reasoning",
+                "iteration": iteration,
+                "message": (
+                    f"Reasoning started on AYUSH / Allopathy evidence ({len(packed_early['facts'])} facts) "
+                    f"while Research runs…"
+                ),
+            })
+
+        for key, t in running:
             t.join(timeout=300)
+        research_joined = time.time()
 
-        for key, store in proposer_stores.items():
-            resp = store.get("response", "")
-            traces = store.get("traces", [])
-            agent_results[key] = {"response": resp, "traces": traces}
-            for trace in traces:
-                yield ("trace", {**trace, "agent_key": key, "iteration": iteration})
+        yield from _collect_proposers(proposer_stores, agent_results, list(proposer_stores))
 
         if "ayush" in agent_results:
             ayush_response = agent_results["ayush"]["response"]
@@ -1388,20 +2006,207 @@ def run_comas_pipeline(
             research_response = agent_results["research"]["response"]
             research_traces_local = agent_results["research"]["traces"]
 
+        # ── PHASE 2b: PRE-EVALUATION (deterministic) ────────────
+        # Predict scorer gaps from the raw proposer output and re-run only the
+        # proposers that can fill them, before paying for a Reasoning call
+        # (skipped on the last iteration, where the scorer passes regardless)
+        rerun_round = 0
+        while PRE_EVAL_ENABLED and iteration < MAX_COMAS_ITERATIONS and rerun_round < PRE_EVAL_MAX_RERUNS:
+            pre_facts = list(known_facts.values())
+            pre_candidates = []
+            for agent_key, agent_resp, agent_traces in [
+                ("ayush", ayush_response, ayush_traces_local),
+                ("allopathy", allopathy_response_local, allopathy_traces_local),
+                ("research", research_response, research_traces_local),
+            ]:
+                pre_facts.extend(extract_facts(agent_key, agent_resp, phytochemical_names(agent_traces)))
+                pre_candidates.extend(extract_sources(agent_traces, agent_resp, agent_key))
+            pre_facts.extend(source_facts(normalize_sources(pre_candidates)))
+            prescore = prescore_facts(pre_facts)
+            rerun_keys = _proposers_for_gaps(prescore["gaps"])
+            if prescore["ready"] or not rerun_keys:
+                break
+
+            rerun_round += 1
+            pre_eval_stats.append({
+                "iteration": iteration,
+                "round": rerun_round,
+                "predicted_score": prescore["predicted_score"],
+                "gaps": prescore["gaps"],
+                "rerun": rerun_keys,
+            })
+            yield ("pipeline_status", {
+                "status": "pre_eval_rerun",
+                "iteration": iteration,
+                "gaps": prescore["gaps"],
+                "message": (
+                    f"Pre-evaluation predicts score {prescore['predicted_score']}/100 "
+                    f"with {len(prescore['gaps'])} gap(s); "
+                    f"re-running {', '.join(AGENTS[k]['label'] for k in rerun_keys)} before Reasoning"
+                ),
+            })
+
+            rerun_stores = {key: {} for key in rerun_keys}
+            rerun_threads = []
+            for key in rerun_keys:
+                prompt = _targeted_proposer_prompt(
+                    key, prescore["gaps"], iteration, scientific_name, allopathy_name, imppat_url,
+                )
+                t = threading.Thread(target=_run_agent,
+                                     args=(key, prompt, rerun_stores[key], None, f"rerun:{key}:{rerun_round}"))
+                rerun_threads.append(t)
+                t.start()
+                yield ("trace", {
+                    "type": "thinking",
+                    "agent": AGENTS[key]["label"],
+                    "agent_key": key,
+                    "iteration": iteration,
+                    "message": f"{AGENTS[key]['label']} re-running for predicted gaps…",
+                })
+            for t in rerun_threads:
+                t.join(timeout=300)
+
+            for key, store in rerun_stores.items():
+                resp = store.get("response", "")
+                traces = store.get("traces", [])
+                if store.get("hedge"):
+                    hedge_stats.append({**store["hedge"], "iteration": iteration})
+                for trace in traces:
+                    yield ("trace", {**trace, "agent_key": key, "iteration": iteration})
+                if key == "ayush":
+                    ayush_response = f"{ayush_response}\n\n{resp}".strip()
+                    ayush_traces_local = ayush_traces_local + traces
+                elif key == "allopathy":
+                    allopathy_response_local = f"{allopathy_response_local}\n\n{resp}".strip()
+                    allopathy_traces_local = allopathy_traces_local + traces
+                    allopathy_traces = allopathy_traces_local
+                elif key == "research":
+                    research_response = f"{research_response}\n\n{resp}".strip()
+                    research_traces_local = research_traces_local + traces
+
+        # Canonicalize proposer sources (PMID / PMC / DOI) once; only the
+        # top-ranked few are forwarded to the Reasoning prompt
+        proposer_candidates = []
+        for agent_key, agent_resp, agent_traces in [
+            ("research", research_response, research_traces_local),
+            ("allopathy", allopathy_response_local, allopathy_traces_local),
+            ("ayush", ayush_response, ayush_traces_local),
+        ]:
+            proposer_candidates.extend(extract_sources(agent_traces, agent_resp, agent_key))
+        prompt_sources = normalize_sources(proposer_candidates, limit=MAX_REASONING_SOURCES)
+
         # ── PHASE 3: EVALUATOR (Reasoning Agent) ────────────────
         yield ("pipeline_status", {"status": "phase_evaluator", "iteration": iteration,
                                     "message": "Reasoning agent evaluating interactions..."})
 
-        reasoning_prompt = (
-            f"Analyze the pharmacological interaction between AYUSH drug '{scientific_name}' "
-            f"and allopathy drug '{allopathy_name}'.\n\n"
-            f"AYUSH data:\n{ayush_response[:2000]}\n\n"
-            f"Allopathy data:\n{allopathy_response_local[:2000]}\n\n"
-            f"Research evidence:\n{research_response[:2000]}\n\n"
-            f"Provide a detailed analysis including: interaction mechanisms (pharmacokinetic & "
-            f"pharmacodynamic), severity assessment, phytochemicals responsible, clinical effects, "
-            f"and evidence-based reasoning chain. Return a concise analysis JSON."
-        )
+        evaluator_mode = "full"
+        early_used = False
+        if early_reasoning is not None:
+            early_reasoning["thread"].join(timeout=300)
+            for trace in early_reasoning.get("traces", []):
+                yield ("trace", {**trace, "agent_key": "reasoning", "iteration": iteration})
+            finished = early_reasoning.get("finished", time.time())
+            reasoning_stats.append({
+                "iteration": iteration,
+                "mode": "early",
+                "prompt_tokens": estimate_tokens(early_reasoning["prompt"]),
+                "seconds": round(finished - early_reasoning["started"], 2),
+                "overlap_seconds": round(max(0.0, min(finished, research_joined) - early_reasoning["started"]), 2),
+                "tokens_saved": 0,
+                "seconds_saved": 0.0,
+            })
+            if early_reasoning.get("response"):
+                early_used = True
+                last_reasoning_response = early_reasoning["response"]
+                last_severity_result = early_reasoning.get("severity", {})
+                last_knowledge_graph = early_reasoning.get("graph", {})
+
+        if REASONING_EVIDENCE_PACKING:
+            # Typed facts ranked against the open gaps, packed into a token budget.
+            # Facts accumulate across iterations so proposers the planner did
+            # not re-run still contribute their earlier evidence.
+            iteration_facts = []
+            ayush_phytochemicals = phytochemical_names(ayush_traces_local)
+            for agent_key, agent_resp in [
+                ("ayush", ayush_response),
+                ("allopathy", allopathy_response_local),
+                ("research", research_response),
+            ]:
+                iteration_facts.extend(extract_facts(agent_key, agent_resp, ayush_phytochemicals))
+            iteration_facts.extend(source_facts(prompt_sources))
+
+            new_facts = diff_facts(known_facts, iteration_facts)
+            fingerprints = fingerprint_facts(iteration_facts)
+            changed_agents = sorted(k for k, fp in fingerprints.items() if agent_fingerprints.get(k) != fp)
+            agent_fingerprints.update(fingerprints)
+            for fact in dedupe_facts(iteration_facts):
+                known_facts.setdefault(fact["key"], fact)
+
+            packed = pack_evidence(list(known_facts.values()), latest_gap_list, REASONING_EVIDENCE_TOKEN_BUDGET)
+            evidence_block = f"Evidence (deduplicated, most relevant first):\n\n{packed['text']}\n\n"
+
+            if last_reasoning_response and (early_used or (REASONING_INCREMENTAL and iteration > 1)):
+                material = [f for f in new_facts if f["type"] in MATERIAL_FACT_TYPES]
+                evaluator_mode = "delta" if material else "skip"
+                logger.info(
+                    f"Evidence diff iteration {iteration}: {len(new_facts)} new facts "
+                    f"({len(material)} material), changed proposers: {changed_agents or 'none'}"
+                )
+
+            if evaluator_mode == "delta":
+                packed_delta = pack_evidence(material, latest_gap_list, REASONING_EVIDENCE_TOKEN_BUDGET)
+                gap_text = "\n".join(f"  - {g}" for g in latest_gap_list) or "  - none recorded"
+                trace_message = (
+                    f"Incremental update: {len(packed_delta['facts'])} new facts "
+                    f"from {', '.join(changed_agents) or 'proposers'} (~{packed_delta['tokens']} tokens)"
+                )
+            elif evaluator_mode == "skip":
+                trace_message = "No material new evidence since the last iteration — reusing previous analysis"
+            else:
+                trace_message = (
+                    f"Evidence packed: {len(packed['facts'])} of {packed['total_facts']} facts "
+                    f"(~{packed['tokens']} tokens, budget {REASONING_EVIDENCE_TOKEN_BUDGET})"
+                )
+            yield ("trace", {
+                "type": "thinking",
+                "agent": AGENTS["reasoning"]["label"],
+                "agent_key": "reasoning",
+                "iteration": iteration,
+                "message": trace_message,
+            })
+            logger.info(f"Evidence facts by type: {summarize_facts(packed['facts'])}, dropped {packed['dropped']}")
+        else:
+            sources_block = (
+                f"Key sources (deduplicated, best first):\n{format_sources_for_prompt(prompt_sources)}\n\n"
+                if prompt_sources else ""
+            )
+            evidence_block = (
+                f"AYUSH data:\n{ayush_response[:2000]}\n\n"
+                f"Allopathy data:\n{allopathy_response_local[:2000]}\n\n"
+                f"Research evidence:\n{research_response[:2000]}\n\n"
+                f"{sources_block}"
+            )
+
+        full_prompt = _reasoning_prompt(scientific_name, allopathy_name, evidence_block)
+        previous_analysis = _parse_reasoning_output(last_reasoning_response) if evaluator_mode == "delta" else {}
+        if evaluator_mode == "delta" and not previous_analysis:
+            # Nothing to update (no JSON in the previous answer): an update
+            # prompt would rebuild the analysis from the new facts alone
+            logger.warning(f"Previous reasoning answer unparseable in iteration {iteration}, running a full evaluation")
+            evaluator_mode = "full"
+        if evaluator_mode == "delta":
+            reasoning_prompt = (
+                f"UPDATE (iteration {iteration}): you already analyzed the interaction between "
+                f"AYUSH drug '{scientific_name}' and allopathy drug '{allopathy_name}'.\n\n"
+                f"Your previous analysis:\n{compact_analysis(previous_analysis)}\n\n"
+                f"Open gaps:\n{gap_text}\n\n"
+                f"New facts since then:\n\n{packed_delta['text']}\n\n"
+                f"Update your analysis with these new facts: keep conclusions that still hold, "
+                f"revise those the new facts change, and return the complete analysis JSON."
+            )
+        else:
+            reasoning_prompt = full_prompt
+        reasoning_start = time.time()
 
         # ── Stream reasoning traces directly, then compile ────────
         reasoning_all_traces = []
@@ -1409,30 +2214,102 @@ def run_comas_pipeline(
         severity_result_rt = {}
         knowledge_graph_rt = {}
 
-        for ev_type, ev_data in _invoke_agent("reasoning", reasoning_prompt, session_id):
-            if ev_type == "trace":
-                yield ("trace", {**ev_data, "agent_key": "reasoning", "iteration": iteration})
-                reasoning_all_traces.append(ev_data)
-                # Capture severity / graph tool results for compile step
-                if ev_data.get("type") == "tool_result":
-                    fn = ev_data.get("_fn", "")
-                    full = ev_data.get("_full_result", "")
-                    if fn == "calculate_severity" and full:
-                        try:
-                            sr = json.loads(full)
-                            if isinstance(sr, dict) and sr.get("success"):
-                                severity_result_rt = sr
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-                    elif fn == "build_knowledge_graph" and full:
-                        try:
-                            gr = json.loads(full)
-                            if isinstance(gr, dict) and gr.get("success"):
-                                knowledge_graph_rt = gr.get("graph", gr)
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-            elif ev_type == "response":
-                reasoning_response = ev_data
+        if evaluator_mode == "skip":
+            reasoning_response = last_reasoning_response
+            severity_result_rt = dict(last_severity_result)
+            knowledge_graph_rt = last_knowledge_graph
+        else:
+            restored = run_checkpoints.lookup("reasoning", iteration, reasoning_prompt)
+            if restored:
+                reasoning_response = restored["response"]
+                reasoning_all_traces = list(restored["traces"])
+                severity_result_rt = restored.get("severity") or {}
+                knowledge_graph_rt = restored.get("graph") or {}
+                yield ("trace", {
+                    "type": "thinking",
+                    "agent": AGENTS["reasoning"]["label"],
+                    "agent_key": "reasoning",
+                    "iteration": iteration,
+                    "message": "Reasoning output restored from checkpoint (skipping agent call)",
+                })
+                for trace in reasoning_all_traces:
+                    yield ("trace", {**trace, "agent_key": "reasoning", "iteration": iteration})
+            else:
+                answer_fields = JSONFieldStream()
+                for ev_type, ev_data in _invoke_agent("reasoning", reasoning_prompt, session_id,
+                                                      yield_traces=trace_filter,
+                                                      stream_chunks=REASONING_STREAM_DELTAS and trace_types is None):
+                    if ev_type == "chunk":
+                        yield ("llm_delta", {
+                            "agent": AGENTS["reasoning"]["label"],
+                            "agent_key": "reasoning",
+                            "iteration": iteration,
+                            "delta": ev_data,
+                            "fields": answer_fields.feed(ev_data),
+                        })
+                    elif ev_type == "chunk_reset":
+                        answer_fields = JSONFieldStream()
+                        yield ("llm_delta", {
+                            "agent": AGENTS["reasoning"]["label"],
+                            "agent_key": "reasoning",
+                            "iteration": iteration,
+                            "reset": True,
+                        })
+                    elif ev_type == "trace":
+                        yield ("trace", {**ev_data, "agent_key": "reasoning", "iteration": iteration})
+                        reasoning_all_traces.append(ev_data)
+                        # Capture severity / graph tool results for compile step
+                        kind, tool_output = _reasoning_tool_output(ev_data)
+                        if kind == "severity":
+                            severity_result_rt = tool_output
+                        elif kind == "graph":
+                            knowledge_graph_rt = tool_output
+                    elif ev_type == "response":
+                        reasoning_response = ev_data
+                if reasoning_response:
+                    run_checkpoints.save("reasoning", iteration, reasoning_prompt, {
+                        "response": reasoning_response,
+                        "traces": _summarize_traces(reasoning_all_traces),
+                        "severity": severity_result_rt,
+                        "graph": knowledge_graph_rt,
+                        "seconds": round(time.time() - reasoning_start, 2),
+                    })
+
+            if evaluator_mode == "delta":
+                # A delta answer may skip the graph tool or fail outright;
+                # fall back to what the previous full analysis produced
+                if not reasoning_response:
+                    reasoning_response = last_reasoning_response
+                if not knowledge_graph_rt:
+                    knowledge_graph_rt = last_knowledge_graph
+
+        if reasoning_response:
+            last_reasoning_response = reasoning_response
+        if severity_result_rt:
+            last_severity_result = severity_result_rt
+        if knowledge_graph_rt:
+            last_knowledge_graph = knowledge_graph_rt
+
+        call_stats = {
+            "iteration": iteration,
+            "mode": evaluator_mode,
+            "prompt_tokens": 0 if evaluator_mode == "skip" else estimate_tokens(reasoning_prompt),
+            "full_prompt_tokens": estimate_tokens(full_prompt),
+            "evidence_tokens": estimate_tokens(evidence_block),
+            "legacy_evidence_tokens": legacy_prompt_tokens(
+                ayush_response, allopathy_response_local, research_response,
+            ),
+            "seconds": round(time.time() - reasoning_start, 2),
+        }
+        last_full_seconds = next(
+            (c["seconds"] for c in reversed(reasoning_stats) if c["mode"] == "full"), 0.0,
+        )
+        call_stats["tokens_saved"] = call_stats["full_prompt_tokens"] - call_stats["prompt_tokens"]
+        call_stats["seconds_saved"] = (
+            round(max(0.0, last_full_seconds - call_stats["seconds"]), 2)
+            if evaluator_mode != "full" else 0.0
+        )
+        reasoning_stats.append(call_stats)
 
         # Extract analysis data from reasoning response
         analysis_data_rt = {}
@@ -1452,33 +2329,20 @@ def run_comas_pipeline(
         if drugbank_url_rt:
             analysis_data_rt.setdefault("drugbank_url", drugbank_url_rt)
 
-        # Extract source URLs from all agents' traces and responses
-        all_agent_sources = []
-        for agent_key, agent_resp, agent_traces in [
-            ("research", research_response, research_traces_local),
-            ("allopathy", allopathy_response_local, allopathy_traces_local),
-            ("ayush", ayush_response, ayush_traces_local),
-            ("reasoning", reasoning_response, reasoning_all_traces),
-        ]:
-            extracted = _extract_source_urls(agent_traces, agent_resp)
-            all_agent_sources.extend(extracted)
-
-        # Deduplicate sources by URL
-        seen_urls = set()
-        unique_sources = []
-        for src in all_agent_sources:
-            if src["url"] not in seen_urls:
-                seen_urls.add(src["url"])
-                unique_sources.append(src)
-
+        # Merge agent-cited sources with every extracted source, collapsing
+        # alternate URLs of the same article and ranking the result
         existing_sources = analysis_data_rt.get("sources", [])
-        if not existing_sources:
-            analysis_data_rt["sources"] = unique_sources
-        else:
-            for src in unique_sources:
-                if src["url"] not in {s.get("url") for s in existing_sources}:
-                    existing_sources.append(src)
-            analysis_data_rt["sources"] = existing_sources
+        if not isinstance(existing_sources, list):
+            existing_sources = []
+        existing_sources = [
+            src if isinstance(src, dict) else {"url": str(src)}
+            for src in existing_sources if src
+        ]
+        reasoning_candidates = extract_sources(reasoning_all_traces, reasoning_response, "reasoning")
+        analysis_data_rt["sources"] = normalize_sources(
+            existing_sources + proposer_candidates + reasoning_candidates,
+            limit=MAX_RESULT_SOURCES,
+        )
 
         # If Reasoning agent didn't call calculate_severity, call it directly
         if not severity_result_rt:
@@ -1494,27 +2358,25 @@ def run_comas_pipeline(
                             cyp_data.append({"name": ndata.get("label", ""), "effect": "interaction"})
                 if not cyp_data:
                     # Scan agent responses for CYP enzyme mentions
-                    cyp_pattern = re.compile(r'CYP\d[A-Z]\d+', re.IGNORECASE)
-                    all_text = f"{ayush_response} {allopathy_response_local} {reasoning_response}"
-                    found_cyps = set(cyp_pattern.findall(all_text))
-                    for cyp in found_cyps:
-                        cyp_data.append({"name": cyp.upper(), "effect": "interaction"})
+                    cyp_data = _cyp_mentions(ayush_response, allopathy_response_local, reasoning_response)
                 if cyp_data:
                     sev_payload = json.dumps({"cyp_enzymes": cyp_data})
-                    sev_result = _call_severity_lambda(sev_payload, allopathy_name)
+                    with instrumentation.phase(session_id, "severity"):
+                        sev_result = _call_severity(sev_payload, allopathy_name)
                     if isinstance(sev_result, dict) and sev_result.get("success"):
                         severity_result_rt = sev_result
                         logger.info(f"Direct severity call: {sev_result.get('severity')} ({sev_result.get('severity_score')})")
             except Exception as e:
                 logger.warning(f"Direct severity calculation failed: {e}")
 
-        compile_result = _call_compile_lambda(
-            ayush_name=scientific_name,
-            allopathy_name=allopathy_name,
-            severity_result=severity_result_rt,
-            knowledge_graph=knowledge_graph_rt,
-            analysis_data=analysis_data_rt,
-        )
+        with instrumentation.phase(session_id, "compile"):
+            compile_result = _call_compile(
+                ayush_name=scientific_name,
+                allopathy_name=allopathy_name,
+                severity_result=severity_result_rt,
+                knowledge_graph=knowledge_graph_rt,
+                analysis_data=analysis_data_rt,
+            )
 
         final_output = _parse_reasoning_output(reasoning_response, compile_result)
         final_output = _format_final_json(
@@ -1546,7 +2408,15 @@ def run_comas_pipeline(
         yield ("pipeline_status", {"status": "phase_scorer", "iteration": iteration,
                                     "message": "Scorer evaluating output quality..."})
 
-        passes, gaps, score, evidence_quality = _score_output(final_output, iteration)
+        with instrumentation.phase(session_id, "scorer"):
+            passes, gaps, score, evidence_quality = _score_output(final_output, iteration)
+        reasoning_stats[-1]["score"] = score
+        run_checkpoints.save("score", iteration, str(iteration), {
+            "score": score,
+            "gaps": gaps,
+            "passes": passes,
+            "evidence_quality": evidence_quality,
+        })
 
         # Update evidence_quality in the output based on actual score
         if isinstance(last_output, dict) and last_output.get("interaction_data"):
@@ -1692,11 +2562,29 @@ def run_comas_pipeline(
             },
         }
 
+    if any(c["mode"] != "full" for c in reasoning_stats):
+        logger.info(
+            f"Incremental Evaluator saved ~{sum(c['tokens_saved'] for c in reasoning_stats)} prompt tokens "
+            f"and ~{sum(c['seconds_saved'] for c in reasoning_stats):.1f}s "
+            f"({[c['mode'] for c in reasoning_stats]})"
+        )
+
+    run_checkpoints.finish()
+
     yield ("done", {
         "result": last_output,
         "iterations": iteration,
         "gaps_history": gaps_history,
         "session_id": session_id,
+        "stats": {
+            "reasoning_calls": reasoning_stats,
+            "tokens_saved": sum(c.get("tokens_saved", 0) for c in reasoning_stats),
+            "seconds_saved": round(sum(c.get("seconds_saved", 0.0) for c in reasoning_stats), 2),
+            "pre_eval_reruns": pre_eval_stats,
+            "speculative_proposers": speculation_stats,
+            "hedges": hedge_stats,
+            "checkpoints": run_checkpoints.stats(),
+        },
     })
 
 
@@ -1708,12 +2596,30 @@ def run_check(
     ayush_name: str,
     allopathy_name: str,
     session_id: str = None,
+    verbosity: str = "full",
     **kwargs,
 ) -> Generator:
     """Public entry point for the CO-MAS pipeline.
 
-    Yields (event_type, data) tuples.
+    Yields (event_type, data) tuples. verbosity ("full", "status" or
+    "result_only") selects the progress events; done and error always come.
     """
+    trace_types = VERBOSITY_TRACE_TYPES.get(verbosity)
+    events = _run_check(ayush_name, allopathy_name, session_id, trace_types)
+    if trace_types is None:
+        yield from events
+        return
+    for event_type, data in events:
+        if verbosity_allows(verbosity, event_type, data):
+            yield event_type, data
+
+
+def _run_check(
+    ayush_name: str,
+    allopathy_name: str,
+    session_id: Optional[str],
+    trace_types: Optional[frozenset],
+) -> Generator:
     if not session_id:
         session_id = str(uuid.uuid4())
 
@@ -1726,6 +2632,7 @@ def run_check(
         return
 
     start_time = time.time()
+    instrumentation.start_run(session_id)
     log_pipeline_start(session_id, ayush_name, allopathy_name)
 
     # ── PRE-PIPELINE: Name resolution & whitelist check ────────
@@ -1734,7 +2641,8 @@ def run_check(
         "message": f"Resolving AYUSH drug name: '{ayush_name}'...",
     })
 
-    is_valid, scientific_name, imppat_url, supported_list = resolve_and_validate_ayush_drug(ayush_name)
+    with instrumentation.phase(session_id, "name_resolution"):
+        is_valid, scientific_name, imppat_url, supported_list = resolve_and_validate_ayush_drug(ayush_name)
 
     if not is_valid:
         supported_str = "\n• ".join(supported_list) if supported_list else "(none configured)"
@@ -1749,6 +2657,7 @@ def run_check(
             "message": error_msg,
             "supported_drugs": supported_list,
         })
+        instrumentation.finish_run(session_id, "rejected")
         yield ("error", {
             "message": error_msg,
             "supported_drugs": supported_list,
@@ -1777,7 +2686,10 @@ def run_check(
             scientific_name=scientific_name,
             imppat_url=imppat_url,
             session_id=session_id,
+            trace_types=trace_types,
         ):
+            if event[0] == "done":
+                event[1]["timings"] = instrumentation.finish_run(session_id, "success")
             yield event
 
         duration_ms = int((time.time() - start_time) * 1000)
@@ -1786,5 +2698,10 @@ def run_check(
     except Exception as e:
         logger.exception("Pipeline error")
         duration_ms = int((time.time() - start_time) * 1000)
+        instrumentation.finish_run(session_id, "error")
         log_pipeline_error(session_id, type(e).__name__, str(e))
         yield ("error", {"message": f"Pipeline error: {str(e)}"})
+    finally:
+        # No-op once finished; closes runs whose consumer stopped iterating
+        instrumentation.finish_run(session_id, "abandoned")
+        checkpoints.release(session_id)
@@ -0,0 +1,205 @@
+"""Crash-safe pipeline checkpoints.
+
+Every completed agent call in run_comas_pipeline (Planner, each proposer,
+pre-evaluation re-runs, Reasoning) is journaled under the canonical
+interaction key with a hash of its prompt, and each scored iteration is
+recorded. A later run for the same pair - typically the client's retry after
+a worker restart - loads the journal and serves every call whose prompt
+matches from it instead of Bedrock. The deterministic steps in between
+re-derive the same state, so the run continues from where the interrupted
+one stopped. A prompt that differs (new evidence, changed config) simply
+misses and the agent is invoked as usual.
+
+Only runs that are no longer live are resumed. Runs in this process are
+tracked directly; with the postgres store each live run also refreshes a
+"live" heartbeat row every CHECKPOINT_HEARTBEAT_SECONDS, and a run whose
+heartbeat is older than three intervals counts as interrupted. Concurrent
+runs for the same pair (another verbosity, say) thus never share steps. A
+finished run deletes its own rows and those of the runs it resumed from.
+
+CHECKPOINT_MODE: off | memory (process-local; benches and single-worker
+dev) | postgres (pipeline_checkpoints table, survives restarts).
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Optional
+
+from app.config import CHECKPOINT_MODE, CHECKPOINT_TTL_SECONDS, CHECKPOINT_HEARTBEAT_SECONDS
+from app import db, instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Runs in flight in this process: session_id -> interaction key
+_live: dict = {}
+_live_lock = threading.Lock()
+
+
+def interaction_key(scientific_name: str, allopathy_name: str) -> str:
+    return f"{scientific_name.lower().strip()}#{allopathy_name.lower().strip()}"
+
+
+def _sha(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class MemoryStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: dict = {}
+
+    def load(self, key: str) -> list:
+        cutoff = time.time() - CHECKPOINT_TTL_SECONDS
+        with self._lock:
+            return [dict(r) for r in self._rows.get(key, {}).values() if r["created_at"] > cutoff]
+
+    def save(self, key: str, row: dict) -> None:
+        with self._lock:
+            self._rows.setdefault(key, {})[(row["session_id"], row["step"], row["prompt_sha"])] = {
+                **row, "created_at": time.time(),
+            }
+
+    def clear(self, key: str, session_ids) -> None:
+        with self._lock:
+            rows = self._rows.get(key, {})
+            for k in [k for k in rows if k[0] in session_ids]:
+                del rows[k]
+            if not rows:
+                self._rows.pop(key, None)
+
+    def heartbeat(self, key: str, session_id: str) -> None:
+        pass  # process-local: _live is the whole truth
+
+
+class PostgresStore:
+    def __init__(self):
+        threading.Thread(target=self._heartbeats, daemon=True, name="checkpoint-heartbeat").start()
+
+    def load(self, key: str) -> list:
+        return db.load_checkpoints(key, CHECKPOINT_TTL_SECONDS, 3 * CHECKPOINT_HEARTBEAT_SECONDS)
+
+    def save(self, key: str, row: dict) -> None:
+        db.save_checkpoint(key, row["session_id"], row["iteration"], row["step"],
+                           row["prompt_sha"], row["payload"])
+
+    def clear(self, key: str, session_ids) -> None:
+        db.clear_checkpoints(key, list(session_ids))
+
+    def heartbeat(self, key: str, session_id: str) -> None:
+        db.save_checkpoint(key, session_id, 0, "live", "", {})
+
+    def _heartbeats(self) -> None:
+        while True:
+            time.sleep(CHECKPOINT_HEARTBEAT_SECONDS)
+            with _live_lock:
+                live = list(_live.items())
+            for session_id, key in live:
+                try:
+                    self.heartbeat(key, session_id)
+                except Exception as e:
+                    logger.warning(f"Checkpoint heartbeat failed for {key}: {e}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The configured checkpoint store, or None when CHECKPOINT_MODE is off."""
+    global _store
+    if CHECKPOINT_MODE not in ("memory", "postgres"):
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = MemoryStore() if CHECKPOINT_MODE == "memory" else PostgresStore()
+        return _store
+
+
+class RunCheckpoints:
+    """One pipeline run's view of the journal: lookups, saves and resume stats."""
+
+    def __init__(self, key: str, session_id: str, store=None):
+        self.key = key
+        self.session_id = session_id
+        self.store = store if store is not None else get_store()
+        self._lock = threading.Lock()
+        self._entries: dict = {}
+        self.completed_iterations = 0
+        self.restored: list = []
+        self.resumed_from: set = set()
+        self.saved = 0
+        if self.store is None:
+            return
+        with _live_lock:
+            _live[session_id] = key
+            local = set(_live)
+        try:
+            self.store.heartbeat(key, session_id)
+            rows = self.store.load(key)
+        except Exception as e:
+            logger.warning(f"Checkpoint load failed for {key}: {e}")
+            rows = []
+        for row in rows:
+            if row["session_id"] in local:
+                continue
+            self._entries[(row["step"], row["prompt_sha"])] = row
+            if row["step"] == "score":
+                self.completed_iterations = max(self.completed_iterations, row["iteration"])
+
+    @property
+    def available(self) -> int:
+        """Agent-call checkpoints loaded from interrupted runs."""
+        return sum(1 for step, _ in self._entries if step != "score")
+
+    def lookup(self, step: str, iteration: int, prompt: str) -> Optional[dict]:
+        row = self._entries.get((step, _sha(prompt)))
+        if row is None:
+            return None
+        payload = row["payload"]
+        with self._lock:
+            self.restored.append({"step": step, "iteration": iteration,
+                                  "seconds": payload.get("seconds", 0.0)})
+            self.resumed_from.add(row["session_id"])
+        instrumentation.count("ausadhi_checkpoint_restores_total",
+                              "Agent calls served from a pipeline checkpoint", step=step.split(":")[0])
+        return payload
+
+    def save(self, step: str, iteration: int, prompt: str, payload: dict) -> None:
+        if self.store is None:
+            return
+        row = {"session_id": self.session_id, "iteration": iteration, "step": step,
+               "prompt_sha": _sha(prompt), "payload": payload}
+        try:
+            self.store.save(self.key, row)
+        except Exception as e:
+            logger.warning(f"Checkpoint save failed for {self.key}/{step}: {e}")
+            return
+        with self._lock:
+            self.saved += 1
+
+    def finish(self) -> None:
+        if self.store is None:
+            return
+        release(self.session_id)
+        with self._lock:
+            sessions = {self.session_id} | self.resumed_from
+        try:
+            self.store.clear(self.key, sessions)
+        except Exception as e:
+            logger.warning(f"Checkpoint clear failed for {self.key}: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "resumed_from": sorted(self.resumed_from),
+                "restored": list(self.restored),
+                "saved": self.saved,
+                "bedrock_seconds_saved": round(sum(r["seconds"] for r in self.restored), 2),
+            }
+
+
+def release(session_id: str) -> None:
+    """Stop treating a run as live (no-op once finished); its rows become resumable."""
+    with _live_lock:
+        _live.pop(session_id, None)
@@ -8,6 +8,8 @@ import logging
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+from app.config import AGENT_CLIENT_MODE
+
 logger = logging.getLogger(__name__)
 
 LOG_GROUP = "/aws/bedrock/ausadhi-mitra-pipeline-logs"
@@ -28,6 +30,9 @@ def _put_log_event(stream_name: str, message: dict):
     """Write a log event to CloudWatch with sequence token handling."""
     global _sequence_tokens
 
+    if AGENT_CLIENT_MODE == "replay":
+        return  # offline replay makes no AWS calls
+
     try:
         client = _get_client()
         event = {
@@ -30,6 +30,10 @@ DB_NAME = os.environ.get("DB_NAME", "aushadhimitra")
 DB_USER = os.environ.get("DB_USER", "")
 DB_PASSWORD = os.environ.get("DB_PASSWORD", "")
 DB_SSL = os.environ.get("DB_SSL", "require")
+# Connections per worker process. A request that finds them all in use waits
+# up to DB_POOL_TIMEOUT seconds for one instead of failing.
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))
 
 # ── CO-MAS Pipeline Config ────────────────────────────────────
 # Max iterations for the plan-research-reason-validate loop
@@ -46,3 +50,124 @@ AGENT_RETRY_BASE_WAIT = int(os.environ.get("AGENT_RETRY_BASE_WAIT", "3"))
 # Max characters for drug name inputs
 INPUT_MAX_LENGTH = int(os.environ.get("INPUT_MAX_LENGTH", "200"))
 INPUT_MIN_LENGTH = int(os.environ.get("INPUT_MIN_LENGTH", "2"))
+
+# ── Proposer Output Cache ────────────────────────────────────
+# Per-drug AYUSH / Allopathy agent output reused across sessions so repeat
+# pairings (e.g. warfarin with every herb) skip the proposer agent call.
+PROPOSER_CACHE_ENABLED = os.environ.get("PROPOSER_CACHE_ENABLED", "true").lower() == "true"
+PROPOSER_CACHE_TTL_SECONDS = int(os.environ.get("PROPOSER_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# In-memory entries per worker (least recently used evicted); PostgreSQL keeps the rest
+PROPOSER_CACHE_MAX_ENTRIES = int(os.environ.get("PROPOSER_CACHE_MAX_ENTRIES", "256"))
+
+# ── Source Normalization ─────────────────────────────────────
+# Deduplicated, ranked sources forwarded to the Reasoning prompt / kept in the result
+MAX_REASONING_SOURCES = int(os.environ.get("MAX_REASONING_SOURCES", "8"))
+MAX_RESULT_SOURCES = int(os.environ.get("MAX_RESULT_SOURCES", "20"))
+
+# ── Evidence Packing ─────────────────────────────────────────
+# Proposer output is parsed into typed facts, ranked against open scorer gaps
+# and packed into this many (estimated) tokens for the Reasoning prompt.
+# Off by default (fixed 2000-char truncation per proposer) until packed and
+# truncated prompts are compared on recorded runs (scripts/eval_evidence_packing.py).
+REASONING_EVIDENCE_PACKING = os.environ.get("REASONING_EVIDENCE_PACKING", "false").lower() == "true"
+REASONING_EVIDENCE_TOKEN_BUDGET = int(os.environ.get("REASONING_EVIDENCE_TOKEN_BUDGET", "1200"))
+
+# Iterations 2+: skip the Reasoning agent when no material facts are new, or
+# send only the new facts as an update prompt (requires evidence packing).
+REASONING_INCREMENTAL = os.environ.get("REASONING_INCREMENTAL", "true").lower() == "true"
+
+# ── Pre-evaluation ───────────────────────────────────────────
+# Predict the scorer result from raw proposer output (phytochemicals, CYP
+# pathway, >= 2 sources, mechanisms) before the Reasoning agent runs; a
+# predicted failure triggers up to PRE_EVAL_MAX_RERUNS rounds of targeted
+# proposer re-runs first.
+PRE_EVAL_ENABLED = os.environ.get("PRE_EVAL_ENABLED", "true").lower() == "true"
+PRE_EVAL_MAX_RERUNS = int(os.environ.get("PRE_EVAL_MAX_RERUNS", "1"))
+
+# ── Speculative Proposers ────────────────────────────────────
+# Iteration-1 proposer prompts do not depend on the plan, so these proposers
+# (comma-separated: ayush,allopathy,research) start alongside the Planner; one
+# the plan skips is cancelled. Empty = wait for the plan (previous behaviour).
+SPECULATIVE_PROPOSERS = tuple(
+    k.strip() for k in os.environ.get("SPECULATIVE_PROPOSERS", "").lower().split(",") if k.strip()
+)
+
+# ── Hedged Proposers ─────────────────────────────────────────
+# Proposers (comma list; empty = off) that get a duplicate invocation when
+# still running after HEDGE_PERCENTILE of their recent latency (needs
+# HEDGE_MIN_SAMPLES in-process samples). Hedges are capped at
+# HEDGE_BUDGET_RATIO of invocations and paused HEDGE_THROTTLE_COOLDOWN
+# seconds after any Bedrock throttle.
+HEDGE_AGENTS = tuple(
+    k.strip() for k in os.environ.get("HEDGE_AGENTS", "").lower().split(",") if k.strip()
+)
+HEDGE_PERCENTILE = float(os.environ.get("HEDGE_PERCENTILE", "90"))
+HEDGE_MIN_SAMPLES = int(os.environ.get("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_BUDGET_RATIO = float(os.environ.get("HEDGE_BUDGET_RATIO", "0.1"))
+HEDGE_THROTTLE_COOLDOWN = float(os.environ.get("HEDGE_THROTTLE_COOLDOWN", "60"))
+
+# ── Pipelined Evaluator ──────────────────────────────────────
+# Start the Reasoning agent (and send a provisional severity) as soon as the
+# AYUSH / Allopathy proposers finish; Research evidence that arrives later is
+# folded in with a short incremental update. Requires evidence packing.
+PIPELINED_EVALUATOR = os.environ.get("PIPELINED_EVALUATOR", "false").lower() == "true"
+
+# ── Answer Streaming ─────────────────────────────────────────
+# Stream the Reasoning agent's answer (Bedrock streamFinalResponse) as
+# llm_delta events, with top-level JSON fields reported as they complete.
+# WebSocket clients also opt in per connection with ?deltas=1.
+REASONING_STREAM_DELTAS = os.environ.get("REASONING_STREAM_DELTAS", "false").lower() == "true"
+
+# ── Pipeline Checkpoints ─────────────────────────────────────
+# Journal each completed agent call so a retried run for the same pair
+# resumes instead of paying for them again (see app/checkpoints.py).
+# off | memory (process-local) | postgres (pipeline_checkpoints table)
+CHECKPOINT_MODE = os.environ.get("CHECKPOINT_MODE", "off").lower()
+CHECKPOINT_TTL_SECONDS = int(os.environ.get("CHECKPOINT_TTL_SECONDS", "3600"))
+# Live runs refresh a heartbeat row this often; a run silent for three
+# heartbeats is treated as interrupted (resumable by other workers)
+CHECKPOINT_HEARTBEAT_SECONDS = int(os.environ.get("CHECKPOINT_HEARTBEAT_SECONDS", "10"))
+
+# ── Session Event Bus ────────────────────────────────────────
+# How pipeline events reach /ws/{session_id} (see app/event_bus.py).
+# "local": in-process (single worker); "postgres": session_events table +
+# LISTEN/NOTIFY, so POST /api/check and the WebSocket may hit different workers
+EVENT_BUS = os.environ.get("EVENT_BUS", "local").lower()
+EVENT_BUS_TTL_SECONDS = int(os.environ.get("EVENT_BUS_TTL_SECONDS", "900"))
+EVENT_BUS_MAX_EVENTS = int(os.environ.get("EVENT_BUS_MAX_EVENTS", "5000"))
+# Per-session retained bytes (serialized) and sessions per worker; sessions
+# no WebSocket ever read are dropped after EVENT_BUS_UNCLAIMED_TTL_SECONDS
+EVENT_BUS_MAX_BYTES = int(os.environ.get("EVENT_BUS_MAX_BYTES", str(4 * 1024 * 1024)))
+EVENT_BUS_MAX_SESSIONS = int(os.environ.get("EVENT_BUS_MAX_SESSIONS", "1000"))
+EVENT_BUS_UNCLAIMED_TTL_SECONDS = int(os.environ.get("EVENT_BUS_UNCLAIMED_TTL_SECONDS", "300"))
+EVENT_BUS_REAP_SECONDS = int(os.environ.get("EVENT_BUS_REAP_SECONDS", "30"))
+# EVENT_BUS=postgres: the bus's own connection pool, so WebSocket polls and
+# event writes never starve (or are starved by) the rest of the backend
+EVENT_BUS_DB_POOL_MAX = int(os.environ.get("EVENT_BUS_DB_POOL_MAX", "8"))
+
+# ── WebSocket Sender ─────────────────────────────────────────
+# Outbound buffer per connection (app/ws_sender.py): past WS_SEND_BUFFER queued
+# events, trace events for a slow client are coalesced or dropped. Clients
+# connecting with ?batch=1 get the events of each WS_BATCH_WINDOW_MS in one frame.
+WS_SEND_BUFFER = int(os.environ.get("WS_SEND_BUFFER", "256"))
+WS_BATCH_WINDOW_MS = float(os.environ.get("WS_BATCH_WINDOW_MS", "25"))
+
+# ── Reasoning Tools ──────────────────────────────────────────
+# "local": run severity / compile in-process from lambda/shared/reasoning_core.py
+# "remote": invoke the reasoning_tools Lambda (previous behaviour)
+REASONING_TOOLS_MODE = os.environ.get("REASONING_TOOLS_MODE", "local").lower()
+REASONING_TOOLS_LAMBDA = os.environ.get("REASONING_TOOLS_LAMBDA", "ausadhi-reasoning-tools")
+
+# ── Readiness ────────────────────────────────────────────────
+# /api/health/ready answers 503 once this worker carries this many in-flight
+# pipelines or open WebSocket streams, or its DB pool is exhausted
+READY_MAX_PIPELINES = int(os.environ.get("READY_MAX_PIPELINES", "8"))
+READY_MAX_SESSIONS = int(os.environ.get("READY_MAX_SESSIONS", "64"))
+
+# ── Agent Client Mode ────────────────────────────────────────
+# "live": boto3 clients; "record": boto3 + write every agent stream / Lambda
+# payload to AGENT_FIXTURE_DIR; "replay": serve calls from those fixtures
+# (no AWS), with recorded timing divided by AGENT_REPLAY_SPEED (0 = no delay)
+AGENT_CLIENT_MODE = os.environ.get("AGENT_CLIENT_MODE", "live").lower()
+AGENT_FIXTURE_DIR = os.environ.get("AGENT_FIXTURE_DIR", "fixtures/agent_streams")
+AGENT_REPLAY_SPEED = float(os.environ.get("AGENT_REPLAY_SPEED", "1.0"))
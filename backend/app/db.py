@@ -1,6 +1,7 @@
 """PostgreSQL connection pool and helpers for the FastAPI backend."""
 import json
 import logging
+import threading
 from datetime import datetime, date
 from contextlib import contextmanager
 from typing import Optional
@@ -9,30 +10,88 @@ import psycopg2
 import psycopg2.extras
 import psycopg2.pool
 
-from app.config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD, DB_SSL
+from app.config import (
+    DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD, DB_SSL,
+    DB_POOL_MAX, DB_POOL_TIMEOUT, EVENT_BUS_DB_POOL_MAX,
+)
 
 logger = logging.getLogger(__name__)
 
-_pool = None
+_pools: dict = {}
+_pools_lock = threading.Lock()
 
+# Named pools: "main" for request handlers and the pipeline, "event_bus" for
+# the postgres session event bus
+_POOL_SIZES = {"main": DB_POOL_MAX, "event_bus": EVENT_BUS_DB_POOL_MAX}
+
+
+class _BlockingPool(psycopg2.pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool whose getconn waits for a free connection.
+
+    psycopg2 raises PoolError as soon as maxconn connections are out; here a
+    caller waits up to DB_POOL_TIMEOUT seconds before getting that error.
+    """
+
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        self._slots = threading.BoundedSemaphore(maxconn)
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        if not self._slots.acquire(timeout=DB_POOL_TIMEOUT):
+            raise psycopg2.pool.PoolError(f"no connection free after {DB_POOL_TIMEOUT:g}s")
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._slots.release()
+
+
+def get_pool(name: str = "main"):
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = _BlockingPool(
+                minconn=1, maxconn=_POOL_SIZES[name],
+                host=DB_HOST, port=DB_PORT, dbname=DB_NAME,
+                user=DB_USER, password=DB_PASSWORD, sslmode=DB_SSL,
+                cursor_factory=psycopg2.extras.RealDictCursor,
+                connect_timeout=5,  # 5 second timeout
+                options="-c statement_timeout=5000",
+            )
+        return _pools[name]
+
+
+def pool_stats() -> Optional[dict]:
+    """Main connection pool usage without touching the database; None before first use."""
+    pool = _pools.get("main")
+    if pool is None:
+        return None
+    return {
+        "in_use": len(getattr(pool, "_used", {})),
+        "idle": len(getattr(pool, "_pool", [])),
+        "max": pool.maxconn,
+    }
 
-def get_pool():
-    global _pool
-    if _pool is None:
-        _pool = psycopg2.pool.ThreadedConnectionPool(
-            minconn=1, maxconn=5,
-            host=DB_HOST, port=DB_PORT, dbname=DB_NAME,
-            user=DB_USER, password=DB_PASSWORD, sslmode=DB_SSL,
-            cursor_factory=psycopg2.extras.RealDictCursor,
-            connect_timeout=5,  # 5 second timeout
-            options="-c statement_timeout=5000",
-        )
-    return _pool
+
+def dedicated_conn():
+    """An autocommit connection outside the pool, for long-lived LISTEN sessions."""
+    conn = psycopg2.connect(
+        host=DB_HOST, port=DB_PORT, dbname=DB_NAME,
+        user=DB_USER, password=DB_PASSWORD, sslmode=DB_SSL,
+        connect_timeout=5,
+    )
+    conn.autocommit = True
+    return conn
 
 
 @contextmanager
-def get_conn():
-    pool = get_pool()
+def get_conn(pool_name: str = "main"):
+    pool = get_pool(pool_name)
     conn = pool.getconn()
     try:
         yield conn
@@ -50,22 +109,75 @@ def _serialize(obj):
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
-def lookup_curated(ayush: str, allopathy: str) -> Optional[dict]:
+# Column lists for curated_interactions lookups. response_data is stored
+# without the knowledge graph (it lives in its own column); "full" merges it
+# back so callers still get one document, "summary" never reads the graph or
+# the bulk of response_data, "graph" reads only the graph.
+CURATED_PROJECTIONS = {
+    "summary": """interaction_key, ayush_name, allopathy_name, severity, severity_score,
+                  response_data->>'interaction_summary' AS interaction_summary,
+                  response_data->>'evidence_quality' AS evidence_quality,
+                  created_at, updated_at""",
+    "full": """interaction_key, ayush_name, allopathy_name, severity, severity_score,
+               response_data || jsonb_build_object('knowledge_graph',
+                   COALESCE(knowledge_graph, response_data->'knowledge_graph', '{}'::jsonb)) AS response_data,
+               created_at, updated_at""",
+    "graph": """interaction_key,
+                COALESCE(knowledge_graph, response_data->'knowledge_graph', '{}'::jsonb) AS knowledge_graph""",
+}
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, default=_serialize)
+
+
+def lookup_curated(ayush: str, allopathy: str, projection: str = "full") -> Optional[dict]:
+    """Curated interaction by pair; projection is a CURATED_PROJECTIONS key."""
+    columns = CURATED_PROJECTIONS[projection]
     key = f"{ayush.lower().strip()}#{allopathy.lower().strip()}"
     with get_conn() as conn:
         cur = conn.cursor()
-        cur.execute("SELECT * FROM curated_interactions WHERE interaction_key = %s", (key,))
+        cur.execute(f"SELECT {columns} FROM curated_interactions WHERE interaction_key = %s", (key,))
         row = cur.fetchone()
         if row:
             return dict(row)
         cur.execute(
-            "SELECT * FROM curated_interactions WHERE LOWER(ayush_name) LIKE %s AND LOWER(allopathy_name) LIKE %s",
+            f"SELECT {columns} FROM curated_interactions "
+            "WHERE LOWER(ayush_name) LIKE %s AND LOWER(allopathy_name) LIKE %s",
             (f"%{ayush.lower().strip()}%", f"%{allopathy.lower().strip()}%"),
         )
         row = cur.fetchone()
         return dict(row) if row else None
 
 
+def search_curated(severity: Optional[str] = None, phytochemical: Optional[str] = None,
+                   limit: int = 20) -> list:
+    """Summary rows filtered by severity and / or a phytochemical in phytochemicals_involved.
+
+    The phytochemical filter matches plain-string and {"name": ...} entries and
+    is served by idx_curated_phytochemicals_gin.
+    """
+    clauses, params = [], []
+    if severity:
+        clauses.append("severity = %s")
+        params.append(severity.upper())
+    if phytochemical:
+        clauses.append(
+            "((response_data->'phytochemicals_involved') ? %s "
+            "OR (response_data->'phytochemicals_involved') @> %s::jsonb)"
+        )
+        params += [phytochemical, json.dumps([{"name": phytochemical}])]
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            f"SELECT {CURATED_PROJECTIONS['summary']} FROM curated_interactions {where} "
+            "ORDER BY created_at DESC LIMIT %s",
+            (*params, limit),
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+
 def get_sources(interaction_key: str) -> list:
     with get_conn() as conn:
         cur = conn.cursor()
@@ -74,8 +186,13 @@ def get_sources(interaction_key: str) -> list:
 
 
 def save_interaction(data: dict, sources: list):
-    """Save a completed interaction analysis to the curated DB."""
+    """Save a completed interaction analysis to the curated DB.
+
+    The knowledge graph goes to its own column only; lookup_curated merges it
+    back into response_data for the "full" projection.
+    """
     key = data.get("interaction_key", "")
+    response_data = {k: v for k, v in data.items() if k != "knowledge_graph"}
     with get_conn() as conn:
         cur = conn.cursor()
         cur.execute(
@@ -95,8 +212,8 @@ def save_interaction(data: dict, sources: list):
                 data.get("allopathy_name", ""),
                 data.get("severity", ""),
                 data.get("severity_score", 0),
-                json.dumps(data, default=_serialize),
-                json.dumps(data.get("knowledge_graph", {}), default=_serialize),
+                psycopg2.extras.Json(response_data, dumps=_dumps),
+                psycopg2.extras.Json(data.get("knowledge_graph", {}), dumps=_dumps),
             ),
         )
         for src in sources:
@@ -119,8 +236,101 @@ def list_interactions(limit: int = 20) -> list:
     with get_conn() as conn:
         cur = conn.cursor()
         cur.execute(
-            """SELECT interaction_key, ayush_name, allopathy_name, severity, severity_score, created_at
-               FROM curated_interactions ORDER BY created_at DESC LIMIT %s""",
+            f"SELECT {CURATED_PROJECTIONS['summary']} FROM curated_interactions "
+            "ORDER BY created_at DESC LIMIT %s",
             (limit,),
         )
         return [dict(r) for r in cur.fetchall()]
+
+
+def lookup_agent_output(agent_key: str, cache_key: str) -> Optional[dict]:
+    """Fetch a non-expired cached proposer agent output."""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """SELECT agent_key, cache_key, response_text, source_url,
+                      traces_summary, cached_at, expires_at
+               FROM agent_output_cache
+               WHERE agent_key = %s AND cache_key = %s AND expires_at > NOW()""",
+            (agent_key, cache_key),
+        )
+        row = cur.fetchone()
+        return dict(row) if row else None
+
+
+def save_agent_output(agent_key: str, cache_key: str, response_text: str, source_url: str,
+                      traces_summary: list, ttl_seconds: int):
+    """Upsert a proposer agent output with a TTL."""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """INSERT INTO agent_output_cache
+               (agent_key, cache_key, response_text, source_url,
+                traces_summary, cached_at, expires_at)
+               VALUES (%s, %s, %s, %s, %s, NOW(), NOW() + make_interval(secs => %s))
+               ON CONFLICT (agent_key, cache_key) DO UPDATE SET
+                   response_text = EXCLUDED.response_text,
+                   source_url = EXCLUDED.source_url,
+                   traces_summary = EXCLUDED.traces_summary,
+                   cached_at = NOW(),
+                   expires_at = EXCLUDED.expires_at""",
+            (
+                agent_key,
+                cache_key,
+                response_text,
+                source_url,
+                json.dumps(traces_summary, default=_serialize),
+                ttl_seconds,
+            ),
+        )
+
+
+def load_checkpoints(interaction_key: str, ttl_seconds: int, live_seconds: int) -> list:
+    """Pipeline checkpoints of interrupted runs for an interaction, oldest first.
+
+    Runs whose "live" heartbeat row is younger than live_seconds are still
+    in flight somewhere and are left out.
+    """
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """SELECT session_id, iteration, step, prompt_sha, payload, created_at
+               FROM pipeline_checkpoints c
+               WHERE interaction_key = %s AND step <> 'live'
+                 AND created_at > NOW() - make_interval(secs => %s)
+                 AND NOT EXISTS (
+                     SELECT 1 FROM pipeline_checkpoints h
+                     WHERE h.interaction_key = c.interaction_key AND h.session_id = c.session_id
+                       AND h.step = 'live' AND h.created_at > NOW() - make_interval(secs => %s))
+               ORDER BY created_at""",
+            (interaction_key, ttl_seconds, live_seconds),
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+
+def save_checkpoint(interaction_key: str, session_id: str, iteration: int, step: str,
+                    prompt_sha: str, payload: dict):
+    """Upsert one completed pipeline step."""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            """INSERT INTO pipeline_checkpoints
+               (interaction_key, session_id, iteration, step, prompt_sha, payload, created_at)
+               VALUES (%s, %s, %s, %s, %s, %s, NOW())
+               ON CONFLICT (interaction_key, session_id, step, prompt_sha) DO UPDATE SET
+                   iteration = EXCLUDED.iteration,
+                   payload = EXCLUDED.payload,
+                   created_at = NOW()""",
+            (interaction_key, session_id, iteration, step, prompt_sha,
+             json.dumps(payload, default=_serialize)),
+        )
+
+
+def clear_checkpoints(interaction_key: str, session_ids: list):
+    """Drop the checkpoints of a finished run and of the runs it resumed from."""
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "DELETE FROM pipeline_checkpoints WHERE interaction_key = %s AND session_id = ANY(%s)",
+            (interaction_key, list(session_ids)),
+        )
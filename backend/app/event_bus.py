@@ -0,0 +1,445 @@
+"""Session event bus between the pipeline thread and /ws/{session_id}.
+
+POST /api/check creates a session and its pipeline thread publishes events;
+the WebSocket reads them. Both sides go through an EventBus, so with the
+networked implementation they may run on different workers or instances.
+
+Every implementation guarantees, per session:
+  - ordered delivery: events get consecutive sequence numbers from 1;
+  - replay from an offset: read(session_id, after=n) returns the events
+    with seq > n, so a reader can resume where it stopped;
+  - a TTL: sessions (and their events) expire EVENT_BUS_TTL_SECONDS after
+    their last publish or read, and EVENT_BUS_UNCLAIMED_TTL_SECONDS after
+    creation if no reader ever opened them;
+  - bounded retention: at most EVENT_BUS_MAX_EVENTS events and
+    EVENT_BUS_MAX_BYTES serialized bytes per session (oldest evicted
+    first; the newest event and the result-bearing events are never
+    evicted, so a reader may see seq gaps), and EVENT_BUS_MAX_SESSIONS
+    sessions (least recently used evicted first).
+
+A reaper thread started by get_bus() enforces the TTLs every
+EVENT_BUS_REAP_SECONDS; publishing never waits for it.
+
+EVENT_BUS selects the implementation:
+  local     in-process (one uvicorn worker)
+  postgres  session_events table + LISTEN/NOTIFY (N workers / instances)
+
+Events are published by the process running the session's pipeline, so
+that process assigns the sequence numbers.
+"""
+import asyncio
+import bisect
+import logging
+import queue
+import select
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+import psycopg2.extras
+
+from app.config import (
+    EVENT_BUS, EVENT_BUS_TTL_SECONDS, EVENT_BUS_MAX_EVENTS, EVENT_BUS_MAX_BYTES,
+    EVENT_BUS_MAX_SESSIONS, EVENT_BUS_UNCLAIMED_TTL_SECONDS, EVENT_BUS_REAP_SECONDS,
+)
+from app import db, instrumentation
+from app.payloads import dumps
+
+logger = logging.getLogger(__name__)
+
+Event = Tuple[int, str, dict]
+
+NOTIFY_CHANNEL = "ausadhi_session_events"
+
+# Events a reader needs to finish the session; the caps never evict them
+_PINNED = frozenset({"done", "error", "__cached__", "__done__"})
+
+
+class EventBus:
+    def create(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def exists(self, session_id: str) -> bool:
+        raise NotImplementedError
+
+    def publish(self, session_id: str, event_type: str, data: dict) -> int:
+        """Append one event; returns its sequence number."""
+        raise NotImplementedError
+
+    def read(self, session_id: str, after: int = 0, limit: int = 500) -> List[Event]:
+        """Events with seq > after, in order; never blocks on new events."""
+        raise NotImplementedError
+
+    async def aexists(self, session_id: str) -> bool:
+        return self.exists(session_id)
+
+    async def aread(self, session_id: str, after: int = 0, limit: int = 500) -> List[Event]:
+        return self.read(session_id, after, limit)
+
+    def close(self, session_id: str) -> None:
+        """Forget a session whose reader is done with it."""
+        raise NotImplementedError
+
+    def reap(self) -> int:
+        """Drop expired sessions; returns how many were dropped."""
+        raise NotImplementedError
+
+    def session_count(self) -> int:
+        raise NotImplementedError
+
+    def depths(self) -> dict:
+        """Retained events per session known to this process."""
+        raise NotImplementedError
+
+    def retained_bytes(self) -> int:
+        """Serialized size of the events this process retains or has published."""
+        raise NotImplementedError
+
+
+def _reaped(reason: str, n: int = 1) -> None:
+    instrumentation.count("ausadhi_sessions_reaped_total", "Event bus sessions dropped", n, reason=reason)
+
+
+class _LocalSession:
+    __slots__ = ("events", "sizes", "bytes", "next_seq", "created", "accessed", "claimed")
+
+    def __init__(self):
+        self.events: deque = deque()
+        self.sizes: deque = deque()
+        self.bytes = 0
+        self.next_seq = 1
+        self.created = self.accessed = time.monotonic()
+        self.claimed = False
+
+
+class LocalEventBus(EventBus):
+    """In-process session registry: each session's log plus its creation time,
+    last access (publish or read), whether a reader ever claimed it and the
+    serialized size of what it retains."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: dict = {}
+
+    def create(self, session_id: str) -> None:
+        with self._lock:
+            if session_id not in self._sessions and len(self._sessions) >= EVENT_BUS_MAX_SESSIONS:
+                victim = min(self._sessions, key=lambda sid: self._sessions[sid].accessed)
+                del self._sessions[victim]
+                _reaped("capacity")
+            self._sessions.setdefault(session_id, _LocalSession())
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def publish(self, session_id: str, event_type: str, data: dict) -> int:
+        size = len(dumps(data))
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return 0
+            seq = session.next_seq
+            session.next_seq += 1
+            session.events.append((seq, event_type, data))
+            session.sizes.append(size)
+            session.bytes += size
+            session.accessed = time.monotonic()
+            evicted = 0
+            i = 0
+            while i < len(session.events) - 1 and (
+                    len(session.events) > EVENT_BUS_MAX_EVENTS or session.bytes > EVENT_BUS_MAX_BYTES):
+                if session.events[i][1] in _PINNED:
+                    i += 1
+                    continue
+                del session.events[i]
+                session.bytes -= session.sizes[i]
+                del session.sizes[i]
+                evicted += 1
+        if evicted:
+            instrumentation.count("ausadhi_event_bus_evictions_total",
+                                  "Events evicted by the per-session caps", n=evicted)
+        return seq
+
+    def read(self, session_id: str, after: int = 0, limit: int = 500) -> List[Event]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            session.accessed = time.monotonic()
+            session.claimed = True
+            if not session.events or session.events[-1][0] <= after:
+                return []
+            start = bisect.bisect_right(session.events, after, key=lambda e: e[0])
+            return [session.events[i] for i in range(start, min(len(session.events), start + limit))]
+
+    def close(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def reap(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            idle = [sid for sid, s in self._sessions.items() if s.accessed < now - EVENT_BUS_TTL_SECONDS]
+            unclaimed = [sid for sid, s in self._sessions.items()
+                         if not s.claimed and s.created < now - EVENT_BUS_UNCLAIMED_TTL_SECONDS
+                         and sid not in idle]
+            for sid in idle + unclaimed:
+                del self._sessions[sid]
+        if idle:
+            _reaped("ttl", len(idle))
+        if unclaimed:
+            _reaped("unclaimed", len(unclaimed))
+        return len(idle) + len(unclaimed)
+
+    def session_count(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def depths(self) -> dict:
+        with self._lock:
+            return {sid: len(s.events) for sid, s in self._sessions.items()}
+
+    def retained_bytes(self) -> int:
+        with self._lock:
+            return sum(s.bytes for s in self._sessions.values())
+
+
+class PostgresEventBus(EventBus):
+    """session_events rows + NOTIFY '<session_id>:<seq>' after each batch.
+
+    Publishes are queued and written by one thread per process in small
+    batches (one INSERT + one NOTIFY per batch), so the pipeline thread
+    never waits on the database. A LISTEN thread tracks the newest seq per
+    session, letting read() skip the query while nothing new has arrived;
+    it re-queries at least once a second in case a notification was missed.
+    create() writes an "__open__" event (seq 1) so other workers can tell
+    the session exists; rows are purged by age, not by close(). The
+    per-session caps are not enforced on rows: their volume is bounded by
+    EVENT_BUS_TTL_SECONDS. reap() drops this process's bookkeeping for
+    sessions idle past that TTL, except the sequence counter of a session
+    this process is still publishing to (no "__done__" yet), which
+    must not restart at 1. A failed batch is retried with backoff, so a
+    database blip does not lose a session's final events. The writer and
+    the LISTEN thread hold a connection each; reads go through the bus's own
+    pool (EVENT_BUS_DB_POOL_MAX), apart from the one request handlers and
+    the pipeline share.
+    """
+
+    _FLUSH_INTERVAL = 0.02
+    _REQUERY_INTERVAL = 1.0
+    _WRITE_ATTEMPTS = 8
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_seq: dict = {}
+        self._latest: dict = {}
+        self._last_query: dict = {}
+        self._touched: dict = {}
+        self._bytes: dict = {}
+        self._publishing: set = set()
+        self._outbox: queue.Queue = queue.Queue()
+        self._last_purge = 0.0
+        threading.Thread(target=self._writer, daemon=True, name="event-bus-writer").start()
+        threading.Thread(target=self._listener, daemon=True, name="event-bus-listener").start()
+
+    # ── writer ──
+    def _writer(self) -> None:
+        # The writer keeps a connection of its own: waiting on the pool behind
+        # WebSocket reads would hold back every session's events
+        conn = None
+        batch, attempts = [], 0
+        while True:
+            if not batch:
+                batch.append(self._outbox.get())
+            time.sleep(self._FLUSH_INTERVAL if not attempts else min(0.1 * 2 ** attempts, 5.0))
+            while True:
+                try:
+                    batch.append(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if conn is None or conn.closed:
+                    conn = db.dedicated_conn()
+                    conn.autocommit = False
+                self._write(conn, batch)
+                instrumentation.count("ausadhi_event_bus_batches_total", "Event bus write batches")
+                batch, attempts = [], 0
+            except Exception as e:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    conn = None
+                # Keep the batch (and whatever arrives meanwhile) for the next
+                # attempt; ON CONFLICT makes a partly applied retry harmless
+                attempts += 1
+                if attempts < self._WRITE_ATTEMPTS:
+                    logger.warning(f"Event bus write of {len(batch)} events failed (attempt {attempts}): {e}")
+                    continue
+                logger.error(f"Event bus write of {len(batch)} events failed {attempts} times, dropping: {e}")
+                instrumentation.count("ausadhi_event_bus_dropped_events_total",
+                                      "Events the event bus could not write", n=len(batch))
+                batch, attempts = [], 0
+
+    def _write(self, conn, batch: list) -> None:
+        """One transaction: the batch's rows, then a NOTIFY per session (delivered on commit)."""
+        with conn.cursor() as cur:
+            # One statement per batch (executemany is a round trip per row)
+            psycopg2.extras.execute_values(
+                cur,
+                """INSERT INTO session_events (session_id, seq, event_type, data, created_at)
+                   VALUES %s ON CONFLICT (session_id, seq) DO NOTHING""",
+                batch,
+                template="(%s, %s, %s, %s::jsonb, NOW())",
+                page_size=1000,
+            )
+            latest = {}
+            for session_id, seq, _, _ in batch:
+                latest[session_id] = max(seq, latest.get(session_id, 0))
+            cur.execute("SELECT pg_notify(%s, note) FROM unnest(%s::text[]) AS note",
+                        (NOTIFY_CHANNEL, [f"{sid}:{seq}" for sid, seq in latest.items()]))
+            if time.monotonic() - self._last_purge > 60:
+                self._last_purge = time.monotonic()
+                cur.execute(
+                    "DELETE FROM session_events WHERE created_at < NOW() - make_interval(secs => %s)",
+                    (EVENT_BUS_TTL_SECONDS,),
+                )
+        conn.commit()
+
+    # ── listener ──
+    def _listener(self) -> None:
+        while True:
+            conn = None
+            try:
+                conn = db.dedicated_conn()
+                conn.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+                while True:
+                    if select.select([conn], [], [], 5.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        session_id, _, seq = note.payload.rpartition(":")
+                        with self._lock:
+                            self._latest[session_id] = max(int(seq), self._latest.get(session_id, 0))
+            except Exception as e:
+                logger.warning(f"Event bus listener reconnecting: {e}")
+                time.sleep(1.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def create(self, session_id: str) -> None:
+        with self._lock:
+            self._next_seq.setdefault(session_id, 1)
+        self.publish(session_id, "__open__", {})
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id in self._next_seq or self._latest.get(session_id):
+                return True
+        with db.get_conn("event_bus") as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT 1 FROM session_events WHERE session_id = %s LIMIT 1", (session_id,))
+            return cur.fetchone() is not None
+
+    def publish(self, session_id: str, event_type: str, data: dict) -> int:
+        payload = dumps(data)
+        with self._lock:
+            seq = self._next_seq.get(session_id, 1)
+            self._next_seq[session_id] = seq + 1
+            # "__done__" is always the last event the pipeline publishes
+            if event_type == "__done__":
+                self._publishing.discard(session_id)
+            else:
+                self._publishing.add(session_id)
+            self._touched[session_id] = time.monotonic()
+            self._bytes[session_id] = self._bytes.get(session_id, 0) + len(payload)
+        self._outbox.put((session_id, seq, event_type, payload))
+        return seq
+
+    def read(self, session_id: str, after: int = 0, limit: int = 500) -> List[Event]:
+        now = time.monotonic()
+        with self._lock:
+            known = self._latest.get(session_id, 0)
+            if known <= after and now - self._last_query.get(session_id, 0.0) < self._REQUERY_INTERVAL:
+                return []
+            self._last_query[session_id] = now
+            self._touched[session_id] = now
+        with db.get_conn("event_bus") as conn:
+            cur = conn.cursor()
+            cur.execute(
+                """SELECT seq, event_type, data FROM session_events
+                   WHERE session_id = %s AND seq > %s ORDER BY seq LIMIT %s""",
+                (session_id, after, limit),
+            )
+            return [(r["seq"], r["event_type"], r["data"]) for r in cur.fetchall()]
+
+    async def aexists(self, session_id: str) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(None, self.exists, session_id)
+
+    async def aread(self, session_id: str, after: int = 0, limit: int = 500) -> List[Event]:
+        with self._lock:
+            if self._latest.get(session_id, 0) <= after and \
+                    time.monotonic() - self._last_query.get(session_id, 0.0) < self._REQUERY_INTERVAL:
+                return []
+        return await asyncio.get_running_loop().run_in_executor(None, self.read, session_id, after, limit)
+
+    def close(self, session_id: str) -> None:
+        with self._lock:
+            self._forget(session_id)
+
+    def _forget(self, session_id: str) -> None:
+        for state in (self._latest, self._last_query, self._touched, self._bytes):
+            state.pop(session_id, None)
+        if session_id not in self._publishing:
+            self._next_seq.pop(session_id, None)
+
+    def reap(self) -> int:
+        cutoff = time.monotonic() - EVENT_BUS_TTL_SECONDS
+        with self._lock:
+            # _latest also collects notifications for sessions read elsewhere
+            idle = [sid for sid in set(self._touched) | set(self._latest)
+                    if self._touched.get(sid, 0.0) < cutoff]
+            for sid in idle:
+                self._forget(sid)
+        if idle:
+            _reaped("ttl", len(idle))
+        return len(idle)
+
+    def session_count(self) -> int:
+        with self._lock:
+            return len(self._next_seq)
+
+    def depths(self) -> dict:
+        with self._lock:
+            return {sid: seq - 1 for sid, seq in self._next_seq.items()}
+
+    def retained_bytes(self) -> int:
+        with self._lock:
+            return sum(self._bytes.values())
+
+
+_bus: Optional[EventBus] = None
+_bus_lock = threading.Lock()
+
+
+def _reaper(bus: EventBus) -> None:
+    while True:
+        time.sleep(EVENT_BUS_REAP_SECONDS)
+        try:
+            bus.reap()
+        except Exception as e:
+            logger.warning(f"Event bus reap failed: {e}")
+
+
+def get_bus() -> EventBus:
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = PostgresEventBus() if EVENT_BUS == "postgres" else LocalEventBus()
+            threading.Thread(target=_reaper, args=(_bus,), daemon=True, name="event-bus-reaper").start()
+        return _bus
@@ -0,0 +1,582 @@
+"""Evidence packing for the Reasoning prompt.
+
+Proposer responses (AYUSH, Allopathy, Research) arrive as free text, JSON or a
+mix of both. Rather than forwarding the first 2000 characters of each — which
+cuts JSON mid-object and keeps preamble while dropping later findings — this
+module parses them into typed facts, dedupes them across agents, ranks them
+against the scorer's open gaps and packs the best ones into a token budget.
+
+Fact dicts carry:
+  type    one of FACT_TYPES
+  text    prompt-ready text
+  key     dedupe key (same key → same fact)
+  agents  agents that reported it
+  weight  extraction confidence (structured JSON > sentence heuristics)
+"""
+import json
+import re
+import hashlib
+from typing import List, Optional
+
+FACT_TYPES = [
+    "phytochemical",
+    "cyp_effect",
+    "nti",
+    "pk_mechanism",
+    "pd_mechanism",
+    "source",
+    "finding",
+]
+
+_SECTION_TITLES = {
+    "phytochemical": "Phytochemicals",
+    "cyp_effect": "CYP450 effects",
+    "nti": "Narrow therapeutic index",
+    "pk_mechanism": "Pharmacokinetic mechanisms",
+    "pd_mechanism": "Pharmacodynamic mechanisms",
+    "source": "Sources",
+    "finding": "Other findings",
+}
+
+# Base relevance before gap boosts
+_TYPE_PRIORITY = {
+    "cyp_effect": 1.0,
+    "nti": 1.0,
+    "phytochemical": 0.9,
+    "pk_mechanism": 0.85,
+    "pd_mechanism": 0.85,
+    "source": 0.7,
+    "finding": 0.4,
+}
+
+# Scorer gap keyword → fact types that help close it
+_GAP_HINTS = [
+    ("phytochemical", ("phytochemical", "cyp_effect")),
+    ("cyp", ("cyp_effect",)),
+    ("severity", ("cyp_effect", "nti", "pd_mechanism")),
+    ("nti", ("nti",)),
+    ("source", ("source", "finding")),
+    ("pubmed", ("source", "finding")),
+    ("clinical", ("source", "finding", "pd_mechanism")),
+    ("mechanism", ("pk_mechanism", "pd_mechanism")),
+    ("pharmacokinetic", ("pk_mechanism",)),
+    ("pharmacodynamic", ("pd_mechanism",)),
+    ("admet", ("pk_mechanism", "cyp_effect")),
+    ("knowledge graph", ("cyp_effect", "pk_mechanism")),
+    ("reasoning chain", ("pk_mechanism", "pd_mechanism", "finding")),
+    ("summary", ("pd_mechanism", "finding")),
+]
+_GAP_BOOST = 0.5
+_MAX_FACT_CHARS = 240
+
+_CYP_RE = re.compile(r'\bCYP\s?\d{1,2}[A-Z]\d{0,2}\b', re.I)
+_NTI_RE = re.compile(r'narrow[\s-]+therapeutic[\s-]+(?:index|window|range)|\bNTI\b', re.I)
+_NEGATION_RE = re.compile(r"\b(?:not|no|isn't|is not|non)\b", re.I)
+# Fallback when no IMPPAT list is at hand: endings specific to phytochemical
+# classes (curcuminoids, flavonols, withanolides, glycosides, alkaloids ...).
+# Generic endings such as -ine / -ol / -in also match ordinary words and drugs.
+_PHYTO_SUFFIX_RE = re.compile(
+    r'\b[a-z]{3,}(?:umin|etin|igenin|aferin|anolides?|osides?|erine|inoids?|enoids?|'
+    r'alkaloids?|saponins?|tannins?)\b',
+    re.I,
+)
+# Phytochemical names in IMPPAT tool results (imppat_lookup / ayush_name_resolver).
+# Matched as text because cached traces keep only a truncated prefix of the JSON.
+_IMPPAT_NAME_RE = re.compile(r'"(?:name|phytochemical_name)"\s*:\s*"([^"]{3,80})"')
+_KEY_PHYTO_RE = re.compile(r'"key_phytochemicals"\s*:\s*\[([^\]]*)\]')
+_IMPPAT_FUNCTIONS = ("imppat_lookup", "ayush_name_resolver")
+_PK_RE = re.compile(
+    r'absor|bioavailab|metaboli|clearance|half-life|\bAUC\b|\bCmax\b|plasma (?:level|concentration)|'
+    r'p-?glycoprotein|\bP-gp\b|excret|distribution|protein binding|glucuronid|first-pass',
+    re.I,
+)
+_PD_RE = re.compile(
+    r'additive|synerg|antagon|potentiat|anticoagul|antiplatelet|bleeding|\bINR\b|hypoglyc|'
+    r'hypotens|sedat|serotonerg|receptor|platelet aggregation|blood glucose|QT',
+    re.I,
+)
+_BOILERPLATE_RE = re.compile(
+    r"^(?:i (?:will|have|'ll|searched|found)|let me|here (?:is|are)|based on (?:my|the) search|"
+    r"sure|certainly|the following|in summary|to summarize|please note|note:)",
+    re.I,
+)
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9(])|\n+')
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English prose)."""
+    return (len(text) + 3) // 4
+
+
+def _norm_words(text: str, limit: int = 40) -> str:
+    return " ".join(_WORD_RE.findall(text.lower())[:limit])
+
+
+def _clip(text: str) -> str:
+    text = " ".join(str(text).split()).strip(" -*•#")
+    return text if len(text) <= _MAX_FACT_CHARS else text[:_MAX_FACT_CHARS - 1].rstrip() + "…"
+
+
+def _fact(ftype: str, text: str, agent: str, weight: float, key: str = None) -> dict:
+    text = _clip(text)
+    return {
+        "type": ftype,
+        "text": text,
+        "key": key or f"{ftype}:{_norm_words(text)}",
+        "agents": [agent] if agent else [],
+        "weight": weight,
+    }
+
+
+def _cyp_effect_label(text: str) -> str:
+    lower = text.lower()
+    if "inhib" in lower:
+        return "inhibits"
+    if "induc" in lower:
+        return "induces"
+    if "substrate" in lower or "metaboli" in lower:
+        return "substrate"
+    return "affects"
+
+
+# ──────────────────────────────────────────────────────────────
+# Extraction
+# ──────────────────────────────────────────────────────────────
+
+def _json_payloads(text: str) -> list:
+    """JSON objects embedded in an agent response (whole text, fenced or braced)."""
+    payloads = []
+    try:
+        data = json.loads(text)
+        return [data] if isinstance(data, (dict, list)) else []
+    except (json.JSONDecodeError, TypeError):
+        pass
+    for block in re.findall(r'```(?:json)?\s*(.*?)```', text, re.S):
+        try:
+            payloads.append(json.loads(block))
+        except json.JSONDecodeError:
+            pass
+    if not payloads:
+        start, end = text.find("{"), text.rfind("}")
+        if 0 <= start < end:
+            try:
+                payloads.append(json.loads(text[start:end + 1]))
+            except json.JSONDecodeError:
+                pass
+    return payloads
+
+
+def _structured_facts(node, agent: str, facts: list, path: str = "", phyto: Optional[dict] = None) -> None:
+    """Walk parsed JSON, mapping known keys to typed facts."""
+    if isinstance(node, list):
+        for item in node:
+            _structured_facts(item, agent, facts, path, phyto)
+        return
+    if not isinstance(node, dict):
+        if isinstance(node, str) and len(node) >= 40:
+            facts.extend(_text_facts(node, agent, weight=0.9, phyto=phyto))
+        return
+
+    for key, value in node.items():
+        k = key.lower()
+        if value in (None, "", [], {}):
+            continue
+        if any(t in k for t in ("phytochemical", "compound", "constituent")):
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, dict):
+                    name = item.get("name") or item.get("compound") or item.get("phytochemical")
+                    if name:
+                        facts.append(_fact("phytochemical", name, agent, 1.0, f"phytochemical:{str(name).lower()}"))
+                    _structured_facts({k2: v2 for k2, v2 in item.items() if k2 != "name"}, agent, facts,
+                                      name or path, phyto)
+                elif isinstance(item, str):
+                    if len(item) <= 60:
+                        facts.append(_fact("phytochemical", item, agent, 1.0, f"phytochemical:{item.lower()}"))
+                    else:
+                        facts.extend(_text_facts(item, agent, weight=0.9, phyto=phyto))
+        elif "cyp" in k or "enzyme" in k:
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, dict):
+                    enzyme = item.get("name") or item.get("enzyme") or ""
+                    effect = item.get("effect") or item.get("role") or item.get("interaction") or ""
+                    if enzyme:
+                        label = _cyp_effect_label(str(effect)) if effect else "affects"
+                        subject = f"{path}: " if path else ""
+                        text = f"{subject}{enzyme} — {effect or label}"
+                        facts.append(_fact("cyp_effect", text, agent, 1.0,
+                                           f"cyp_effect:{str(enzyme).upper()}:{label}:{path.lower()}"))
+                elif isinstance(item, str):
+                    for fact in _text_facts(item, agent, weight=1.0, phyto=phyto):
+                        if fact["type"] == "finding" and _CYP_RE.search(item):
+                            fact = _fact("cyp_effect", f"{path + ': ' if path else ''}{item}", agent, 1.0)
+                        facts.append(fact)
+        elif k in ("nti", "is_nti", "nti_status", "nti_drug", "narrow_therapeutic_index"):
+            is_nti = value if isinstance(value, bool) else not _NEGATION_RE.search(str(value))
+            text = "Allopathy drug IS a narrow therapeutic index drug" if is_nti else \
+                   "Allopathy drug is not a narrow therapeutic index drug"
+            if isinstance(value, str) and len(value) > 5:
+                text += f" ({value})"
+            facts.append(_fact("nti", text, agent, 1.0, f"nti:{bool(is_nti)}"))
+        elif "pharmacokinetic" in k:
+            for item in value if isinstance(value, list) else [value]:
+                facts.append(_fact("pk_mechanism", _flatten(item), agent, 1.0))
+        elif "pharmacodynamic" in k:
+            for item in value if isinstance(value, list) else [value]:
+                facts.append(_fact("pd_mechanism", _flatten(item), agent, 1.0))
+        elif k in ("sources", "urls", "references", "results"):
+            continue  # handled by app.sources
+        else:
+            _structured_facts(value, agent, facts, path, phyto)
+
+
+def _flatten(item) -> str:
+    if isinstance(item, dict):
+        return "; ".join(f"{k}: {v}" for k, v in item.items() if v not in (None, "", [], {}))
+    return str(item)
+
+
+def phytochemical_names(traces: list) -> set:
+    """Phytochemical names the IMPPAT tools returned in an AYUSH agent's traces."""
+    names = set()
+    for trace in traces or []:
+        if trace.get("type") != "tool_result" or trace.get("_fn") not in _IMPPAT_FUNCTIONS:
+            continue
+        text = trace.get("_full_result", "")
+        names.update(_IMPPAT_NAME_RE.findall(text))
+        for block in _KEY_PHYTO_RE.findall(text):
+            names.update(re.findall(r'"([^"]{3,80})"', block))
+    return {name.strip() for name in names if name.strip()}
+
+
+def _phyto_matcher(phytochemicals) -> Optional[dict]:
+    """{"re": case-insensitive whole-name pattern (longest first), "names": lowercase -> IMPPAT name}."""
+    names = {n.lower(): n for n in phytochemicals or () if 3 <= len(n) <= 80}
+    if not names:
+        return None
+    alternatives = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+    return {"re": re.compile(r'(?<![\w-])(?:' + alternatives + r')(?![\w-])', re.I), "names": names}
+
+
+def _phyto_mentions(sentence: str, known: Optional[dict]) -> list:
+    """Phytochemical names in a sentence: known IMPPAT names, then class-suffix matches."""
+    found, spans = [], []
+    if known:
+        for m in known["re"].finditer(sentence):
+            found.append(known["names"][m.group(0).lower()])
+            spans.append(m.span())
+    seen = {name.lower() for name in found}
+    for m in _PHYTO_SUFFIX_RE.finditer(sentence):
+        name = m.group(0)
+        if name.lower() in seen or any(a <= m.start() < b for a, b in spans):
+            continue
+        seen.add(name.lower())
+        found.append(name)
+    return found
+
+
+def _text_facts(text: str, agent: str, weight: float = 0.7, phyto: Optional[dict] = None) -> list:
+    """Sentence-level heuristics for free-text responses.
+
+    `phyto` matches the known phytochemical names (see _phyto_matcher).
+    """
+    facts = []
+    text = re.sub(r'```.*?```', ' ', text, flags=re.S)
+    for raw in _SENTENCE_SPLIT_RE.split(text):
+        sentence = raw.strip(" \t-*•#>|")
+        if len(sentence) < 25 or _BOILERPLATE_RE.match(sentence):
+            continue
+        if sentence.count("http") and len(sentence) < 120:
+            continue  # bare link lines; sources are handled separately
+
+        if agent == "ayush":
+            for name in _phyto_mentions(sentence, phyto):
+                facts.append(_fact("phytochemical", name, agent, weight * 0.8, f"phytochemical:{name.lower()}"))
+
+        enzymes = sorted({e.upper().replace(" ", "") for e in _CYP_RE.findall(sentence)})
+        if enzymes:
+            label = _cyp_effect_label(sentence)
+            facts.append(_fact("cyp_effect", sentence, agent, weight,
+                               f"cyp_effect:{','.join(enzymes)}:{label}:{_norm_words(sentence, 6)}"))
+        elif _NTI_RE.search(sentence):
+            is_nti = not _NEGATION_RE.search(sentence)
+            facts.append(_fact("nti", sentence, agent, weight, f"nti:{is_nti}"))
+        elif _PK_RE.search(sentence):
+            facts.append(_fact("pk_mechanism", sentence, agent, weight))
+        elif _PD_RE.search(sentence):
+            facts.append(_fact("pd_mechanism", sentence, agent, weight))
+        else:
+            facts.append(_fact("finding", sentence, agent, weight * 0.8))
+    return facts
+
+
+def extract_facts(agent_key: str, response_text: str, phytochemicals=None) -> List[dict]:
+    """Typed facts from one proposer response (JSON parts first, then prose).
+
+    `phytochemicals` are names known for the plant (see phytochemical_names);
+    AYUSH prose is matched against them case-insensitively.
+    """
+    if not response_text:
+        return []
+    facts = []
+    phyto = _phyto_matcher(phytochemicals) if agent_key == "ayush" else None
+    payloads = _json_payloads(response_text)
+    for payload in payloads:
+        _structured_facts(payload, agent_key, facts, phyto=phyto)
+    if not payloads:
+        facts.extend(_text_facts(response_text, agent_key, phyto=phyto))
+    else:
+        # Prose around an embedded JSON block still carries findings
+        prose = re.sub(r'```.*?```', ' ', response_text, flags=re.S)
+        start, end = prose.find("{"), prose.rfind("}")
+        if 0 <= start < end:
+            prose = prose[:start] + " " + prose[end + 1:]
+        facts.extend(_text_facts(prose, agent_key, phyto=phyto))
+    if not facts:
+        # Nothing recognisable — keep a short excerpt rather than dropping the agent
+        facts.append(_fact("finding", response_text[:400], agent_key, 0.5))
+    return facts
+
+
+def source_facts(sources: list) -> List[dict]:
+    """Facts for normalized sources (see app.sources.normalize_sources)."""
+    facts = []
+    for src in sources:
+        prefix, _, value = src.get("canonical_id", "").partition(":")
+        label = {"pmid": f"PMID {value}", "pmc": value, "doi": f"DOI {value}"}.get(prefix, src.get("source_type", ""))
+        title = (src.get("title") or "").strip()[:120]
+        text = f"{label}: {src['url']}" + (f" — {title}" if title else "")
+        fact = _fact("source", text, "", min(1.0, src.get("rank_score", 0.5) + 0.2),
+                     f"source:{src.get('canonical_id') or src['url']}")
+        fact["text"] = text  # keep full URL
+        facts.append(fact)
+    return facts
+
+
+# ──────────────────────────────────────────────────────────────
+# Dedupe, rank, pack
+# ──────────────────────────────────────────────────────────────
+
+def dedupe_facts(facts: list) -> List[dict]:
+    merged: dict = {}
+    for fact in facts:
+        existing = merged.get(fact["key"])
+        if existing is None:
+            merged[fact["key"]] = {**fact, "agents": list(fact["agents"])}
+            continue
+        for agent in fact["agents"]:
+            if agent not in existing["agents"]:
+                existing["agents"].append(agent)
+        if fact["weight"] > existing["weight"]:
+            existing["weight"] = fact["weight"]
+            existing["text"] = fact["text"]
+    return list(merged.values())
+
+
+def gap_types(gaps: list) -> set:
+    """Fact types that help close the given scorer gaps."""
+    wanted = set()
+    for gap in gaps or []:
+        lower = gap.lower()
+        for keyword, types in _GAP_HINTS:
+            if keyword in lower:
+                wanted.update(types)
+    return wanted
+
+
+def rank_facts(facts: list, gaps: list = None) -> List[dict]:
+    """Sort facts by relevance: type priority × confidence, boosted for open gaps
+    and for facts corroborated by more than one agent."""
+    wanted = gap_types(gaps)
+    for fact in facts:
+        relevance = _TYPE_PRIORITY.get(fact["type"], 0.3) * fact["weight"]
+        if fact["type"] in wanted:
+            relevance += _GAP_BOOST
+        if len(fact["agents"]) > 1:
+            relevance += 0.1
+        fact["relevance"] = round(relevance, 4)
+    return sorted(facts, key=lambda f: f["relevance"], reverse=True)
+
+
+def _fact_line(fact: dict) -> str:
+    agents = f" [{', '.join(fact['agents'])}]" if fact["agents"] else ""
+    return f"- {fact['text']}{agents}"
+
+
+def render_facts(facts: list) -> str:
+    """Group packed facts into titled sections in FACT_TYPES order."""
+    sections = []
+    for ftype in FACT_TYPES:
+        group = [f for f in facts if f["type"] == ftype]
+        if not group:
+            continue
+        if ftype == "phytochemical":
+            body = ", ".join(f["text"] for f in group)
+        else:
+            body = "\n".join(_fact_line(f) for f in group)
+        sections.append(f"{_SECTION_TITLES[ftype]}:\n{body}")
+    return "\n\n".join(sections)
+
+
+def pack_evidence(facts: list, gaps: list = None, token_budget: int = 1500) -> dict:
+    """Dedupe, rank and pack facts into `token_budget` tokens.
+
+    The best fact of every type present is admitted first so no category is
+    crowded out entirely; the rest fill the budget in relevance order.
+    Returns {"text", "facts", "tokens", "total_facts", "dropped"}.
+    """
+    ranked = rank_facts(dedupe_facts(facts), gaps)
+    chosen, seen_types, used = [], set(), 0
+
+    def _cost(fact: dict) -> int:
+        return estimate_tokens(_fact_line(fact)) + 1
+
+    for fact in ranked:
+        if fact["type"] not in seen_types and used + _cost(fact) <= token_budget:
+            chosen.append(fact)
+            seen_types.add(fact["type"])
+            used += _cost(fact)
+    chosen_keys = {f["key"] for f in chosen}
+    for fact in ranked:
+        if fact["key"] in chosen_keys:
+            continue
+        cost = _cost(fact)
+        if used + cost > token_budget:
+            continue
+        chosen.append(fact)
+        used += cost
+    # Keep the relevance order inside each section
+    chosen.sort(key=lambda f: f["relevance"], reverse=True)
+
+    text = render_facts(chosen)
+    return {
+        "text": text,
+        "facts": chosen,
+        "tokens": estimate_tokens(text),
+        "total_facts": len(ranked),
+        "dropped": len(ranked) - len(chosen),
+    }
+
+
+def summarize_facts(facts: list) -> dict:
+    """Counts per fact type (for logs / pipeline stats)."""
+    counts = {t: 0 for t in FACT_TYPES}
+    for fact in facts:
+        counts[fact["type"]] = counts.get(fact["type"], 0) + 1
+    return counts
+
+
+# ──────────────────────────────────────────────────────────────
+# Iteration diff
+# ──────────────────────────────────────────────────────────────
+
+# New facts of these types justify re-running the Reasoning agent; new
+# unclassified prose ("finding") on its own does not.
+MATERIAL_FACT_TYPES = {"phytochemical", "cyp_effect", "nti", "pk_mechanism", "pd_mechanism", "source"}
+
+
+def fingerprint_facts(facts: list) -> dict:
+    """Stable hash of the fact keys reported by each agent ("sources" for source facts)."""
+    keys_by_agent: dict = {}
+    for fact in facts:
+        for agent in fact["agents"] or ["sources"]:
+            keys_by_agent.setdefault(agent, set()).add(fact["key"])
+    return {
+        agent: hashlib.sha1("\n".join(sorted(keys)).encode("utf-8")).hexdigest()[:16]
+        for agent, keys in keys_by_agent.items()
+    }
+
+
+def diff_facts(known: dict, facts: list) -> List[dict]:
+    """Facts whose key is not in `known` (key → fact), deduped."""
+    return [f for f in dedupe_facts(facts) if f["key"] not in known]
+
+
+def compact_analysis(analysis: dict, max_chars: int = 1600) -> str:
+    """Short JSON rendering of a previous Reasoning analysis for delta prompts."""
+    if not isinstance(analysis, dict):
+        return "{}"
+    keep = {}
+    for key in ("interaction_exists", "severity", "interaction_summary", "mechanisms",
+                "phytochemicals_involved", "cyp_enzymes", "clinical_effects", "reasoning_chain"):
+        value = analysis.get(key)
+        if value in (None, "", [], {}):
+            continue
+        if isinstance(value, list):
+            value = value[:5]
+        elif isinstance(value, dict):
+            value = {k: v[:4] if isinstance(v, list) else v for k, v in value.items()}
+        keep[key] = value
+    text = json.dumps(keep, separators=(",", ":"), default=str)
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+
+# ──────────────────────────────────────────────────────────────
+# Pre-evaluation (before the Reasoning agent)
+# ──────────────────────────────────────────────────────────────
+
+# (check, scorer points at stake, predicted scorer gap). Points and wording
+# mirror _score_output so the pipeline's gap → proposer routing applies
+# unchanged. Severity needs CYP or PD evidence (calculate_severity / the PD
+# boost); names, graph, reasoning chain and summary come from the Reasoning
+# agent itself and are assumed present (50 points).
+_PRESCORE_CHECKS = [
+    ("severity_evidence", 20, "Need CYP metabolism pathway data for the allopathy drug"),
+    ("phytochemicals", 10, "Need specific phytochemicals responsible for the interaction"),
+    ("sources", 10, "Need at least 2 research sources (PubMed articles, clinical studies)"),
+    ("mechanisms", 10, "Need pharmacokinetic and pharmacodynamic mechanism details"),
+]
+_PRESCORE_ASSUMED_POINTS = 50
+
+
+def prescore_facts(facts: list, pass_score: float = 60, min_sources: int = 2) -> dict:
+    """Predict the scorer result of a Reasoning call from raw proposer facts.
+
+    The Reasoning agent cannot cite phytochemicals, CYP pathways, sources or
+    mechanisms the proposers never found, so each missing category is a gap
+    the scorer will report after a full Evaluator call.
+    Returns {"ready", "predicted_score", "gaps", "checks"}; ready means the
+    predicted output would pass (score >= pass_score with clinical substance).
+    """
+    counts = summarize_facts(dedupe_facts(facts))
+    # A CYP effect is reported back as a pharmacokinetic mechanism
+    mechanisms = counts["pk_mechanism"] + counts["pd_mechanism"] + counts["cyp_effect"] >= 1
+    checks = {
+        "severity_evidence": counts["cyp_effect"] + counts["pd_mechanism"] >= 1,
+        "phytochemicals": counts["phytochemical"] >= 1,
+        "sources": counts["source"] >= min_sources,
+        "mechanisms": mechanisms,
+    }
+    score = _PRESCORE_ASSUMED_POINTS + sum(points for check, points, _ in _PRESCORE_CHECKS if checks[check])
+    gaps = [gap for check, _, gap in _PRESCORE_CHECKS if not checks[check]]
+    has_substance = mechanisms or checks["phytochemicals"]
+    return {
+        "ready": score >= pass_score and has_substance,
+        "predicted_score": score,
+        "gaps": gaps,
+        "checks": checks,
+    }
+
+
+def cyp_effects(facts: list) -> dict:
+    """{enzyme: "inhibits" | "induces"} asserted by cyp_effect facts.
+
+    Facts that only mention an enzyme, or that negate the effect ("does not
+    inhibit CYP3A4"), are left out; inhibition wins when both are reported.
+    """
+    effects = {}
+    for fact in facts:
+        if fact["type"] != "cyp_effect" or _NEGATION_RE.search(fact["text"]):
+            continue
+        _, enzymes, label = fact["key"].split(":")[:3]
+        if label not in ("inhibits", "induces"):
+            continue
+        for enzyme in enzymes.split(","):
+            enzyme = enzyme.upper().replace(" ", "")
+            if _CYP_RE.fullmatch(enzyme) and effects.get(enzyme) != "inhibits":
+                effects[enzyme] = label
+    return effects
+
+
+def legacy_prompt_tokens(*responses: Optional[str]) -> int:
+    """Token estimate of the previous fixed 2000-char-per-agent truncation."""
+    return sum(estimate_tokens((r or "")[:2000]) for r in responses)
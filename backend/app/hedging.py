@@ -0,0 +1,181 @@
+"""Hedged proposer invocations.
+
+A proposer stream that has not finished after HEDGE_PERCENTILE of its recent
+latency gets a duplicate invocation under a fresh Bedrock session; whichever
+finishes first wins and the other is cancelled. Latency history is per agent
+and per process: one sample per successful hedging.invoke call, timed from
+its start. A slow primary beaten by its hedge is thus recorded as at least
+as slow as the win, not dropped, and the hedge's own shorter run never
+enters the history, so the tail (and the hedge delay) does not shrink.
+
+Hedges are rationed so they cannot feed a throttling spiral:
+  - a token bucket earns HEDGE_BUDGET_RATIO of a hedge per invocation, so
+    hedges stay below that share of proposer traffic over time;
+  - no hedges for HEDGE_THROTTLE_COOLDOWN seconds after any throttle.
+"""
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Optional, Tuple
+
+from app.config import (
+    HEDGE_AGENTS,
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_BUDGET_RATIO,
+    HEDGE_THROTTLE_COOLDOWN,
+)
+from app import instrumentation
+
+_HISTORY_SIZE = 200
+# Unspent hedge tokens are capped so a quiet hour cannot fund a burst
+_BUDGET_CAP = 5.0
+
+
+class _HedgeState:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: dict = {}
+        self.tokens = 0.0
+        self.last_throttle = 0.0
+
+    def record_latency(self, agent: str, seconds: float) -> None:
+        with self._lock:
+            self.latencies.setdefault(agent, deque(maxlen=_HISTORY_SIZE)).append(seconds)
+
+    def delay(self, agent: str) -> Optional[float]:
+        with self._lock:
+            history = sorted(self.latencies.get(agent, ()))
+        if len(history) < HEDGE_MIN_SAMPLES:
+            return None
+        idx = min(int(HEDGE_PERCENTILE / 100.0 * len(history)), len(history) - 1)
+        return history[idx]
+
+    def earn(self) -> None:
+        with self._lock:
+            self.tokens = min(_BUDGET_CAP, self.tokens + HEDGE_BUDGET_RATIO)
+
+    def try_spend(self) -> Tuple[bool, str]:
+        with self._lock:
+            if time.monotonic() - self.last_throttle < HEDGE_THROTTLE_COOLDOWN:
+                return False, "throttle_cooldown"
+            if self.tokens < 1.0:
+                return False, "budget"
+            self.tokens -= 1.0
+            return True, ""
+
+    def note_throttle(self) -> None:
+        with self._lock:
+            self.last_throttle = time.monotonic()
+
+
+_state = _HedgeState()
+
+
+def record_latency(agent: str, seconds: float) -> None:
+    """Feed one successful invocation's duration into the agent's history (invoke() does this itself)."""
+    _state.record_latency(agent, seconds)
+
+
+def note_throttle() -> None:
+    """Pause hedging for HEDGE_THROTTLE_COOLDOWN seconds."""
+    _state.note_throttle()
+
+
+def hedge_delay(agent: str) -> Optional[float]:
+    """Seconds after which `agent` would be hedged; None until enough history."""
+    return _state.delay(agent)
+
+
+def enabled_for(agent: str) -> bool:
+    return agent in HEDGE_AGENTS
+
+
+def invoke(agent: str, call: Callable, cancel_event: Optional[threading.Event] = None) -> Tuple[str, list, dict]:
+    """Run call(agent_session_id, cancel_event) -> (response, traces), hedged.
+
+    The primary uses agent_session_id=None (the pipeline session). Returns the
+    winner's (response, traces) and a stats dict for the run summary.
+    """
+    start = time.perf_counter()
+    _state.earn()
+    instrumentation.count("ausadhi_hedge_eligible_total", "Proposer invocations eligible for hedging",
+                          agent=agent)
+
+    done = threading.Event()
+    results: dict = {}
+
+    def _attempt(name: str, agent_session_id: Optional[str], cancel: threading.Event):
+        try:
+            results[name] = call(agent_session_id, cancel)
+        except Exception:
+            results[name] = ("", [])
+        done.set()
+
+    cancels = {"primary": threading.Event()}
+    threading.Thread(target=_attempt, args=("primary", None, cancels["primary"]), daemon=True).start()
+
+    def _cancel_all():
+        for ev in cancels.values():
+            ev.set()
+
+    delay = _state.delay(agent)
+    stats = {"agent": agent, "hedged": False, "delay_s": round(delay, 2) if delay is not None else None}
+    if delay is not None and not _wait(done, delay, cancel_event) and not _cancelled(cancel_event):
+        allowed, reason = _state.try_spend()
+        if allowed:
+            cancels["hedge"] = threading.Event()
+            threading.Thread(target=_attempt, args=("hedge", str(uuid.uuid4()), cancels["hedge"]),
+                             daemon=True).start()
+            stats["hedged"] = True
+            instrumentation.count("ausadhi_hedges_total", "Hedged proposer invocations", agent=agent)
+        else:
+            stats["skipped"] = reason
+            instrumentation.count("ausadhi_hedges_skipped_total", "Hedges withheld by the budget",
+                                  agent=agent, reason=reason)
+
+    # First non-empty response wins; an empty one (error / cancel) waits for the other
+    winner = None
+    while winner is None:
+        if not _wait(done, None, cancel_event):
+            _cancel_all()
+            return "", [], stats
+        done.clear()
+        for name in ("primary", "hedge"):
+            if name in results and results[name][0]:
+                winner = name
+                break
+        else:
+            if len(results) == len(cancels):
+                winner = "primary"
+    _cancel_all()
+
+    response, traces = results[winner]
+    elapsed = time.perf_counter() - start
+    if response:
+        _state.record_latency(agent, elapsed)
+    stats.update({"winner": winner, "seconds": round(elapsed, 2)})
+    instrumentation.observe("ausadhi_hedged_proposer_seconds", "Proposer latency with hedging",
+                            elapsed, agent=agent)
+    if stats["hedged"]:
+        instrumentation.count("ausadhi_hedge_wins_total", "Hedged invocations by winning attempt",
+                              agent=agent, winner=winner)
+    return response, traces, stats
+
+
+def _cancelled(cancel_event: Optional[threading.Event]) -> bool:
+    return cancel_event is not None and cancel_event.is_set()
+
+
+def _wait(done: threading.Event, timeout: Optional[float], cancel_event: Optional[threading.Event]) -> bool:
+    """Wait for `done`; False on timeout or when the caller cancels."""
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    while True:
+        if _cancelled(cancel_event):
+            return False
+        remaining = None if deadline is None else deadline - time.perf_counter()
+        if remaining is not None and remaining <= 0:
+            return done.is_set()
+        if done.wait(0.05 if remaining is None else min(0.05, remaining)):
+            return True
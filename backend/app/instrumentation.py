@@ -0,0 +1,318 @@
+"""
+Per-session phase timings, agent token usage and retry counts, plus
+process-wide Prometheus-style metrics.
+
+run_check opens a run per session_id; anything that knows the session_id
+(the pipeline, _invoke_agent, proposer threads) records into it without
+threading a recorder through every call. finish_run returns the "timings"
+block sent with the final result. Every observation also feeds the
+process-wide counters / histograms rendered by /api/metrics, including
+calls made outside a run (benches driving run_comas_pipeline directly).
+"""
+import time
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+# Histogram buckets (seconds) — wide enough for 60s+ Reasoning calls
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+# ──────────────────────────────────────────────────────────────
+# Per-session run
+# ──────────────────────────────────────────────────────────────
+
+class RunTimings:
+    """Timings and token usage for one pipeline session."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.started = time.perf_counter()
+        self.iteration = 0
+        self.phases: list = []
+        self.tokens: dict = {}
+        self.retries: dict = {}
+        self.throttles: dict = {}
+        self._lock = threading.Lock()
+
+    def add_phase(self, name: str, seconds: float, **extra) -> None:
+        entry = {"phase": name, "ms": round(seconds * 1000, 1)}
+        if self.iteration:
+            entry["iteration"] = self.iteration
+        entry.update({k: v for k, v in extra.items() if v is not None})
+        with self._lock:
+            self.phases.append(entry)
+
+    def add_tokens(self, agent: str, input_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            t = self.tokens.setdefault(agent, {"input": 0, "output": 0, "model_calls": 0})
+            t["input"] += input_tokens
+            t["output"] += output_tokens
+            t["model_calls"] += 1
+
+    def add_retry(self, agent: str, throttled: bool) -> None:
+        with self._lock:
+            self.retries[agent] = self.retries.get(agent, 0) + 1
+            if throttled:
+                self.throttles[agent] = self.throttles.get(agent, 0) + 1
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            phases = list(self.phases)
+            tokens = {k: dict(v) for k, v in self.tokens.items()}
+            retries, throttles = dict(self.retries), dict(self.throttles)
+
+        totals: dict = {}
+        for p in phases:
+            totals[p["phase"]] = round(totals.get(p["phase"], 0.0) + p["ms"], 1)
+        tokens["total"] = {
+            "input": sum(t["input"] for t in tokens.values()),
+            "output": sum(t["output"] for t in tokens.values()),
+            "model_calls": sum(t["model_calls"] for t in tokens.values()),
+        }
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "phases": phases,
+            "phase_totals_ms": totals,
+            "tokens": tokens,
+            "retries": retries,
+            "throttles": throttles,
+        }
+
+
+_runs: dict = {}
+_runs_lock = threading.Lock()
+
+
+def start_run(session_id: str) -> RunTimings:
+    run = RunTimings(session_id)
+    with _runs_lock:
+        _runs[session_id] = run
+    return run
+
+
+def get_run(session_id: str) -> Optional[RunTimings]:
+    with _runs_lock:
+        return _runs.get(session_id)
+
+
+def finish_run(session_id: str, status: str = "success") -> dict:
+    """Close the session's run, record it in the process metrics and return its timings block."""
+    with _runs_lock:
+        run = _runs.pop(session_id, None)
+    if run is None:
+        return {}
+    timings = run.to_dict()
+    _metrics.observe_run(status, timings["total_ms"] / 1000)
+    return timings
+
+
+def set_iteration(session_id: str, iteration: int) -> None:
+    run = get_run(session_id)
+    if run is not None:
+        run.iteration = iteration
+
+
+def record_phase(session_id: str, name: str, seconds: float, **extra) -> None:
+    _metrics.observe_phase(name, seconds)
+    run = get_run(session_id)
+    if run is not None:
+        run.add_phase(name, seconds, **extra)
+
+
+@contextmanager
+def phase(session_id: str, name: str, **extra):
+    """Time a block as one phase of the session's run."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(session_id, name, time.perf_counter() - start, **extra)
+
+
+def record_tokens(session_id: str, agent: str, usage: dict) -> None:
+    """Record one model invocation's usage ({"inputTokens", "outputTokens"}) from a trace."""
+    if not isinstance(usage, dict):
+        return
+    input_tokens = int(usage.get("inputTokens") or 0)
+    output_tokens = int(usage.get("outputTokens") or 0)
+    _metrics.observe_tokens(agent, input_tokens, output_tokens)
+    run = get_run(session_id)
+    if run is not None:
+        run.add_tokens(agent, input_tokens, output_tokens)
+
+
+def record_retry(session_id: str, agent: str, throttled: bool) -> None:
+    _metrics.observe_retry(agent, throttled)
+    run = get_run(session_id)
+    if run is not None:
+        run.add_retry(agent, throttled)
+
+
+# ──────────────────────────────────────────────────────────────
+# Process-wide metrics (Prometheus text exposition)
+# ──────────────────────────────────────────────────────────────
+
+class _Histogram:
+    def __init__(self, buckets: tuple = _BUCKETS):
+        self.bounds = buckets
+        self.buckets = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.buckets[i] += 1
+
+
+class _Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phase_seconds: dict = {}
+        self.run_seconds: dict = {}
+        self.runs_total: dict = {}
+        self.tokens_total: dict = {}
+        self.model_calls_total: dict = {}
+        self.retries_total: dict = {}
+        self.throttles_total: dict = {}
+        # Named metrics registered by other modules: name -> (help, {labels: value})
+        self.counters: dict = {}
+        self.histograms: dict = {}
+        self.gauges: dict = {}
+
+    def observe_phase(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.phase_seconds.setdefault((("phase", name),), _Histogram()).observe(seconds)
+
+    def observe_run(self, status: str, seconds: float) -> None:
+        with self._lock:
+            self.runs_total[status] = self.runs_total.get(status, 0) + 1
+            self.run_seconds.setdefault((("status", status),), _Histogram()).observe(seconds)
+
+    def observe_tokens(self, agent: str, input_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            for direction, n in (("input", input_tokens), ("output", output_tokens)):
+                self.tokens_total[(agent, direction)] = self.tokens_total.get((agent, direction), 0) + n
+            self.model_calls_total[agent] = self.model_calls_total.get(agent, 0) + 1
+
+    def observe_retry(self, agent: str, throttled: bool) -> None:
+        with self._lock:
+            self.retries_total[agent] = self.retries_total.get(agent, 0) + 1
+            if throttled:
+                self.throttles_total[agent] = self.throttles_total.get(agent, 0) + 1
+
+    def count(self, name: str, help_text: str, n: float, labels: tuple) -> None:
+        with self._lock:
+            _, values = self.counters.setdefault(name, (help_text, {}))
+            values[labels] = values.get(labels, 0) + n
+
+    def observe(self, name: str, help_text: str, value: float, labels: tuple, buckets: tuple) -> None:
+        with self._lock:
+            _, hists = self.histograms.setdefault(name, (help_text, {}))
+            hists.setdefault(labels, _Histogram(buckets)).observe(value)
+
+    def counter_value(self, name: str, labels: tuple) -> float:
+        with self._lock:
+            return self.counters.get(name, ("", {}))[1].get(labels, 0)
+
+    def render(self) -> str:
+        with self._lock:
+            lines: list = []
+            _render_histogram(lines, "ausadhi_phase_seconds", "Wall time per pipeline phase",
+                              self.phase_seconds)
+            _render_histogram(lines, "ausadhi_pipeline_seconds", "End-to-end pipeline wall time",
+                              self.run_seconds)
+            _render_counter(lines, "ausadhi_pipeline_runs_total", "Finished pipeline runs",
+                            {(("status", k),): v for k, v in self.runs_total.items()})
+            _render_counter(lines, "ausadhi_agent_tokens_total", "Bedrock model tokens by agent",
+                            {(("agent", a), ("direction", d)): v for (a, d), v in self.tokens_total.items()})
+            _render_counter(lines, "ausadhi_agent_model_calls_total", "Model invocations by agent",
+                            {(("agent", k),): v for k, v in self.model_calls_total.items()})
+            _render_counter(lines, "ausadhi_agent_retries_total", "Agent invocation retries",
+                            {(("agent", k),): v for k, v in self.retries_total.items()})
+            _render_counter(lines, "ausadhi_agent_throttles_total", "Agent invocations throttled",
+                            {(("agent", k),): v for k, v in self.throttles_total.items()})
+            for name, (help_text, values) in sorted(self.counters.items()):
+                _render_counter(lines, name, help_text, values)
+            for name, (help_text, hists) in sorted(self.histograms.items()):
+                _render_histogram(lines, name, help_text, hists)
+            gauges = sorted(self.gauges.items())
+
+        # Gauge callbacks read other modules' state; run them outside the lock
+        for name, (help_text, fn) in gauges:
+            try:
+                values = fn()
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            if not isinstance(values, dict):
+                values = {(): values}
+            for labels, value in sorted(values.items()):
+                lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    inner = ",".join(f'{k}="{str(v)}"' for k, v in pairs)
+    return "{" + inner + "}"
+
+
+def _render_counter(lines: list, name: str, help_text: str, values: dict) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for labels, value in sorted(values.items()):
+        lines.append(f"{name}{_labels(labels)} {value}")
+
+
+def _render_histogram(lines: list, name: str, help_text: str, hists: dict) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, h in sorted(hists.items()):
+        for bound, n in zip(h.bounds, h.buckets):
+            lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {n}")
+        lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {h.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {h.total:.6f}")
+        lines.append(f"{name}_count{_labels(labels)} {h.count}")
+
+
+_metrics = _Metrics()
+
+# Sub-millisecond to seconds: WebSocket sends, DB lookups
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def count(name: str, help_text: str, n: float = 1, **labels) -> None:
+    """Increment a process-wide counter."""
+    _metrics.count(name, help_text, n, tuple(sorted(labels.items())))
+
+
+def counter_value(name: str, **labels) -> float:
+    return _metrics.counter_value(name, tuple(sorted(labels.items())))
+
+
+def observe(name: str, help_text: str, seconds: float, buckets: tuple = _BUCKETS, **labels) -> None:
+    """Record one observation in a process-wide histogram."""
+    _metrics.observe(name, help_text, seconds, tuple(sorted(labels.items())), buckets)
+
+
+def register_gauge(name: str, help_text: str, fn) -> None:
+    """Gauge evaluated at scrape time; fn returns a number or {label pairs tuple: number}."""
+    with _metrics._lock:
+        _metrics.gauges[name] = (help_text, fn)
+
+
+def active_runs() -> int:
+    """Pipeline runs started by run_check and not yet finished."""
+    with _runs_lock:
+        return len(_runs)
+
+
+def render_metrics() -> str:
+    """Prometheus text exposition of the process-wide metrics."""
+    return _metrics.render()
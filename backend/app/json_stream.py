@@ -0,0 +1,92 @@
+"""Incremental extraction of top-level fields from a streamed JSON answer.
+
+The Reasoning agent answers with one JSON object, delivered in chunks. A
+JSONFieldStream is fed those chunks in order and reports each top-level
+field as soon as its value is complete (e.g. interaction_summary long before
+reasoning_chain has been generated). Text before the first '{' (a preamble
+or a ```json fence) is skipped; values that fail to parse are dropped, so
+the final answer is still parsed the usual way once the stream ends.
+
+Each character is scanned once, so feeding a whole answer is O(length).
+"""
+import json
+
+
+class JSONFieldStream:
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = "start"  # start | key | colon | value | done
+        self._mark = 0
+        self._key = None
+        self.fields: dict = {}
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, text: str) -> dict:
+        """Consume the next chunk; return the fields it completed, in order."""
+        if self._state == "done" or not text:
+            return {}
+        self._buf += text
+        completed = {}
+        buf = self._buf
+        i = self._pos
+        n = len(buf)
+        while i < n:
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == "key":
+                        try:
+                            self._key = json.loads(buf[self._mark:i + 1])
+                        except ValueError:
+                            self._key = None
+                        self._state = "colon"
+            elif self._state == "start":
+                if ch == "{":
+                    self._depth = 1
+                    self._state = "key"
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state == "key":
+                    self._mark = i
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete(buf[self._mark:i], completed)
+                    self._state = "done"
+                    i += 1
+                    break
+            elif self._depth == 1:
+                if ch == ":" and self._state == "colon":
+                    self._state = "value"
+                    self._mark = i + 1
+                elif ch == "," and self._state == "value":
+                    self._complete(buf[self._mark:i], completed)
+                    self._state = "key"
+            i += 1
+        self._pos = i
+        return completed
+
+    def _complete(self, raw: str, completed: dict) -> None:
+        if self._state != "value" or self._key is None:
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        self.fields[self._key] = value
+        completed[self._key] = value
+        self._key = None
@@ -1,28 +1,36 @@
 """AushadhiMitra FastAPI Backend — CO-MAS Multi-Agent Pipeline.
 
 Architecture: POST /api/check starts background thread → /ws/{session_id} streams events.
+The two sides meet on the session event bus (app/event_bus.py).
 """
 import json
 import uuid
-import queue
 import logging
 import threading
 import os
 import asyncio
+import time
 from datetime import datetime, date
+from typing import Optional
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import (
     PLANNER_AGENT_ID, AYUSH_AGENT_ID, ALLOPATHY_AGENT_ID,
     REASONING_AGENT_ID, RESEARCH_AGENT_ID, DB_NAME,
+    READY_MAX_PIPELINES, READY_MAX_SESSIONS, EVENT_BUS_TTL_SECONDS, EVENT_BUS_REAP_SECONDS,
 )
 from app.models import InteractionRequest
-from app.agent_service import run_check
-from app.db import lookup_curated, get_sources, save_interaction, list_interactions
+from app.agent_service import run_check, verbosity_allows
+from app import event_bus, instrumentation
+from app.payloads import dumps, lean_result, lean_cached_result
+from app.ws_sender import SessionSender
+from app.db import (
+    lookup_curated, search_curated, get_sources, save_interaction, list_interactions, pool_stats,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -54,16 +62,118 @@ def _serialize(obj):
 
 
 # ──────────────────────────────────────────────────────────────
-# Session queues for POST → WebSocket pattern
+# Session event bus for POST → WebSocket pattern
 # ──────────────────────────────────────────────────────────────
+# Sessions outlive their WebSocket: a client that drops reconnects with
+# ?after=<seq> and the bus expires the session after EVENT_BUS_TTL_SECONDS.
+
+# pair key -> (session_id, started); a retried POST for a pair whose run is
+# in flight (or finished within the TTL) attaches to that session, whatever
+# verbosity it asks for: runs publish every event and each WebSocket filters
+_RUNS: dict[str, tuple[str, float]] = {}
+_RUNS_LOCK = threading.Lock()
+
+_open_streams = 0
+_STREAMS_LOCK = threading.Lock()
+
+
+def _run_key(ayush_name: str, allopathy_name: str) -> str:
+    return f"{ayush_name.lower().strip()}#{allopathy_name.lower().strip()}"
+
+
+def _attach_run(key: str) -> Optional[str]:
+    cutoff = time.monotonic() - EVENT_BUS_TTL_SECONDS
+    with _RUNS_LOCK:
+        for k in [k for k, (_, started) in _RUNS.items() if started < cutoff]:
+            del _RUNS[k]
+        entry = _RUNS.get(key)
+    if entry and event_bus.get_bus().exists(entry[0]):
+        return entry[0]
+    return None
 
-_SESSION_QUEUES: dict[str, queue.Queue] = {}
-_SESSION_LOCK = threading.Lock()
+
+def _forget_run(key: str, session_id: str):
+    with _RUNS_LOCK:
+        if _RUNS.get(key, ("",))[0] == session_id:
+            del _RUNS[key]
+
+
+def _stream_opened(delta: int):
+    global _open_streams
+    with _STREAMS_LOCK:
+        _open_streams += delta
+
+
+# ──────────────────────────────────────────────────────────────
+# Operational metrics and readiness
+# ──────────────────────────────────────────────────────────────
+
+def _active_sessions() -> int:
+    return event_bus.get_bus().session_count()
+
+
+def _open_stream_count() -> int:
+    with _STREAMS_LOCK:
+        return _open_streams
+
+
+def _queue_depths() -> dict:
+    return {(("session_id", sid),): n for sid, n in event_bus.get_bus().depths().items()}
+
+
+def _db_pool_gauge() -> dict:
+    stats = pool_stats() or {"in_use": 0, "idle": 0, "max": 0}
+    return {(("state", k),): v for k, v in stats.items()}
+
+
+def _curated_hit_ratio() -> float:
+    hits = instrumentation.counter_value("ausadhi_curated_lookups_total", result="hit")
+    misses = instrumentation.counter_value("ausadhi_curated_lookups_total", result="miss")
+    return round(hits / (hits + misses), 4) if hits + misses else 0.0
+
+
+instrumentation.register_gauge("ausadhi_active_sessions", "Retained event bus sessions", _active_sessions)
+instrumentation.register_gauge("ausadhi_open_streams", "Connected /ws/{session_id} streams", _open_stream_count)
+instrumentation.register_gauge("ausadhi_pipelines_in_flight", "Pipeline runs in progress",
+                               instrumentation.active_runs)
+instrumentation.register_gauge("ausadhi_session_queue_depth", "Retained events per session", _queue_depths)
+instrumentation.register_gauge("ausadhi_session_retained_bytes", "Serialized bytes retained by the event bus",
+                               lambda: event_bus.get_bus().retained_bytes())
+instrumentation.register_gauge("ausadhi_db_pool_connections", "PostgreSQL pool connections", _db_pool_gauge)
+instrumentation.register_gauge("ausadhi_curated_cache_hit_ratio", "lookup_curated hits / (hits + misses)",
+                               _curated_hit_ratio)
+
+
+def _readiness() -> dict:
+    """Cheap in-process saturation check; makes no DB or AWS calls."""
+    pipelines = instrumentation.active_runs()
+    sessions = _open_stream_count()
+    pool = pool_stats()
+    reasons = []
+    if pipelines >= READY_MAX_PIPELINES:
+        reasons.append(f"{pipelines} pipelines in flight (max {READY_MAX_PIPELINES})")
+    if sessions >= READY_MAX_SESSIONS:
+        reasons.append(f"{sessions} open sessions (max {READY_MAX_SESSIONS})")
+    if pool and pool["in_use"] >= pool["max"]:
+        reasons.append(f"DB pool exhausted ({pool['in_use']}/{pool['max']})")
+    return {
+        "ready": not reasons,
+        "reasons": reasons,
+        "pipelines_in_flight": pipelines,
+        "open_streams": sessions,
+        "retained_sessions": _active_sessions(),
+        "db_pool": pool,
+    }
 
 
-def _cleanup_session(session_id: str):
-    with _SESSION_LOCK:
-        _SESSION_QUEUES.pop(session_id, None)
+async def _send_json(websocket: WebSocket, payload: dict) -> None:
+    """Send one JSON text frame (payloads.dumps) with send latency / message count metrics."""
+    start = time.perf_counter()
+    await websocket.send_text(dumps(payload))
+    instrumentation.observe("ausadhi_ws_send_seconds", "WebSocket send_json latency",
+                            time.perf_counter() - start, buckets=instrumentation.FAST_BUCKETS)
+    instrumentation.count("ausadhi_ws_messages_total", "WebSocket messages sent",
+                          type=payload.get("type", ""))
 
 
 # ──────────────────────────────────────────────────────────────
@@ -138,6 +248,16 @@ def _map_trace_to_ui_event(event_type: str, data: dict) -> dict | None:
                 "message": message,
             }
 
+        if status == "provisional_severity":
+            return {
+                "type": "pipeline_status",
+                "status": "provisional_severity",
+                "iteration": data.get("iteration"),
+                "severity": data.get("severity"),
+                "severity_score": data.get("severity_score"),
+                "message": message,
+            }
+
         if status in ("iteration_retry", "formatting"):
             return {
                 "type": "pipeline_status",
@@ -210,6 +330,20 @@ def _map_trace_to_ui_event(event_type: str, data: dict) -> dict | None:
                 "message": data.get("message", ""),
             }
 
+    if event_type == "llm_delta":
+        event = {
+            "type": "llm_delta",
+            "agent": data.get("agent", ""),
+            "agent_key": data.get("agent_key", ""),
+            "iteration": data.get("iteration"),
+        }
+        if data.get("reset"):
+            event["reset"] = True
+        else:
+            event["delta"] = data.get("delta", "")
+            event["fields"] = data.get("fields") or {}
+        return event
+
     return None
 
 
@@ -218,19 +352,28 @@ def _map_trace_to_ui_event(event_type: str, data: dict) -> dict | None:
 # ──────────────────────────────────────────────────────────────
 
 def _pipeline_thread(session_id: str, ayush_name: str, allopathy_name: str):
-    """Run CO-MAS pipeline in background, push events to session queue."""
-    q = _SESSION_QUEUES.get(session_id)
-    if not q:
-        return
-
+    """Run CO-MAS pipeline in background, publish every event to the session's bus."""
+    bus = event_bus.get_bus()
+    failed = True
     try:
         for event_type, data in run_check(ayush_name, allopathy_name, session_id):
-            q.put((event_type, data))
+            if event_type == "trace" and "_full_result" in data:
+                # Raw tool payloads feed source extraction, never the UI
+                data = {k: v for k, v in data.items() if k != "_full_result"}
+            bus.publish(session_id, event_type, data)
+            if event_type == "done":
+                failed = False
+            elif event_type == "error":
+                failed = True
     except Exception as e:
         logger.exception("Pipeline thread error")
-        q.put(("error", {"message": str(e)}))
+        bus.publish(session_id, "error", {"message": str(e)})
+        failed = True
     finally:
-        q.put(("__done__", {}))
+        bus.publish(session_id, "__done__", {})
+        if failed:
+            # Let the next POST for this pair start a fresh run
+            _forget_run(_run_key(ayush_name, allopathy_name), session_id)
 
 
 # ──────────────────────────────────────────────────────────────
@@ -250,41 +393,89 @@ async def health():
             "reasoning": REASONING_AGENT_ID,
         },
         "database": DB_NAME,
+        "readiness": _readiness(),
     }
 
 
+@app.get("/api/health/ready")
+async def health_ready():
+    """Readiness probe for the load balancer: 503 while this worker is saturated."""
+    readiness = _readiness()
+    return JSONResponse(content=readiness, status_code=200 if readiness["ready"] else 503)
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition: phase latency, pipeline runs, agent tokens / retries."""
+    return PlainTextResponse(instrumentation.render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/interactions")
-async def get_interactions():
+async def get_interactions(severity: Optional[str] = None, phytochemical: Optional[str] = None):
     try:
-        interactions = list_interactions(20)
+        if severity or phytochemical:
+            interactions = search_curated(severity=severity, phytochemical=phytochemical, limit=20)
+        else:
+            interactions = list_interactions(20)
         return JSONResponse(content=json.loads(json.dumps(interactions, default=_serialize)))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/interactions/graph")
+async def get_interaction_graph(ayush_name: str, allopathy_name: str):
+    """Knowledge graph of a curated interaction, without the rest of response_data."""
+    try:
+        row = lookup_curated(ayush_name, allopathy_name, projection="graph")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if row is None:
+        raise HTTPException(status_code=404, detail="Interaction not curated")
+    return JSONResponse(content=json.loads(json.dumps(row, default=_serialize)))
+
+
 @app.post("/api/check")
 async def start_check(req: InteractionRequest):
-    """Start CO-MAS pipeline in background; return session_id for WebSocket streaming."""
+    """Start CO-MAS pipeline in background; return session_id for WebSocket streaming.
+
+    A retry for a pair whose run is still in flight, or finished within
+    EVENT_BUS_TTL_SECONDS, gets that run's session_id instead of a new run,
+    whatever its verbosity. req.verbosity is echoed back for the client to
+    pass as /ws/{session_id}?verbosity=, which filters the run's events.
+    """
+    run_key = _run_key(req.ayush_name, req.allopathy_name)
+    existing = _attach_run(run_key)
+    if existing:
+        instrumentation.count("ausadhi_check_attached_total", "POST /api/check served by an existing run")
+        return {"session_id": existing, "verbosity": req.verbosity, "attached": True}
+
     session_id = str(uuid.uuid4())
 
     # Check curated DB cache first
+    lookup_start = time.perf_counter()
     try:
         cached = lookup_curated(req.ayush_name, req.allopathy_name)
+        result = "hit" if cached else "miss"
     except Exception:
         cached = None
+        result = "error"
+    instrumentation.observe("ausadhi_curated_lookup_seconds", "lookup_curated latency",
+                            time.perf_counter() - lookup_start, buckets=instrumentation.FAST_BUCKETS)
+    instrumentation.count("ausadhi_curated_lookups_total", "lookup_curated results", result=result)
 
-    q: queue.Queue = queue.Queue()
-    with _SESSION_LOCK:
-        _SESSION_QUEUES[session_id] = q
+    bus = event_bus.get_bus()
+    bus.create(session_id)
 
     if cached:
         try:
             sources = get_sources(cached.get("interaction_key", ""))
         except Exception:
             sources = []
-        q.put(("__cached__", {"interaction": cached, "sources": sources}))
-        q.put(("__done__", {}))
+        bus.publish(session_id, "__cached__", {"interaction": cached, "sources": sources})
+        bus.publish(session_id, "__done__", {})
     else:
+        with _RUNS_LOCK:
+            _RUNS[run_key] = (session_id, time.monotonic())
         t = threading.Thread(
             target=_pipeline_thread,
             args=(session_id, req.ayush_name, req.allopathy_name),
@@ -292,7 +483,7 @@ async def start_check(req: InteractionRequest):
         )
         t.start()
 
-    return {"session_id": session_id}
+    return {"session_id": session_id, "verbosity": req.verbosity}
 
 
 # ──────────────────────────────────────────────────────────────
@@ -300,88 +491,141 @@ async def start_check(req: InteractionRequest):
 # ──────────────────────────────────────────────────────────────
 
 @app.websocket("/ws/{session_id}")
-async def ws_stream(websocket: WebSocket, session_id: str):
-    """Stream pipeline events for a given session_id."""
+async def ws_stream(websocket: WebSocket, session_id: str, lean: bool = False, deltas: bool = False,
+                    after: int = 0, batch: bool = False, verbosity: str = "full"):
+    """Stream pipeline events for a given session_id.
+
+    Every event carries its sequence number as "seq". A client that lost its
+    connection reconnects with ?after=<last seq seen> and receives only the
+    events it missed, then the live tail and the complete event.
+
+    ?lean=1 sends the complete event as {status, interaction_data} with only
+    the fields the UI renders (see app/payloads.py).
+    ?deltas=1 also forwards llm_delta events (Reasoning answer chunks and
+    completed answer fields; REASONING_STREAM_DELTAS must be on).
+    ?batch=1 sends the events queued within WS_BATCH_WINDOW_MS as one
+    {"type": "batch", "events": [...]} frame.
+    ?verbosity=status|result_only streams only those progress events
+    (see agent_service.VERBOSITY_TRACE_TYPES); the run itself publishes all.
+
+    Events go through a SessionSender (app/ws_sender.py), so a slow client
+    has trace events coalesced or dropped instead of stalling the stream.
+    """
     await websocket.accept()
 
-    # Wait for the session queue to appear (pipeline thread may not have started yet)
+    # Wait for the session to appear (the POST may still be in flight, or have
+    # landed on another worker whose first event is not yet visible)
+    bus = event_bus.get_bus()
+    found = False
     for _ in range(50):
-        with _SESSION_LOCK:
-            q = _SESSION_QUEUES.get(session_id)
-        if q is not None:
+        found = await bus.aexists(session_id)
+        if found:
             break
         await asyncio.sleep(0.1)
 
-    if q is None:
-        await websocket.send_json({"type": "error", "message": "Session not found"})
+    if not found:
+        await _send_json(websocket, {"type": "error", "message": "Session not found"})
         await websocket.close()
         return
 
     final_result = None
+    final_timings = None
+    events = []
+    cursor = 0
+    _stream_opened(1)
+    sender = SessionSender(lambda payload: _send_json(websocket, payload), batch=batch)
+
+    last_event = last_check = time.monotonic()
 
     try:
+        # Read from the start even when resuming, so the "done" payload is known
+        # however late the client reconnects; only events past ?after= are sent
         while True:
-            try:
-                event_type, data = q.get_nowait()
-            except queue.Empty:
-                await asyncio.sleep(0.05)
-                continue
+            if sender.failed is not None:
+                raise WebSocketDisconnect()
+            if not events:
+                events = await bus.aread(session_id, cursor)
+                if not events:
+                    # A session that expired, or whose final events never
+                    # reached the bus, would otherwise be polled forever
+                    now = time.monotonic()
+                    if now - last_event > EVENT_BUS_TTL_SECONDS:
+                        sender.offer({"type": "error", "message": "Session timed out"})
+                        break
+                    if now - last_check > EVENT_BUS_REAP_SECONDS:
+                        last_check = now
+                        if not await bus.aexists(session_id):
+                            sender.offer({"type": "error", "message": "Session expired"})
+                            break
+                    await asyncio.sleep(0.05)
+                    continue
+                last_event = time.monotonic()
+            cursor, event_type, data = events.pop(0)
+            missed = cursor > after
 
             if event_type == "__cached__":
+                if not missed:
+                    continue
                 interaction = data.get("interaction", {})
                 sources = data.get("sources", [])
-                await websocket.send_json({
-                    "type": "complete",
-                    "result": interaction,
-                    "cached": True,
-                    "sources": json.loads(json.dumps(sources, default=_serialize)),
-                    "session_id": session_id,
-                })
+                if lean:
+                    complete = {"type": "complete", "result": lean_cached_result(interaction, sources),
+                                "cached": True, "session_id": session_id, "seq": cursor}
+                else:
+                    complete = {"type": "complete", "result": interaction, "cached": True,
+                                "sources": sources, "session_id": session_id, "seq": cursor}
+                sender.offer(complete)
                 continue
 
             if event_type == "__done__":
                 if final_result is not None:
-                    await websocket.send_json({
+                    complete = {
                         "type": "complete",
-                        "result": final_result,
+                        "result": lean_result(final_result) if lean else final_result,
                         "cached": False,
                         "session_id": session_id,
-                    })
+                        "seq": cursor,
+                    }
+                    if final_timings and not lean:
+                        complete["timings"] = final_timings
+                    sender.offer(complete)
                 break
 
             if event_type == "error":
                 msg = data.get("message", "Unknown error") if isinstance(data, dict) else str(data)
                 supported = data.get("supported_drugs", []) if isinstance(data, dict) else []
-                await websocket.send_json({
+                sender.offer({
                     "type": "error",
                     "message": msg,
                     "supported_drugs": supported,
+                    "seq": cursor,
                 })
                 break
 
             if event_type == "done":
                 final_result = data.get("result", {})
+                final_timings = data.get("timings")
                 # Don't break — wait for __done__ sentinel
                 continue
 
+            if not missed or (event_type == "llm_delta" and not deltas) \
+                    or not verbosity_allows(verbosity, event_type, data):
+                continue
+
             # Map trace/pipeline events to UI events
             ui_event = _map_trace_to_ui_event(event_type, data if isinstance(data, dict) else {})
             if ui_event:
-                try:
-                    await websocket.send_json(ui_event)
-                except Exception:
-                    pass
+                ui_event["seq"] = cursor
+                sender.offer(ui_event)
 
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for session {session_id}")
     except Exception as e:
         logger.exception("WebSocket error")
-        try:
-            await websocket.send_json({"type": "error", "message": str(e)})
-        except Exception:
-            pass
+        sender.offer({"type": "error", "message": str(e)})
     finally:
-        _cleanup_session(session_id)
+        await sender.close()
+        _stream_opened(-1)
         try:
             await websocket.close()
         except Exception:
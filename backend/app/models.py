@@ -1,6 +1,6 @@
 import re
 from pydantic import BaseModel, field_validator
-from typing import Optional
+from typing import Literal, Optional
 
 from app.config import INPUT_MAX_LENGTH, INPUT_MIN_LENGTH
 
@@ -10,6 +10,9 @@ _ALLOWED_CHARS = re.compile(r"^[\w\s\-'.,()]+$", re.UNICODE)
 class InteractionRequest(BaseModel):
     ayush_name: str
     allopathy_name: str
+    # Progress events streamed on /ws/{session_id}: every trace ("full"),
+    # pipeline status and agent completions ("status"), or none ("result_only")
+    verbosity: Literal["full", "status", "result_only"] = "full"
 
     @field_validator("ayush_name", "allopathy_name")
     @classmethod
@@ -0,0 +1,98 @@
+"""
+WebSocket payload serialization and lean result shaping.
+
+dumps() is used for every message on /ws/{session_id}: orjson when it is
+installed (several times faster on the large complete event), otherwise the
+same compact json.dumps starlette's send_json uses. datetime / date values
+are serialized directly, so the cached path no longer round-trips rows
+through json.loads(json.dumps(...)).
+
+Lean mode (/ws/{session_id}?lean=1) sends the complete event in the shape the
+UI renders ({status, interaction_data}) and nothing else: the knowledge graph
+once, sources reduced to the fields ResultPanel shows, and no duplicated
+curated_interactions columns.
+"""
+import json
+from datetime import datetime, date
+
+try:
+    import orjson
+except ImportError:  # optional; json fallback below
+    orjson = None
+
+# InteractionData fields rendered by frontend/src/components/ResultPanel.tsx
+UI_INTERACTION_FIELDS = (
+    "interaction_key", "ayush_name", "allopathy_name", "interaction_exists",
+    "interaction_summary", "severity", "severity_score", "is_nti", "scoring_factors",
+    "mechanisms", "phytochemicals_involved", "clinical_effects", "recommendations",
+    "evidence_quality", "reasoning_chain", "knowledge_graph", "sources",
+    "imppat_url", "drugbank_url", "disclaimer", "generated_at",
+)
+UI_SOURCE_FIELDS = ("url", "title", "snippet", "source_type", "score")
+
+# interaction_sources column -> UI Source field
+_SOURCE_ALIASES = {"category": "source_type", "relevance_score": "score"}
+
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def dumps(payload) -> str:
+    """Serialize one WebSocket message (text frame)."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+
+def _lean_source(src: dict) -> dict:
+    out = {}
+    for key, value in src.items():
+        key = _SOURCE_ALIASES.get(key, key)
+        if key in UI_SOURCE_FIELDS and value not in (None, "") and key not in out:
+            out[key] = value
+    return out
+
+
+def _lean_interaction(data: dict, extra_sources: list = None) -> dict:
+    lean = {k: data[k] for k in UI_INTERACTION_FIELDS if k in data}
+    sources = data.get("sources") or extra_sources or []
+    lean["sources"] = [_lean_source(s) for s in sources if isinstance(s, dict) and s.get("url")]
+    return lean
+
+
+def lean_result(result):
+    """Pipeline result {status, interaction_data, ...} reduced to what the UI renders."""
+    if not isinstance(result, dict):
+        return result
+    lean = {"status": result.get("status", "Failed")}
+    if result.get("failure_reason"):
+        lean["failure_reason"] = result["failure_reason"]
+    if isinstance(result.get("interaction_data"), dict):
+        lean["interaction_data"] = _lean_interaction(result["interaction_data"])
+    return lean
+
+
+def lean_cached_result(row: dict, sources: list) -> dict:
+    """curated_interactions row + interaction_sources rows in the pipeline result shape.
+
+    response_data already carries the knowledge graph; the knowledge_graph
+    column is only used when response_data lacks it.
+    """
+    data = row.get("response_data") or {}
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            data = {}
+    if isinstance(data.get("interaction_data"), dict):
+        data = data["interaction_data"]
+    data = dict(data)
+    if not data.get("knowledge_graph") and row.get("knowledge_graph"):
+        data["knowledge_graph"] = row["knowledge_graph"]
+    for key in ("interaction_key", "ayush_name", "allopathy_name", "severity", "severity_score"):
+        if key not in data and row.get(key) is not None:
+            data[key] = row[key]
+    return {"status": "Success", "interaction_data": _lean_interaction(data, sources)}
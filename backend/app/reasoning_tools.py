@@ -0,0 +1,128 @@
+"""
+In-process access to the reasoning_tools logic.
+
+calculate_severity / build_knowledge_graph / compile_and_validate_output are
+pure functions in lambda/shared/reasoning_core.py. Importing that module here
+lets the orchestrator call them directly instead of a synchronous
+lambda.invoke per call (JSON encoded twice, Bedrock envelope parsed back out,
+plus a cold start whenever the Lambda container has been recycled).
+
+The Docker image copies reasoning_core.py to /app/lambda_shared; local runs
+pick it up from the repo checkout. CYP / NTI reference JSON is loaded the same
+way as name_mappings.json: baked local copy first, S3 fallback.
+"""
+import os
+import json
+import logging
+import threading
+import importlib.util
+from typing import Optional
+
+from app.config import S3_BUCKET, REGION
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_CORE_CANDIDATES = [
+    "/app/lambda_shared/reasoning_core.py",
+    os.path.join(_APP_DIR, "..", "..", "lambda", "shared", "reasoning_core.py"),
+    "lambda/shared/reasoning_core.py",
+    "../lambda/shared/reasoning_core.py",
+]
+
+_core = None
+_core_lock = threading.Lock()
+_reference_cache: dict = {}
+_reference_lock = threading.Lock()
+
+
+def get_core():
+    """Import reasoning_core from the first candidate path; None if unavailable."""
+    global _core
+    with _core_lock:
+        if _core is not None:
+            return _core
+        for path in _CORE_CANDIDATES:
+            if not os.path.isfile(path):
+                continue
+            try:
+                spec = importlib.util.spec_from_file_location("reasoning_core", path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+            except Exception as e:
+                logger.error(f"Failed to import reasoning_core from {path}: {e}")
+                continue
+            _core = module
+            logger.info(f"Loaded reasoning_core from {os.path.normpath(path)}")
+            return _core
+        logger.warning("reasoning_core not found — reasoning tools fall back to Lambda")
+        return None
+
+
+def _load_reference(filename: str, empty: dict) -> dict:
+    with _reference_lock:
+        if filename in _reference_cache:
+            return _reference_cache[filename]
+
+        local_candidates = [
+            f"/app/data/reference/{filename}",
+            f"data/reference/{filename}",
+            f"../data/reference/{filename}",
+            os.path.join(_APP_DIR, "..", "..", "data", "reference", filename),
+        ]
+        for path in local_candidates:
+            try:
+                with open(path) as f:
+                    _reference_cache[filename] = json.load(f)
+                    logger.info(f"Loaded {filename} from {os.path.normpath(path)}")
+                    return _reference_cache[filename]
+            except (FileNotFoundError, IOError):
+                pass
+
+        try:
+            import boto3
+            s3 = boto3.client("s3", region_name=REGION)
+            resp = s3.get_object(Bucket=S3_BUCKET or "ausadhi-mitra", Key=f"reference/{filename}")
+            _reference_cache[filename] = json.loads(resp["Body"].read().decode("utf-8"))
+            logger.info(f"Loaded {filename} from S3")
+            return _reference_cache[filename]
+        except Exception as e:
+            # Not cached, so the next call retries
+            logger.error(f"Failed to load {filename}: {e}")
+            return empty
+
+
+def calculate_severity(interactions_data, allopathy_name: str) -> Optional[dict]:
+    """Run calculate_severity in-process; None if reasoning_core is unavailable."""
+    core = get_core()
+    if core is None:
+        return None
+    return core.calculate_severity(
+        interactions_data,
+        allopathy_name,
+        cyp_ref=_load_reference("cyp_enzymes.json", core.EMPTY_CYP_REF),
+        nti_ref=_load_reference("nti_drugs.json", core.EMPTY_NTI_REF),
+    )
+
+
+def build_knowledge_graph(ayush_name: str, allopathy_name: str, interactions_data) -> Optional[dict]:
+    core = get_core()
+    if core is None:
+        return None
+    return core.build_knowledge_graph(ayush_name, allopathy_name, interactions_data)
+
+
+def compile_and_validate_output(ayush_name: str, allopathy_name: str, severity_result: dict,
+                                knowledge_graph: dict, analysis_data: dict) -> Optional[dict]:
+    """Run compile_and_validate_output in-process; dicts are passed without re-encoding."""
+    core = get_core()
+    if core is None:
+        return None
+    return core.compile_and_validate_output(
+        ayush_name=ayush_name,
+        allopathy_name=allopathy_name,
+        severity_result_str=severity_result,
+        knowledge_graph_str=knowledge_graph,
+        analysis_data=analysis_data,
+    )
@@ -0,0 +1,297 @@
+"""Source normalization for the CO-MAS pipeline.
+
+Agents surface the same article through several URLs (pubmed.ncbi.nlm.nih.gov,
+ncbi.nlm.nih.gov/pmc, doi.org, publisher pages). This module extracts candidate
+sources from agent traces, canonicalizes PMIDs / PMC IDs / DOIs, merges records
+that share any identifier, and ranks the merged list by Tavily score and domain
+priority so only the best few are forwarded to the Reasoning agent.
+"""
+import json
+import re
+from typing import Iterable, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+
+_SOURCE_URL_RE = re.compile(
+    r'https?://(?:pubmed\.ncbi\.nlm\.nih\.gov|'
+    r'www\.ncbi\.nlm\.nih\.gov/(?:pubmed|pmc)|'
+    r'(?:go\.)?drugbank\.com|'
+    r'cb\.imsc\.res\.in/imppat|'
+    r'examine\.com|'
+    r'scholar\.google\.com|'
+    r'clinicaltrials\.gov|'
+    r'www\.webmd\.com|'
+    r'www\.drugs\.com|'
+    r'doi\.org)'
+    r'[^\s"\',<>)\]]*'
+)
+
+_PMID_URL_RE = re.compile(r'(?:pubmed\.ncbi\.nlm\.nih\.gov|ncbi\.nlm\.nih\.gov/pubmed)/(\d{5,9})', re.I)
+_PMC_RE = re.compile(r'\b(PMC\d{5,9})\b', re.I)
+_DOI_RE = re.compile(r'\b(10\.\d{4,9}/[^\s"\'<>,;]+)', re.I)
+_PMID_TEXT_RE = re.compile(r'\bPMID:?\s*(\d{5,9})\b', re.I)
+
+_TRACKING_PARAMS = {"utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+                    "fbclid", "gclid", "dopt", "report", "format"}
+
+# (url fragment, priority) — first match wins; higher is better
+_DOMAIN_PRIORITY = [
+    ("pubmed.ncbi.nlm.nih.gov", 1.0),
+    ("ncbi.nlm.nih.gov/pubmed", 1.0),
+    ("ncbi.nlm.nih.gov/pmc", 0.95),
+    ("clinicaltrials.gov", 0.9),
+    ("cochranelibrary.com", 0.9),
+    ("doi.org", 0.85),
+    ("drugbank.com", 0.8),
+    ("cb.imsc.res.in", 0.8),
+    ("fda.gov", 0.75),
+    ("nih.gov", 0.75),
+    ("sciencedirect.com", 0.7),
+    ("springer.com", 0.7),
+    ("nature.com", 0.7),
+    ("wiley.com", 0.7),
+    ("frontiersin.org", 0.65),
+    ("mdpi.com", 0.6),
+    ("examine.com", 0.55),
+    ("drugs.com", 0.5),
+    ("webmd.com", 0.4),
+    ("scholar.google.com", 0.3),
+]
+_DEFAULT_DOMAIN_PRIORITY = 0.5
+_DEFAULT_TAVILY_SCORE = 0.5
+
+
+def _domain_priority(url: str) -> float:
+    lower = url.lower()
+    for fragment, priority in _DOMAIN_PRIORITY:
+        if fragment in lower:
+            return priority
+    return _DEFAULT_DOMAIN_PRIORITY
+
+
+def _source_type(url: str) -> str:
+    if "pubmed" in url or "ncbi" in url or "pmc" in url:
+        return "PubMed"
+    if "drugbank" in url:
+        return "DrugBank"
+    if "imppat" in url or "imsc.res.in" in url:
+        return "IMPPAT"
+    if "clinicaltrials" in url:
+        return "ClinicalTrials"
+    if "doi.org" in url:
+        return "DOI"
+    return "research"
+
+
+def normalize_url(url: str) -> str:
+    """Lower-case host, drop www./fragment/tracking params and trailing slash."""
+    parts = urlsplit(url.strip().rstrip(".,;"))
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if k.lower() not in _TRACKING_PARAMS])
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def _normalize_title(title: str) -> str:
+    return re.sub(r'[^a-z0-9]+', ' ', (title or "").lower()).strip()
+
+
+def source_identifiers(source: dict) -> set:
+    """All canonical identifiers for a source: pmid:, pmc:, doi:, title:, url:."""
+    url = source.get("url", "")
+    text = f"{source.get('title', '')} {source.get('snippet', '')}"
+    ids = set()
+
+    m = _PMID_URL_RE.search(url)
+    if m:
+        ids.add(f"pmid:{m.group(1)}")
+    for m in _PMC_RE.finditer(url):
+        ids.add(f"pmc:{m.group(1).upper()}")
+    m = _DOI_RE.search(unquote(url))
+    if m:
+        ids.add(f"doi:{m.group(1).rstrip('.').lower()}")
+
+    # Identifiers quoted in the title / snippet link alternate URLs of one article
+    for m in _PMID_TEXT_RE.finditer(text):
+        ids.add(f"pmid:{m.group(1)}")
+    for m in _PMC_RE.finditer(text):
+        ids.add(f"pmc:{m.group(1).upper()}")
+
+    title = _normalize_title(source.get("title", ""))
+    if len(title) >= 30:
+        ids.add(f"title:{title}")
+    if url:
+        ids.add(f"url:{normalize_url(url)}")
+    return ids
+
+
+def canonical_id(ids: Iterable[str]) -> str:
+    """Preferred identifier for display: PMID > PMC > DOI > URL."""
+    ids = set(ids)
+    for prefix in ("pmid:", "pmc:", "doi:", "url:"):
+        matches = sorted(i for i in ids if i.startswith(prefix))
+        if matches:
+            return matches[0]
+    return ""
+
+
+# ──────────────────────────────────────────────────────────────
+# Extraction
+# ──────────────────────────────────────────────────────────────
+
+def _structured_sources(full_result: str) -> list:
+    """Sources with titles / Tavily scores from a JSON tool result, if any."""
+    try:
+        data = json.loads(full_result)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    if not isinstance(data, dict):
+        return []
+    found = []
+    for item in data.get("sources", []) or data.get("results", []):
+        if isinstance(item, dict) and item.get("url"):
+            found.append({
+                "url": item["url"],
+                "title": item.get("title", ""),
+                "snippet": (item.get("snippet") or item.get("content") or "")[:500],
+                "score": item.get("score"),
+            })
+    return found
+
+
+def extract_sources(traces: list, response_text: str = "", agent_key: str = "") -> list:
+    """Candidate sources from one agent's traces and final response.
+
+    Structured tool results (Tavily JSON) are parsed first so titles and scores
+    survive; remaining text is regex-scanned field by field for known domains.
+    """
+    candidates = []
+    texts = [response_text] if response_text else []
+    for trace in traces:
+        full_result = trace.get("_full_result", "")
+        if full_result:
+            structured = _structured_sources(full_result)
+            candidates.extend(structured)
+            if not structured:
+                texts.append(full_result)
+        for field in ("message", "response"):
+            text = trace.get(field, "")
+            if text:
+                texts.append(text)
+
+    for text in texts:
+        for match in _SOURCE_URL_RE.finditer(text):
+            candidates.append({"url": match.group(0).rstrip("."), "title": "", "snippet": "", "score": None})
+
+    for c in candidates:
+        c["agent"] = agent_key
+    return candidates
+
+
+# ──────────────────────────────────────────────────────────────
+# Merge + rank
+# ──────────────────────────────────────────────────────────────
+
+def _rank_score(group: dict) -> float:
+    tavily = group["score"] if group["score"] is not None else _DEFAULT_TAVILY_SCORE
+    mention_boost = min(group["mentions"] - 1, 3) * 0.03
+    return round(0.6 * tavily + 0.4 * group["priority"] + mention_boost, 4)
+
+
+def normalize_sources(candidates: list, limit: Optional[int] = None) -> List[dict]:
+    """Merge duplicate sources by shared identifier and rank them.
+
+    Returns dicts with url, title, snippet, source_type, score (best Tavily score),
+    canonical_id, alt_urls and rank_score, best first, capped at `limit`.
+    """
+    groups: list = []
+    id_index: dict = {}
+
+    for cand in candidates:
+        url = cand.get("url", "")
+        if not url:
+            continue
+        ids = source_identifiers(cand)
+        matched = {id_index[i] for i in ids if i in id_index}
+
+        if matched:
+            # Fold every matched group into the lowest index (transitive merge)
+            target = min(matched)
+            for idx in sorted(matched - {target}):
+                other = groups[idx]
+                if other is None:
+                    continue
+                _merge_into(groups[target], other)
+                for i in other["ids"]:
+                    id_index[i] = target
+                groups[idx] = None
+            group = groups[target]
+        else:
+            target = len(groups)
+            group = {"ids": set(), "urls": [], "title": "", "snippet": "", "score": None,
+                     "priority": 0.0, "mentions": 0, "agents": set()}
+            groups.append(group)
+
+        _merge_into(group, {
+            "ids": ids, "urls": [url], "title": cand.get("title", ""),
+            "snippet": cand.get("snippet", ""), "score": cand.get("score"),
+            "priority": _domain_priority(url), "mentions": 1,
+            "agents": {cand.get("agent", "")} - {""},
+        })
+        for i in group["ids"]:
+            id_index[i] = target
+
+    merged = []
+    for group in groups:
+        if group is None:
+            continue
+        best_url = max(group["urls"], key=_domain_priority)
+        merged.append({
+            "url": best_url,
+            "title": group["title"],
+            "snippet": group["snippet"],
+            "source_type": _source_type(best_url),
+            "score": group["score"] if group["score"] is not None else 0,
+            "canonical_id": canonical_id(group["ids"]),
+            "alt_urls": [u for u in group["urls"] if u != best_url],
+            "rank_score": _rank_score(group),
+        })
+
+    merged.sort(key=lambda s: s["rank_score"], reverse=True)
+    return merged[:limit] if limit else merged
+
+
+def _merge_into(group: dict, other: dict) -> None:
+    group["ids"] |= other["ids"]
+    for url in other["urls"]:
+        if url not in group["urls"]:
+            group["urls"].append(url)
+    if len(other["title"] or "") > len(group["title"] or ""):
+        group["title"] = other["title"]
+    if len(other["snippet"] or "") > len(group["snippet"] or ""):
+        group["snippet"] = other["snippet"]
+    if other["score"] is not None and (group["score"] is None or other["score"] > group["score"]):
+        group["score"] = other["score"]
+    group["priority"] = max(group["priority"], other["priority"])
+    group["mentions"] += other["mentions"]
+    group["agents"] |= other["agents"]
+
+
+def format_sources_for_prompt(sources: list) -> str:
+    """Compact one-line-per-source block for the Reasoning prompt."""
+    lines = []
+    for i, src in enumerate(sources, 1):
+        prefix, _, value = src.get("canonical_id", "").partition(":")
+        if prefix == "pmid":
+            label = f"PMID {value}"
+        elif prefix in ("pmc", "doi"):
+            label = value if prefix == "pmc" else f"DOI {value}"
+        else:
+            label = src.get("source_type", "")
+        title = (src.get("title") or "").strip()[:120]
+        line = f"  [{i}] {label}: {src['url']}"
+        if title:
+            line += f" — {title}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,146 @@
+"""
+Per-connection sender for /ws/{session_id} with a bounded outbound buffer.
+
+ws_stream offers UI events without waiting on the socket; a task drains them
+to the client. A slow client therefore no longer stalls the reader, and what
+piles up for it is bounded by WS_SEND_BUFFER:
+
+  - an llm_delta queued right behind another for the same agent and
+    iteration is merged into it (text concatenated, completed fields
+    combined), which loses nothing;
+  - once the buffer is full, a new trace event (agent_thinking, llm_call,
+    llm_response, tool_call, tool_result) supersedes a queued one of the
+    same type and agent, or else the oldest queued trace event is dropped;
+  - pipeline_status, agent_complete, llm_delta, complete and error events
+    are never dropped.
+
+With batching (/ws/{session_id}?batch=1) everything queued after a
+WS_BATCH_WINDOW_MS window goes out as one {"type": "batch", "events": [...]}
+frame; a single event is still sent on its own.
+
+A failed send (client gone) is recorded in `failed` instead of being
+swallowed, so ws_stream can stop reading; the session stays resumable.
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from app.config import WS_SEND_BUFFER, WS_BATCH_WINDOW_MS
+from app import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Trace events a slow client can do without
+DROPPABLE = frozenset({"agent_thinking", "llm_call", "llm_response", "tool_call", "tool_result"})
+
+
+class SessionSender:
+    def __init__(self, send: Callable[[dict], Awaitable[None]], batch: bool = False,
+                 limit: int = WS_SEND_BUFFER, window_ms: float = WS_BATCH_WINDOW_MS):
+        self._send = send
+        self._batch = batch
+        self._limit = limit
+        self._window = window_ms / 1000
+        self._pending: deque = deque()
+        self._wake = asyncio.Event()
+        self._closing = False
+        self.failed: Optional[BaseException] = None
+        self.frames = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_pending = 0
+        self._task = asyncio.create_task(self._run())
+
+    def offer(self, event: dict) -> None:
+        """Queue one UI event; never waits for the client."""
+        if self.failed is not None:
+            return
+        kind = event.get("type")
+        if kind == "llm_delta" and self._merge_delta(event):
+            return
+        if kind in DROPPABLE and len(self._pending) >= self._limit and not self._make_room(event):
+            self._count("dropped")
+            return
+        self._pending.append(event)
+        self.max_pending = max(self.max_pending, len(self._pending))
+        self._wake.set()
+
+    def _merge_delta(self, event: dict) -> bool:
+        if event.get("reset") or not self._pending:
+            return False
+        queued = self._pending[-1]
+        if queued.get("type") != "llm_delta" or queued.get("reset") \
+                or queued.get("agent_key") != event.get("agent_key") \
+                or queued.get("iteration") != event.get("iteration"):
+            return False
+        queued["delta"] = queued.get("delta", "") + event.get("delta", "")
+        queued["fields"] = {**queued.get("fields", {}), **event.get("fields", {})}
+        if "seq" in event:
+            queued["seq"] = event["seq"]
+        self._count("coalesced")
+        return True
+
+    def _make_room(self, event: dict) -> bool:
+        """Free one slot for a droppable event; False when only kept events are queued."""
+        oldest = None
+        for i, queued in enumerate(self._pending):
+            if queued.get("type") not in DROPPABLE:
+                continue
+            if queued.get("type") == event.get("type") and queued.get("agent") == event.get("agent"):
+                del self._pending[i]
+                self._count("coalesced")
+                return True
+            if oldest is None:
+                oldest = i
+        if oldest is None:
+            return False
+        del self._pending[oldest]
+        self._count("dropped")
+        return True
+
+    def _count(self, reason: str) -> None:
+        setattr(self, reason, getattr(self, reason) + 1)
+        instrumentation.count("ausadhi_ws_events_shed_total",
+                              "UI events coalesced or dropped for slow WebSocket clients", reason=reason)
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                if not self._pending:
+                    if self._closing:
+                        return
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+                if self._batch and self._window and not self._closing:
+                    await asyncio.sleep(self._window)
+                if self._batch and len(self._pending) > 1:
+                    events = list(self._pending)
+                    self._pending.clear()
+                    payload = {"type": "batch", "events": events}
+                else:
+                    payload = self._pending.popleft()
+                    events = [payload]
+                await self._send(payload)
+                self.frames += 1
+                self.sent += len(events)
+        except Exception as e:
+            self.failed = e
+            self._pending.clear()
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Flush what is queued (up to timeout) and stop the sender task."""
+        self._closing = True
+        self._wake.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"WebSocket sender gave up with {len(self._pending)} events unsent")
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        return {"frames": self.frames, "events": self.sent, "dropped": self.dropped,
+                "coalesced": self.coalesced, "max_pending": self.max_pending}
@@ -7,6 +7,7 @@ import ErrorDisplay from './components/ErrorDisplay';
 import PipelineFlowModal from './components/PipelineFlowModal';
 import type {
   WsEvent,
+  WsFrame,
   PipelineState,
   PipelineIteration,
   AgentTrace,
@@ -72,6 +73,12 @@ function applyEvent(state: PipelineState, e: WsEvent): PipelineState {
       const num = e.iteration ?? state.currentIteration + 1;
       return ensureIteration({ ...state, currentIteration: num }, num);
     }
+    if (e.status === 'provisional_severity' && e.severity) {
+      return {
+        ...state,
+        provisionalSeverity: { severity: e.severity, score: e.severity_score },
+      };
+    }
     if (e.status === 'gap_identified' && e.gap) {
       const num = e.iteration ?? state.currentIteration;
       let s = ensureIteration(state, num);
@@ -85,6 +92,20 @@ function applyEvent(state: PipelineState, e: WsEvent): PipelineState {
     return state;
   }
 
+  if (e.type === 'llm_delta') {
+    // A new iteration's answer (or a retried stream) starts from scratch
+    const prev = state.partialAnswer;
+    const fresh = e.reset || !prev || prev.iteration !== e.iteration;
+    return {
+      ...state,
+      partialAnswer: {
+        iteration: e.iteration,
+        text: (fresh ? '' : prev?.text ?? '') + (e.delta ?? ''),
+        fields: { ...(fresh ? {} : prev?.fields), ...(e.fields ?? {}) },
+      },
+    };
+  }
+
   // Agent trace events — auto-create iteration 1 if needed
   const iterNum =
     (e as any).iteration ?? (state.currentIteration > 0 ? state.currentIteration : 1);
@@ -183,6 +204,8 @@ function wsEventToTimeline(e: WsEvent): TimelineEvent | null {
   return null;
 }
 
+const MAX_WS_RECONNECTS = 5;
+
 export default function App() {
   const [ayushDrug, setAyushDrug] = useState('');
   const [allopathyDrug, setAllopathyDrug] = useState('');
@@ -193,6 +216,8 @@ export default function App() {
   const [showFlowModal, setShowFlowModal] = useState(false);
   const [eventLog, setEventLog] = useState<TimelineEvent[]>([]);
   const wsRef = useRef<WebSocket | null>(null);
+  const reconnectTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const checkIdRef = useRef(0);
 
   const handleSubmit = useCallback(async () => {
     if (!ayushDrug.trim() || !allopathyDrug.trim()) return;
@@ -216,6 +241,12 @@ export default function App() {
       overallGaps: [],
     });
 
+    // Supersede the previous check, including a reconnect it has scheduled
+    const checkId = ++checkIdRef.current;
+    if (reconnectTimerRef.current) {
+      clearTimeout(reconnectTimerRef.current);
+      reconnectTimerRef.current = null;
+    }
     if (wsRef.current) {
       wsRef.current.close();
       wsRef.current = null;
@@ -243,56 +274,82 @@ export default function App() {
 
       const { session_id } = await resp.json();
 
-      // Step 2: Connect WebSocket to stream events
+      // Step 2: Connect WebSocket to stream events. A dropped connection is
+      // resumed with ?after=<last seq> so no events (or the result) are lost.
+      // ?lean=1: the complete event carries only the {status, interaction_data}
+      // fields ResultPanel renders, for pipeline and cached results alike.
       const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-      const wsUrl = `${wsProtocol}//${window.location.host}/ws/${session_id}`;
-      const ws = new WebSocket(wsUrl);
-      wsRef.current = ws;
-
-      ws.onmessage = (msg) => {
-        let e: WsEvent;
-        try {
-          e = JSON.parse(msg.data);
-        } catch {
-          return;
-        }
-
-        // Push to timeline log
-        const tlEvent = wsEventToTimeline(e);
-        if (tlEvent) {
-          setEventLog((prev) => [...prev, tlEvent]);
-        }
-
-        if (e.type === 'error') {
-          setError({ message: e.message, supported_drugs: e.supported_drugs });
+      let lastSeq = 0;
+      let finished = false;
+      let reconnects = 0;
+
+      const connect = () => {
+        reconnectTimerRef.current = null;
+        if (checkIdRef.current !== checkId) return;  // a newer check started meanwhile
+        const wsUrl = `${wsProtocol}//${window.location.host}/ws/${session_id}?lean=1&deltas=1&batch=1&after=${lastSeq}`;
+        const ws = new WebSocket(wsUrl);
+        wsRef.current = ws;
+
+        const handleEvent = (e: WsEvent) => {
+          if (e.seq) lastSeq = e.seq;
+          reconnects = 0;
+
+          // Push to timeline log
+          const tlEvent = wsEventToTimeline(e);
+          if (tlEvent) {
+            setEventLog((prev) => [...prev, tlEvent]);
+          }
+
+          if (e.type === 'error') {
+            finished = true;
+            setError({ message: e.message, supported_drugs: e.supported_drugs });
+            setIsLoading(false);
+            setPipeline((p) => p ? { ...p, status: 'error' } : null);
+            ws.close();
+            return;
+          }
+
+          if (e.type === 'complete') {
+            finished = true;
+            setResult(e.result);
+            setIsLoading(false);
+            setPipeline((p) => p ? { ...p, status: 'complete' } : null);
+            return;
+          }
+
+          setPipeline((prev) => {
+            if (!prev) return prev;
+            return applyEvent(prev, e);
+          });
+        };
+
+        ws.onmessage = (msg) => {
+          let frame: WsFrame;
+          try {
+            frame = JSON.parse(msg.data);
+          } catch {
+            return;
+          }
+          const events = frame.type === 'batch' ? frame.events : [frame];
+          for (const e of events) handleEvent(e);
+        };
+
+        ws.onclose = () => {
+          if (wsRef.current !== ws) return;  // superseded by a new check
+          wsRef.current = null;
+          if (finished) return;
+          if (reconnects < MAX_WS_RECONNECTS) {
+            reconnects += 1;
+            reconnectTimerRef.current = setTimeout(connect, 1000 * reconnects);
+            return;
+          }
+          setError({ message: 'WebSocket connection failed. Is the backend running?' });
           setIsLoading(false);
           setPipeline((p) => p ? { ...p, status: 'error' } : null);
-          ws.close();
-          return;
-        }
-
-        if (e.type === 'complete') {
-          setResult(e.result);
-          setIsLoading(false);
-          setPipeline((p) => p ? { ...p, status: 'complete' } : null);
-          return;
-        }
-
-        setPipeline((prev) => {
-          if (!prev) return prev;
-          return applyEvent(prev, e);
-        });
+        };
       };
 
-      ws.onerror = () => {
-        setError({ message: 'WebSocket connection failed. Is the backend running?' });
-        setIsLoading(false);
-        setPipeline((p) => p ? { ...p, status: 'error' } : null);
-      };
-
-      ws.onclose = () => {
-        wsRef.current = null;
-      };
+      connect();
     } catch (err: unknown) {
       const msg = err instanceof Error ? err.message : 'Failed to connect to backend';
       setError({ message: msg });
@@ -235,6 +235,15 @@ export default function PipelineGraph({ pipeline }: Props) {
               Live
             </span>
           )}
+          {isRunning && pipeline.provisionalSeverity && (
+            <span
+              className="text-[10px] text-amber-300 bg-amber-900/30 px-2 py-0.5 rounded-full font-medium"
+              title="From AYUSH / Allopathy data; research evidence pending"
+            >
+              Provisional: {pipeline.provisionalSeverity.severity}
+              {pipeline.provisionalSeverity.score !== undefined && ` (${pipeline.provisionalSeverity.score})`}
+            </span>
+          )}
           {pipeline.status === 'complete' && (
             <span className="text-[10px] text-green-500 bg-green-900/30 px-2 py-0.5 rounded-full font-medium">
               ✓ Complete
@@ -288,6 +297,27 @@ export default function PipelineGraph({ pipeline }: Props) {
           />
         ))}
 
+        {/* Reasoning answer as it streams in */}
+        {isRunning && pipeline.partialAnswer && (
+          <div className="border border-gray-800 rounded-lg p-3 space-y-1">
+            <div className="text-[10px] font-semibold text-gray-500 uppercase tracking-wide">
+              Analysis in progress
+            </div>
+            {typeof pipeline.partialAnswer.fields.interaction_summary === 'string' ? (
+              <p className="text-xs text-gray-300">{pipeline.partialAnswer.fields.interaction_summary}</p>
+            ) : (
+              <p className="text-[11px] text-gray-500 font-mono break-all">
+                {pipeline.partialAnswer.text.slice(-240)}
+              </p>
+            )}
+            {Object.keys(pipeline.partialAnswer.fields).length > 0 && (
+              <div className="text-[10px] text-gray-600">
+                Ready: {Object.keys(pipeline.partialAnswer.fields).join(', ')}
+              </div>
+            )}
+          </div>
+        )}
+
         {/* Loading state before first iteration */}
         {isRunning && pipeline.iterations.length === 0 && prePipeline.whitelist === 'completed' && (
           <div className="flex items-center gap-2 text-xs text-gray-500">
@@ -19,10 +19,14 @@ export type PipelineStatusEvent = {
     | "phase_evaluator"
     | "phase_scorer"
     | "gap_identified"
+    | "provisional_severity"
+    | "checkpoint_resume"
     | "formatting";
   message: string;
   iteration?: number;
   gap?: string;
+  severity?: string;
+  severity_score?: number;
   valid?: boolean;
   scientific_name?: string;
   original_name?: string;
@@ -82,12 +86,22 @@ export type AgentCompleteEvent = {
   message: string;
 };
 
+export type LlmDeltaEvent = {
+  type: "llm_delta";
+  agent: string;
+  agent_key?: string;
+  iteration?: number;
+  delta?: string;
+  fields?: Record<string, unknown>;
+  reset?: boolean;
+};
+
 export type CompleteEvent = {
   type: "complete";
   result: InteractionResult;
   cached: boolean;
   session_id?: string;
-  sources?: unknown[];
+  sources?: unknown[];  // cached results without ?lean=1 only
 };
 
 export type ErrorEvent = {
@@ -96,7 +110,8 @@ export type ErrorEvent = {
   supported_drugs?: string[];
 };
 
-export type WsEvent =
+// Every event carries its position in the session; reconnect with ?after=<seq>
+export type WsEvent = (
   | PipelineStatusEvent
   | AgentThinkingEvent
   | LlmCallEvent
@@ -104,8 +119,15 @@ export type WsEvent =
   | ToolCallEvent
   | ToolResultEvent
   | AgentCompleteEvent
+  | LlmDeltaEvent
   | CompleteEvent
-  | ErrorEvent;
+  | ErrorEvent
+) & { seq?: number };
+
+// ?batch=1: events queued within the server's batch window arrive in one frame
+export type BatchFrame = { type: "batch"; events: WsEvent[] };
+
+export type WsFrame = WsEvent | BatchFrame;
 
 // ── Pipeline state ────────────────────────────────────────────
 
@@ -142,6 +164,15 @@ export type PipelineState = {
     imppat_url?: string;
   };
   overallGaps: string[];
+  provisionalSeverity?: {
+    severity: string;
+    score?: number;
+  };
+  partialAnswer?: {
+    iteration?: number;
+    text: string;
+    fields: Record<string, unknown>;
+  };
 };
 
 // ── Final interaction result ──────────────────────────────────
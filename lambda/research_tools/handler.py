@@ -10,8 +10,7 @@ import json
 import sys
 import os
 import logging
-from urllib.request import Request, urlopen
-from urllib.error import URLError
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -21,18 +20,35 @@ sys.path.insert(0, "/var/task")
 
 import boto3
 from shared.bedrock_utils import bedrock_response
+from shared.search_cache import cached_search, wait_for_revalidations
+from shared.http_client import post_json, HttpClientError
 
 TAVILY_SECRET_ARN = os.environ.get(
     "TAVILY_SECRET_NAME", "ausadhi-mitra/tavily-api-key"
 )
-TAVILY_API_URL = "https://api.tavily.com/search"
+TAVILY_API_URL = os.environ.get("TAVILY_API_URL", "https://api.tavily.com/search")
 S3_BUCKET = os.environ.get("S3_BUCKET", "")
 
+# Query variants generated by search_clinical_evidence. All variants run
+# concurrently, so adding one costs roughly max() latency, not sum().
+CLINICAL_QUERY_TEMPLATES = {
+    "clinical": "{ayush} {allopathy} drug interaction clinical study",
+    "pkpd": "{ayush} {allopathy} pharmacokinetic pharmacodynamic interaction evidence",
+    "cyp": "{ayush} {allopathy} CYP450 enzyme inhibition induction metabolism",
+    "case_report": "{ayush} {allopathy} case report adverse event",
+}
+CLINICAL_QUERY_VARIANTS = [
+    v.strip() for v in os.environ.get("CLINICAL_QUERY_VARIANTS", "clinical,pkpd").split(",")
+    if v.strip() in CLINICAL_QUERY_TEMPLATES
+] or ["clinical", "pkpd"]
+SEARCH_MAX_WORKERS = int(os.environ.get("SEARCH_MAX_WORKERS", "4"))
+
 secrets_client = boto3.client("secretsmanager")
 s3 = boto3.client("s3")
 
 _tavily_key_cache = None
 _domain_config_cache = None
+_search_executor = None
 
 RESEARCH_DOMAINS_FALLBACK = [
     "pubmed.ncbi.nlm.nih.gov", "ncbi.nlm.nih.gov", "doi.org",
@@ -75,6 +91,11 @@ def lambda_handler(event, context):
         logger.exception(f"Error in {function}")
         result = {"error": str(e)}
 
+    # Stale cache entries refresh on threads Lambda would freeze after the response
+    pending = wait_for_revalidations()
+    if pending:
+        logger.warning(f"{pending} search cache refresh(es) still running at return")
+
     return bedrock_response(action_group, function, result)
 
 
@@ -121,10 +142,19 @@ def _get_tavily_key() -> str:
 
 
 def _tavily_search(query: str, max_results: int, include_domains: list) -> dict:
-    """Perform a Tavily search with domain restriction."""
+    """Perform a Tavily search with domain restriction, served from the search cache when fresh."""
+    return cached_search(
+        query, include_domains, "advanced", max_results,
+        fetch=lambda: _tavily_request(query, max_results, include_domains),
+        function="research_tools",
+    )
+
+
+def _tavily_request(query: str, max_results: int, include_domains: list) -> dict:
+    """Call the Tavily API directly (no cache)."""
     api_key = _get_tavily_key()
 
-    payload = json.dumps({
+    payload = {
         "api_key": api_key,
         "query": query,
         "search_depth": "advanced",
@@ -132,23 +162,25 @@ def _tavily_search(query: str, max_results: int, include_domains: list) -> dict:
         "include_answer": True,
         "include_raw_content": False,
         "include_domains": include_domains,
-    }).encode("utf-8")
-
-    req = Request(
-        TAVILY_API_URL,
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+    }
 
     try:
-        with urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read().decode("utf-8"))
-    except URLError as e:
+        return post_json(TAVILY_API_URL, payload, timeout=30)
+    except HttpClientError as e:
         logger.error(f"Tavily API error: {e}")
         raise RuntimeError(f"Web search failed: {e}")
 
 
+def _get_search_executor() -> ThreadPoolExecutor:
+    """Thread pool reused across warm invocations for concurrent Tavily queries."""
+    global _search_executor
+    if _search_executor is None:
+        _search_executor = ThreadPoolExecutor(
+            max_workers=max(SEARCH_MAX_WORKERS, 1), thread_name_prefix="tavily",
+        )
+    return _search_executor
+
+
 def search_research_articles(query: str, max_results: int = 5) -> dict:
     """Search PubMed and academic sources for research articles.
 
@@ -189,38 +221,44 @@ def search_clinical_evidence(ayush_name: str, allopathy_name: str,
                               max_results: int = 5) -> dict:
     """Search for clinical evidence of interaction between AYUSH and allopathy drug.
 
-    Auto-generates 2 targeted queries, deduplicates results across both searches.
+    Generates one query per configured variant (CLINICAL_QUERY_VARIANTS), runs them
+    concurrently and deduplicates results across all searches.
     Restricts to research/PubMed domains only.
     """
     if not ayush_name or not allopathy_name:
         return {"success": False, "message": "ayush_name and allopathy_name are required"}
 
     queries = [
-        f"{ayush_name} {allopathy_name} drug interaction clinical study",
-        f"{ayush_name} {allopathy_name} pharmacokinetic pharmacodynamic interaction evidence",
+        CLINICAL_QUERY_TEMPLATES[v].format(ayush=ayush_name, allopathy=allopathy_name)
+        for v in CLINICAL_QUERY_VARIANTS
     ]
 
     domains = _get_research_domains()
+    executor = _get_search_executor()
+    futures = [executor.submit(_tavily_search, q, max_results, domains) for q in queries]
+
     all_sources = []
     seen_urls = set()
 
-    for query in queries:
+    # Collect in query order so dedup keeps the same winner as a sequential run
+    for query, future in zip(queries, futures):
         try:
-            data = _tavily_search(query, max_results, domains)
-            for r in data.get("results", []):
-                url = r.get("url", "")
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
-                    all_sources.append({
-                        "url": url,
-                        "title": r.get("title", ""),
-                        "snippet": r.get("content", "")[:500],
-                        "score": r.get("score", 0),
-                        "category": "research_paper",
-                        "query_used": query,
-                    })
+            data = future.result()
         except RuntimeError as e:
             logger.warning(f"Query failed '{query}': {e}")
+            continue
+        for r in data.get("results", []):
+            url = r.get("url", "")
+            if url and url not in seen_urls:
+                seen_urls.add(url)
+                all_sources.append({
+                    "url": url,
+                    "title": r.get("title", ""),
+                    "snippet": r.get("content", "")[:500],
+                    "score": r.get("score", 0),
+                    "category": "research_paper",
+                    "query_used": query,
+                })
 
     all_sources.sort(key=lambda x: x.get("score", 0), reverse=True)
 
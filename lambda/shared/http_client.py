@@ -0,0 +1,202 @@
+"""
+Pooled keep-alive HTTP client for outbound calls from Lambda (Tavily search).
+
+Connections are kept per (scheme, host, port) in a module-level pool, so warm
+containers skip the TCP + TLS handshake on every call after the first. Adds
+connect/read timeouts, gzip response decoding and retry with full jitter on
+connection errors, 429 and 5xx.
+
+Each request logs its timing split: connect_ms (TCP + TLS handshake, 0 when a
+pooled connection was reused), ttfb_ms (request sent → first response byte)
+and transfer_ms (reading the body).
+"""
+import os
+import ssl
+import json
+import gzip
+import zlib
+import time
+import random
+import socket
+import logging
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "30"))
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "2"))
+HTTP_RETRY_BASE_DELAY = float(os.environ.get("HTTP_RETRY_BASE_DELAY", "0.5"))
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "8"))
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_NETWORK_ERRORS = (http.client.HTTPException, ConnectionError, socket.timeout, OSError)
+
+_ssl_context = ssl.create_default_context()
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+class HttpClientError(RuntimeError):
+    """Raised when a request fails after all retries."""
+
+    def __init__(self, message: str, status: int = None, body: bytes = b""):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+class HttpResponse:
+    def __init__(self, status: int, headers: dict, body: bytes, timings: dict):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.timings = timings
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+
+class _ConnectionPool:
+    """LIFO pool of idle keep-alive connections to one host."""
+
+    def __init__(self, scheme: str, host: str, port: int, maxsize: int):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.maxsize = maxsize
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> http.client.HTTPConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=HTTP_CONNECT_TIMEOUT, context=_ssl_context,
+            )
+        return http.client.HTTPConnection(self.host, self.port, timeout=HTTP_CONNECT_TIMEOUT)
+
+    def release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.maxsize:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+
+def _get_pool(scheme: str, host: str, port: int) -> _ConnectionPool:
+    key = (scheme, host, port)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _ConnectionPool(scheme, host, port, HTTP_POOL_SIZE)
+            _pools[key] = pool
+        return pool
+
+
+def _decode_body(body: bytes, encoding: str) -> bytes:
+    encoding = (encoding or "").lower()
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    return body
+
+
+def _backoff(attempt: int) -> float:
+    """Full jitter: uniform(0, base * 2^attempt)."""
+    return random.uniform(0, HTTP_RETRY_BASE_DELAY * (2 ** attempt))
+
+
+def request(method: str, url: str, body: bytes = None, headers: dict = None,
+            timeout: float = None, max_retries: int = None) -> HttpResponse:
+    """Send a request over a pooled connection, retrying transient failures."""
+    parts = urlsplit(url)
+    scheme = parts.scheme or "https"
+    port = parts.port or (443 if scheme == "https" else 80)
+    path = parts.path or "/"
+    if parts.query:
+        path += f"?{parts.query}"
+    read_timeout = timeout or HTTP_READ_TIMEOUT
+    retries = HTTP_MAX_RETRIES if max_retries is None else max_retries
+
+    req_headers = {"Accept-Encoding": "gzip", "Connection": "keep-alive"}
+    req_headers.update(headers or {})
+
+    pool = _get_pool(scheme, parts.hostname, port)
+    last_error = None
+
+    for attempt in range(retries + 1):
+        conn = pool.acquire()
+        reused = conn.sock is not None
+        timings = {"connect_ms": 0.0, "ttfb_ms": 0.0, "transfer_ms": 0.0}
+        try:
+            t0 = time.perf_counter()
+            if not reused:
+                conn.connect()
+                timings["connect_ms"] = (time.perf_counter() - t0) * 1000
+            conn.sock.settimeout(read_timeout)
+
+            t1 = time.perf_counter()
+            conn.request(method, path, body=body, headers=req_headers)
+            resp = conn.getresponse()
+            t2 = time.perf_counter()
+            raw = resp.read()
+            t3 = time.perf_counter()
+            timings["ttfb_ms"] = (t2 - t1) * 1000
+            timings["transfer_ms"] = (t3 - t2) * 1000
+
+            if resp.will_close:
+                conn.close()
+            else:
+                pool.release(conn)
+
+            data = _decode_body(raw, resp.getheader("Content-Encoding", ""))
+            logger.info(
+                f"HTTP {method} {parts.hostname}{parts.path} status={resp.status} "
+                f"reused={reused} connect_ms={timings['connect_ms']:.1f} "
+                f"ttfb_ms={timings['ttfb_ms']:.1f} transfer_ms={timings['transfer_ms']:.1f} "
+                f"bytes={len(raw)}/{len(data)} attempt={attempt + 1}"
+            )
+
+            if resp.status in _RETRYABLE_STATUS and attempt < retries:
+                last_error = HttpClientError(f"HTTP {resp.status}", resp.status, data)
+                time.sleep(_backoff(attempt))
+                continue
+            if resp.status >= 400:
+                raise HttpClientError(f"HTTP {resp.status} from {parts.hostname}", resp.status, data)
+
+            return HttpResponse(resp.status, dict(resp.getheaders()), data, timings)
+
+        except HttpClientError:
+            raise
+        except _NETWORK_ERRORS as e:
+            conn.close()
+            last_error = e
+            # A pooled connection the server already closed fails immediately;
+            # retry it on a fresh connection without backing off.
+            if reused and attempt < retries:
+                logger.info(f"Stale pooled connection to {parts.hostname}: {e}; reconnecting")
+                continue
+            if attempt < retries:
+                wait = _backoff(attempt)
+                logger.warning(f"HTTP {method} {parts.hostname} failed ({e}); retry {attempt + 1} in {wait:.2f}s")
+                time.sleep(wait)
+                continue
+
+    raise HttpClientError(f"Request to {parts.hostname} failed after {retries + 1} attempts: {last_error}")
+
+
+def post_json(url: str, payload: dict, timeout: float = None) -> dict:
+    """POST a JSON body and return the decoded JSON response."""
+    body = json.dumps(payload).encode("utf-8")
+    resp = request(
+        "POST", url, body=body,
+        headers={"Content-Type": "application/json", "Accept": "application/json"},
+        timeout=timeout,
+    )
+    return resp.json()
@@ -0,0 +1,310 @@
+"""
+Tavily search result cache shared by the research_tools and web_search Lambdas.
+
+Entries are keyed by normalized query + domain set + search depth + max_results
+and served with a TTL plus a stale-while-revalidate window. A stale entry is
+returned immediately while a background thread refreshes it; the handler
+calls wait_for_revalidations() before returning, because Lambda freezes the
+container (and that thread) once the invocation ends. Entries stale for more
+than SEARCH_CACHE_REFRESH_INLINE_SECONDS are refreshed inline instead.
+
+Backends (SEARCH_CACHE_BACKEND):
+  - "postgres": search_cache table in the aushadhimitra database (default)
+  - "file":     local JSON file, for tests and local runs (SEARCH_CACHE_FILE)
+  - "none":     caching disabled
+
+Hit/miss counts are logged as CloudWatch Embedded Metric Format records so
+hit rate shows up under the AushadhiMitra/SearchCache namespace.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_BACKEND = os.environ.get("SEARCH_CACHE_BACKEND", "postgres").lower()
+SEARCH_CACHE_TTL_SECONDS = int(os.environ.get("SEARCH_CACHE_TTL_SECONDS", str(3 * 24 * 3600)))
+SEARCH_CACHE_STALE_SECONDS = int(os.environ.get("SEARCH_CACHE_STALE_SECONDS", str(7 * 24 * 3600)))
+SEARCH_CACHE_REFRESH_INLINE_SECONDS = int(os.environ.get("SEARCH_CACHE_REFRESH_INLINE_SECONDS", str(24 * 3600)))
+SEARCH_CACHE_REVALIDATE_WAIT_SECONDS = float(os.environ.get("SEARCH_CACHE_REVALIDATE_WAIT_SECONDS", "10"))
+SEARCH_CACHE_FILE = os.environ.get("SEARCH_CACHE_FILE", "/tmp/ausadhi_search_cache.json")
+
+METRIC_NAMESPACE = "AushadhiMitra/SearchCache"
+
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "errors": 0}
+_stats_lock = threading.Lock()
+_revalidating = set()
+_revalidations: list = []  # refresh threads started during this invocation
+_revalidating_lock = threading.Lock()
+_cache_instance = None
+
+
+def make_cache_key(query: str, include_domains: list = None,
+                   search_depth: str = "advanced", max_results: int = 5) -> str:
+    """Build a stable cache key from the parts of a Tavily request that affect results."""
+    normalized = {
+        "q": " ".join((query or "").lower().split()),
+        "d": sorted({d.lower().strip() for d in (include_domains or []) if d}),
+        "depth": (search_depth or "").lower(),
+        "n": int(max_results),
+    }
+    raw = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ──────────────────────────────────────────────────────────────
+# Backends
+# ──────────────────────────────────────────────────────────────
+
+class NullSearchCache:
+    def get(self, key: str) -> Optional[dict]:
+        return None
+
+    def put(self, key: str, query: str, data: dict) -> None:
+        return None
+
+
+class PostgresSearchCache:
+    """search_cache table: (cache_key PK, query, response JSONB, cached_at).
+
+    One autocommit connection per warm container, shared by the search
+    executor threads under a lock (each statement is a single-row lookup or
+    upsert). A connection dropped while the container was frozen is
+    reopened once and the statement retried.
+    """
+
+    def __init__(self):
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        from shared.db_utils import get_db
+
+        if self._conn is None or self._conn.closed:
+            self._conn = get_db()
+            self._conn.autocommit = True
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple, fetch: bool = False):
+        from shared.db_utils import psycopg2
+
+        with self._lock:
+            for attempt in (1, 2):
+                conn = self._connection()
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(sql, params)
+                        return cur.fetchone() if fetch else None
+                except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                    self._close()
+                    if attempt == 2:
+                        raise
+                    logger.info("Search cache connection lost; reconnecting")
+
+    def _close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    def get(self, key: str) -> Optional[dict]:
+        row = self._execute(
+            """SELECT response, EXTRACT(EPOCH FROM (NOW() - cached_at)) AS age
+               FROM search_cache WHERE cache_key = %s""",
+            (key,), fetch=True,
+        )
+        if not row:
+            return None
+        data = row["response"]
+        if isinstance(data, str):
+            data = json.loads(data)
+        return {"data": data, "age": float(row["age"])}
+
+    def put(self, key: str, query: str, data: dict) -> None:
+        self._execute(
+            """INSERT INTO search_cache (cache_key, query, response, cached_at)
+               VALUES (%s, %s, %s, NOW())
+               ON CONFLICT (cache_key) DO UPDATE SET
+                   query = EXCLUDED.query,
+                   response = EXCLUDED.response,
+                   cached_at = NOW()""",
+            (key, query[:1000], json.dumps(data)),
+        )
+
+
+class FileSearchCache:
+    """JSON-file cache for tests and local runs. Not safe across processes."""
+
+    def __init__(self, path: str = SEARCH_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._read().get(key)
+        if not entry:
+            return None
+        return {"data": entry["data"], "age": time.time() - entry["cached_at"]}
+
+    def put(self, key: str, query: str, data: dict) -> None:
+        with self._lock:
+            entries = self._read()
+            entries[key] = {"query": query, "data": data, "cached_at": time.time()}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+
+
+def get_search_cache():
+    """Return the configured cache backend (module-level singleton)."""
+    global _cache_instance
+    if _cache_instance is None:
+        if SEARCH_CACHE_BACKEND == "file":
+            _cache_instance = FileSearchCache()
+        elif SEARCH_CACHE_BACKEND == "postgres":
+            _cache_instance = PostgresSearchCache()
+        else:
+            _cache_instance = NullSearchCache()
+    return _cache_instance
+
+
+# ──────────────────────────────────────────────────────────────
+# Metrics
+# ──────────────────────────────────────────────────────────────
+
+def _record(outcome: str, function: str) -> None:
+    with _stats_lock:
+        _stats[outcome] += 1
+    logger.info(json.dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": METRIC_NAMESPACE,
+                "Dimensions": [["Function"]],
+                "Metrics": [
+                    {"Name": "CacheHit", "Unit": "Count"},
+                    {"Name": "CacheStaleHit", "Unit": "Count"},
+                    {"Name": "CacheMiss", "Unit": "Count"},
+                    {"Name": "CacheError", "Unit": "Count"},
+                ],
+            }],
+        },
+        "Function": function,
+        "CacheHit": int(outcome == "hits"),
+        "CacheStaleHit": int(outcome == "stale_hits"),
+        "CacheMiss": int(outcome == "misses"),
+        "CacheError": int(outcome == "errors"),
+    }))
+
+
+def get_stats() -> dict:
+    """Counters for this container plus the overall hit rate (fresh + stale)."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+    stats["hit_rate"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 3) if lookups else 0.0
+    return stats
+
+
+# ──────────────────────────────────────────────────────────────
+# Cached search
+# ──────────────────────────────────────────────────────────────
+
+def _revalidate(cache, key: str, query: str, fetch: Callable[[], dict]) -> None:
+    try:
+        cache.put(key, query, fetch())
+    except Exception as e:
+        logger.warning(f"Search cache revalidation failed for '{query}': {e}")
+    finally:
+        with _revalidating_lock:
+            _revalidating.discard(key)
+
+
+def wait_for_revalidations(timeout: float = None) -> int:
+    """Join the stale-entry refreshes started during this invocation.
+
+    Handlers call this before returning: Lambda freezes the container as
+    soon as the response is sent, so a refresh still running would stall
+    until the next thaw (or never run). Returns how many are still running
+    after `timeout` (default SEARCH_CACHE_REVALIDATE_WAIT_SECONDS); their
+    keys stay marked so a later invocation does not start a duplicate.
+    """
+    deadline = time.monotonic() + (SEARCH_CACHE_REVALIDATE_WAIT_SECONDS if timeout is None else timeout)
+    with _revalidating_lock:
+        threads, _revalidations[:] = list(_revalidations), []
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    return sum(thread.is_alive() for thread in threads)
+
+
+def cached_search(query: str, include_domains: list, search_depth: str,
+                  max_results: int, fetch: Callable[[], dict],
+                  function: str = "search", cache=None) -> dict:
+    """Return Tavily results for the request, calling fetch() only when needed.
+
+    fetch() must return the parsed Tavily response or raise; failures are
+    never cached. A stale entry is refreshed on a thread the handler joins
+    with wait_for_revalidations(), or inline (falling back to the stale data
+    if fetch() fails) once it is SEARCH_CACHE_REFRESH_INLINE_SECONDS past
+    the TTL.
+    """
+    cache = cache or get_search_cache()
+    key = make_cache_key(query, include_domains, search_depth, max_results)
+
+    entry = None
+    try:
+        entry = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Search cache read failed: {e}")
+        _record("errors", function)
+
+    if entry is not None:
+        age = entry["age"]
+        if age <= SEARCH_CACHE_TTL_SECONDS:
+            _record("hits", function)
+            return entry["data"]
+        if age <= SEARCH_CACHE_TTL_SECONDS + SEARCH_CACHE_STALE_SECONDS:
+            _record("stale_hits", function)
+            if age > SEARCH_CACHE_TTL_SECONDS + SEARCH_CACHE_REFRESH_INLINE_SECONDS:
+                try:
+                    data = fetch()
+                except Exception as e:
+                    logger.warning(f"Inline search cache refresh failed for '{query}': {e}")
+                    return entry["data"]
+                try:
+                    cache.put(key, query, data)
+                except Exception as e:
+                    logger.warning(f"Search cache write failed: {e}")
+                    _record("errors", function)
+                return data
+            with _revalidating_lock:
+                if key not in _revalidating:
+                    _revalidating.add(key)
+                    thread = threading.Thread(
+                        target=_revalidate, args=(cache, key, query, fetch), daemon=True,
+                    )
+                    thread.start()
+                    _revalidations.append(thread)
+            return entry["data"]
+
+    _record("misses", function)
+    data = fetch()
+    try:
+        cache.put(key, query, data)
+    except Exception as e:
+        logger.warning(f"Search cache write failed: {e}")
+        _record("errors", function)
+    return data
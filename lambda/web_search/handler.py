@@ -13,8 +13,6 @@ import sys
 import os
 import logging
 import re
-from urllib.request import Request, urlopen
-from urllib.error import URLError
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -24,11 +22,13 @@ sys.path.insert(0, "/var/task")
 
 import boto3
 from shared.bedrock_utils import bedrock_response
+from shared.search_cache import cached_search, wait_for_revalidations
+from shared.http_client import post_json, HttpClientError
 
 TAVILY_SECRET_ARN = os.environ.get(
     "TAVILY_SECRET_NAME", "ausadhi-mitra/tavily-api-key"
 )
-TAVILY_API_URL = "https://api.tavily.com/search"
+TAVILY_API_URL = os.environ.get("TAVILY_API_URL", "https://api.tavily.com/search")
 S3_BUCKET = os.environ.get("S3_BUCKET", "")
 
 secrets_client = boto3.client("secretsmanager")
@@ -86,6 +86,11 @@ def lambda_handler(event, context):
         logger.exception(f"Error in {function}")
         result = {"error": str(e)}
 
+    # Stale cache entries refresh on threads Lambda would freeze after the response
+    pending = wait_for_revalidations()
+    if pending:
+        logger.warning(f"{pending} search cache refresh(es) still running at return")
+
     return bedrock_response(action_group, function, result)
 
 
@@ -168,16 +173,9 @@ def _categorize_source(url: str, title: str, snippet: str) -> str:
     return "general"
 
 
-def web_search(query: str, search_depth: str = "basic", max_results: int = 5,
-               include_domains: list = None) -> dict:
-    """Search the web using Tavily API for drug interaction data.
-
-    Returns structured results with full source metadata and category labels.
-    Optionally restricts search to specific domains via include_domains list.
-    """
-    if not query:
-        return {"success": False, "message": "query is required"}
-
+def _tavily_request(query: str, search_depth: str, max_results: int,
+                    include_domains: list = None) -> dict:
+    """Call the Tavily API directly (no cache). Raises RuntimeError on failure."""
     api_key = _get_tavily_key()
 
     payload_data = {
@@ -191,23 +189,35 @@ def web_search(query: str, search_depth: str = "basic", max_results: int = 5,
 
     if include_domains:
         payload_data["include_domains"] = include_domains
-        logger.info(f"Restricting search to {len(include_domains)} domains")
 
-    payload = json.dumps(payload_data).encode("utf-8")
+    try:
+        return post_json(TAVILY_API_URL, payload_data, timeout=30)
+    except HttpClientError as e:
+        logger.error(f"Tavily API error: {e}")
+        raise RuntimeError(f"Web search failed: {e}")
+
+
+def web_search(query: str, search_depth: str = "basic", max_results: int = 5,
+               include_domains: list = None) -> dict:
+    """Search the web using Tavily API for drug interaction data.
+
+    Returns structured results with full source metadata and category labels.
+    Optionally restricts search to specific domains via include_domains list.
+    """
+    if not query:
+        return {"success": False, "message": "query is required"}
 
-    req = Request(
-        TAVILY_API_URL,
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+    if include_domains:
+        logger.info(f"Restricting search to {len(include_domains)} domains")
 
     try:
-        with urlopen(req, timeout=30) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-    except URLError as e:
-        logger.error(f"Tavily API error: {e}")
-        return {"success": False, "message": f"Web search failed: {e}"}
+        data = cached_search(
+            query, include_domains, search_depth, max_results,
+            fetch=lambda: _tavily_request(query, search_depth, max_results, include_domains),
+            function="web_search",
+        )
+    except RuntimeError as e:
+        return {"success": False, "message": str(e)}
 
     sources = []
     categories_found = {}
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Fault-injection benchmark for pipeline checkpoints (app/checkpoints.py):
+a run for one pair is killed part-way through, then retried, with and
+without the checkpoint journal.
+
+The "crash" freezes the checkpoint store at --crash-at fractions of an
+uninterrupted run's wall time (nothing the dying worker does afterwards is
+persisted) and abandons the run. The retry is a fresh run for the same pair.
+
+Agents are served by the replay client (app/agent_replay.py) from synthetic
+streams at realistic real-time latency (divided by --speed): Planner 4s,
+AYUSH 12s, Allopathy 10s, Research 15s, Reasoning 25s.
+
+Reported per crash point, in real-time seconds:
+  bedrock_plain  agent seconds the retry pays without checkpoints
+  bedrock_ckpt   agent seconds the retry pays when resuming
+  saved          Bedrock time saved by the journal (also from the run stats)
+  retry_plain / retry_ckpt  retry wall time
+
+Usage:
+  python scripts/bench_checkpoint_resume.py
+  python scripts/bench_checkpoint_resume.py --speed 1 --crash-at 0.5 0.9
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAIR = ("Curcuma longa", "warfarin")
+
+RESPONSES = {
+    "planner": json.dumps({"agents": {k: {"run": True} for k in ("ayush", "allopathy", "research")}}),
+    "ayush": ("Curcuma longa contains Curcumin and Demethoxycurcumin as key bioactive compounds. "
+              "Curcumin inhibits CYP2C9 and CYP3A4 in human liver microsomes. "
+              "https://cb.imsc.res.in/imppat/phytochemical/Curcuma%20longa"),
+    "allopathy": ("Warfarin is a narrow therapeutic index drug. S-warfarin is metabolized by CYP2C9. "
+                  "See https://go.drugbank.com/drugs/DB00682"),
+    "research": ("Case reports describe elevated INR and bleeding with turmeric and warfarin. "
+                 "Curcumin has additive antiplatelet activity. "
+                 "https://pubmed.ncbi.nlm.nih.gov/22531131/ https://pubmed.ncbi.nlm.nih.gov/30000001/"),
+    "reasoning": json.dumps({
+        "interaction_exists": True,
+        "interaction_summary": "Curcumin may potentiate warfarin through CYP2C9 inhibition and "
+                               "additive antiplatelet activity, raising bleeding risk.",
+        "mechanisms": {
+            "pharmacokinetic": ["CYP2C9 inhibition raises S-warfarin exposure"],
+            "pharmacodynamic": ["Additive antiplatelet effect"],
+        },
+        "phytochemicals_involved": ["Curcumin", "Demethoxycurcumin"],
+        "cyp_enzymes": [{"name": "CYP2C9", "effect": "inhibitor"}, {"name": "CYP3A4", "effect": "inhibitor"}],
+        "clinical_effects": ["Elevated INR", "Bleeding risk"],
+        "recommendations": ["Monitor INR when starting or stopping turmeric supplements."],
+        "sources": [{"url": "https://pubmed.ncbi.nlm.nih.gov/22531131/", "title": "Turmeric and warfarin"},
+                    {"url": "https://pubmed.ncbi.nlm.nih.gov/30000001/", "title": "Curcumin antiplatelet"}],
+        "reasoning_chain": [{"step": i, "reasoning": "evidence review", "evidence": "proposer output"}
+                            for i in range(1, 4)],
+    }),
+}
+
+LATENCY = {"planner": 4.0, "ayush": 12.0, "allopathy": 10.0, "research": 15.0, "reasoning": 25.0}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Checkpoint resume fault-injection benchmark (replayed agents)")
+    parser.add_argument("--speed", type=float, default=10.0,
+                        help="agent latency divisor (1 = real Bedrock timing)")
+    parser.add_argument("--crash-at", type=float, nargs="+", default=[0.1, 0.3, 0.5, 0.7, 0.9],
+                        help="crash points as fractions of an uninterrupted run")
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+
+# app.config reads these at import time
+os.environ["AGENT_CLIENT_MODE"] = "replay"
+os.environ["AGENT_FIXTURE_DIR"] = tempfile.mkdtemp(prefix="checkpoint_fixtures_")
+os.environ["PROPOSER_CACHE_ENABLED"] = "false"
+os.environ["PRE_EVAL_ENABLED"] = "false"
+os.environ["CHECKPOINT_MODE"] = "memory"
+
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+import logging  # noqa: E402
+
+from app import agent_replay, agent_service, checkpoints  # noqa: E402
+
+logging.getLogger().setLevel(logging.ERROR)
+
+
+class _CountingReplayClient(agent_replay.ReplayBedrockClient):
+    """Adds up the real-time seconds of every agent stream it serves."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.seconds = 0.0
+
+    def invoke_agent(self, **kwargs):
+        resp = super().invoke_agent(**kwargs)
+        self.seconds += self._latency(kwargs.get("agentId"))
+        return resp
+
+    @staticmethod
+    def _latency(agent_id: str) -> float:
+        for key, agent in agent_service.AGENTS.items():
+            if agent["id"] == agent_id:
+                return LATENCY[key]
+        return 0.0
+
+
+class _CrashableStore(checkpoints.MemoryStore):
+    """A memory journal that stops persisting once its worker has 'died'."""
+
+    def __init__(self):
+        super().__init__()
+        self.dead = False
+
+    def save(self, key: str, row: dict) -> None:
+        if not self.dead:
+            super().save(key, row)
+
+
+def _fixture_store() -> agent_replay.FixtureStore:
+    store = agent_replay.FixtureStore(os.environ["AGENT_FIXTURE_DIR"])
+    for i, (target, text) in enumerate(RESPONSES.items()):
+        total = LATENCY[target]
+        events = [{"t": round(total * k / 5, 3), "trace": {"trace": {"orchestrationTrace": {
+            "rationale": {"text": f"{target} step {k}"}}}}} for k in range(1, 5)]
+        events.append({"t": total, "chunk": text})
+        store.write({"kind": "agent", "target": target, "input_sha": "synthetic",
+                     "input_preview": "synthetic checkpoint-bench stream", "recorded_at": i,
+                     "first_byte": 0.5, "duration": total, "events": events})
+    return store
+
+
+def _run(crash_after: float = None, store: _CrashableStore = None) -> dict:
+    """Run the pair once; with crash_after, kill it after that many seconds."""
+    client = agent_service._bedrock_runtime
+    client.seconds = 0.0
+    if crash_after is not None:
+        threading.Timer(crash_after, lambda: setattr(store, "dead", True)).start()
+    start = time.perf_counter()
+    stats = {}
+    for event_type, data in agent_service.run_check(*PAIR):
+        if store is not None and store.dead:
+            break
+        if event_type == "done":
+            stats = data.get("stats", {}).get("checkpoints", {})
+        elif event_type == "error":
+            sys.exit(f"pipeline error: {data.get('message')}")
+    return {"wall": time.perf_counter() - start, "bedrock": client.seconds, "stats": stats}
+
+
+def main():
+    agent_service._bedrock_runtime = _CountingReplayClient(_fixture_store(), ARGS.speed)
+    scale = ARGS.speed or 1.0
+
+    checkpoints.CHECKPOINT_MODE = "off"
+    baseline = _run()
+    print(f"speed {ARGS.speed:g}; uninterrupted run {baseline['wall'] * scale:.1f}s wall, "
+          f"{baseline['bedrock']:.1f}s of agent time; seconds in real-time terms\n")
+    print(f"{'crash at':>8} {'bedrock_plain':>13} {'bedrock_ckpt':>12} {'saved':>7} "
+          f"{'retry_plain':>11} {'retry_ckpt':>10}  restored steps")
+
+    for fraction in ARGS.crash_at:
+        # Without checkpoints the retry simply starts over
+        checkpoints.CHECKPOINT_MODE = "off"
+        plain = _run()
+
+        checkpoints.CHECKPOINT_MODE = "memory"
+        store = _CrashableStore()
+        checkpoints._store = store
+        _run(crash_after=baseline["wall"] * fraction, store=store)
+        time.sleep(max(LATENCY.values()) / scale)  # let the abandoned run's agent threads drain
+        store.dead = False
+        resumed = _run(store=None)
+
+        restored = ", ".join(r["step"] for r in resumed["stats"].get("restored", [])) or "-"
+        print(f"{fraction:>8.0%} {plain['bedrock']:>13.1f} {resumed['bedrock']:>12.1f} "
+              f"{plain['bedrock'] - resumed['bedrock']:>7.1f} {plain['wall'] * scale:>11.1f} "
+              f"{resumed['wall'] * scale:>10.1f}  {restored} "
+              f"(run stats: {resumed['stats'].get('bedrock_seconds_saved', 0.0) * scale:.1f}s saved)")
+    checkpoints._store = None
+
+
+if __name__ == "__main__":
+    main()
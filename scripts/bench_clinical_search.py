@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for research_tools.search_clinical_evidence against a local
+Tavily stand-in (scripts/tavily_stub.py). No AWS or Tavily credentials needed.
+
+Runs the function repeatedly for 1..N query variants, once with a single worker
+(sequential baseline) and once with the concurrent pool, and prints p50/p95.
+
+Usage:
+  python scripts/bench_clinical_search.py
+  python scripts/bench_clinical_search.py --runs 30 --median-ms 400
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "lambda")
+
+from tavily_stub import start_stub_server
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[idx]
+
+
+def _load_handler(stub_url: str):
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ["TAVILY_API_URL"] = stub_url
+    os.environ["SEARCH_CACHE_BACKEND"] = "none"
+    sys.path.insert(0, os.path.join(LAMBDA_DIR, "research_tools"))
+    sys.path.insert(0, LAMBDA_DIR)
+    import handler
+    handler._tavily_key_cache = "stub-key"
+    handler._domain_config_cache = {"presets": {"research": {"include_domains": handler.RESEARCH_DOMAINS_FALLBACK}}}
+    return handler
+
+
+def _time_runs(handler, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = handler.search_clinical_evidence("Curcuma longa", "warfarin", 5)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert result.get("success"), result
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="search_clinical_evidence latency benchmark")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--median-ms", type=float, default=600)
+    parser.add_argument("--sigma", type=float, default=0.35)
+    args = parser.parse_args()
+
+    server = start_stub_server(median_ms=args.median_ms, sigma=args.sigma)
+    handler = _load_handler(f"http://127.0.0.1:{server.server_port}/search")
+    all_variants = list(handler.CLINICAL_QUERY_TEMPLATES)
+
+    print(f"Tavily stub: median {args.median_ms:.0f} ms, sigma {args.sigma}, {args.runs} runs per cell\n")
+    print(f"{'variants':>8} {'mode':>10} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    for n in range(1, len(all_variants) + 1):
+        handler.CLINICAL_QUERY_VARIANTS = all_variants[:n]
+        for mode, workers in (("sequential", 1), ("parallel", max(n, 1))):
+            handler.SEARCH_MAX_WORKERS = workers
+            handler._search_executor = None
+            samples = _time_runs(handler, args.runs)
+            print(f"{n:>8} {mode:>10} {_percentile(samples, 50):>9.0f} "
+                  f"{_percentile(samples, 95):>9.0f} {statistics.mean(samples):>9.0f}")
+
+    print(f"\nStub requests served: {server.request_count}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Session event bus benchmark (app/event_bus.py): publisher threads stand in
+for pipeline threads and one asyncio reader per session reads the way
+/ws/{session_id} does (aread, 50ms sleep when idle).
+
+Each session publishes --events events at --rate events/s with a payload of
+--payload bytes, then "__done__". Reported per bus:
+  publish_us   mean cost of publish() in the pipeline thread
+  p50 / p99    publish -> reader latency (ms)
+  events/s     events delivered per second across all sessions
+  replay_ms    re-reading a finished session from offset 0
+and whether every reader saw seq 1..N in order.
+
+--abandon N adds the scanner / closed-tab case for the local bus: N
+sessions publish a pipeline's worth of events (one --tool-payload sized
+tool result per 10 events) and are never read. Reported: retained bytes
+with the per-session caps (EVENT_BUS_MAX_EVENTS / EVENT_BUS_MAX_BYTES)
+and after one reap() past EVENT_BUS_UNCLAIMED_TTL_SECONDS.
+
+--bus postgres needs the DB_* settings and the session_events table
+(scripts/setup_db_lambda.py).
+
+Usage:
+  python scripts/bench_event_bus.py
+  python scripts/bench_event_bus.py --bus local postgres --sessions 16 --events 400
+  python scripts/bench_event_bus.py --abandon 200 --events 2000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Session event bus benchmark")
+    parser.add_argument("--bus", nargs="+", default=["local"], choices=["local", "postgres"])
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions")
+    parser.add_argument("--events", type=int, default=300, help="events per session")
+    parser.add_argument("--rate", type=float, default=200.0, help="events/s per session (0 = flat out)")
+    parser.add_argument("--payload", type=int, default=400, help="approximate bytes per event")
+    parser.add_argument("--abandon", type=int, default=0, help="sessions published to but never read")
+    parser.add_argument("--tool-payload", type=int, default=50_000, help="bytes per tool result (--abandon)")
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+from app import event_bus  # noqa: E402
+
+
+def _publisher(bus, session_id: str, sent: dict):
+    filler = "x" * ARGS.payload
+    costs = []
+    for i in range(ARGS.events):
+        start = time.perf_counter()
+        seq = bus.publish(session_id, "trace", {"i": i, "text": filler, "t": time.time()})
+        costs.append(time.perf_counter() - start)
+        sent[seq] = time.time()
+        if ARGS.rate:
+            time.sleep(1.0 / ARGS.rate)
+    bus.publish(session_id, "__done__", {})
+    sent["costs"] = costs
+
+
+async def _reader(bus, session_id: str) -> dict:
+    latencies, seqs = [], []
+    after = 0
+    while True:
+        events = await bus.aread(session_id, after)
+        if not events:
+            await asyncio.sleep(0.05)
+            continue
+        now = time.time()
+        for seq, event_type, data in events:
+            after = seq
+            if event_type == "__done__":
+                return {"latencies": latencies, "seqs": seqs}
+            if event_type == "trace":
+                seqs.append(data["i"])
+                latencies.append(now - data["t"])
+
+
+async def _bench(bus) -> dict:
+    sessions = [str(uuid.uuid4()) for _ in range(ARGS.sessions)]
+    sent = {sid: {} for sid in sessions}
+    for sid in sessions:
+        bus.create(sid)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=_publisher, args=(bus, sid, sent[sid]), daemon=True) for sid in sessions]
+    for t in threads:
+        t.start()
+    results = await asyncio.gather(*(_reader(bus, sid) for sid in sessions))
+    wall = time.perf_counter() - start
+    for t in threads:
+        t.join()
+
+    replay_start = time.perf_counter()
+    replayed, after = 0, 0
+    while True:
+        events = bus.read(sessions[0], after)
+        if not events:
+            break
+        replayed += len(events)
+        after = events[-1][0]
+    replay_ms = (time.perf_counter() - replay_start) * 1000
+
+    latencies = sorted(x for r in results for x in r["latencies"])
+    costs = [c for s in sent.values() for c in s["costs"]]
+    ordered = all(r["seqs"] == list(range(ARGS.events)) for r in results)
+    for sid in sessions:
+        bus.close(sid)
+    return {
+        "publish_us": statistics.mean(costs) * 1e6,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+        "rate": len(latencies) / wall,
+        "replay_ms": replay_ms,
+        "replayed": replayed,
+        "ordered": ordered,
+    }
+
+
+def _abandoned():
+    bus = event_bus.LocalEventBus()
+    filler, tool = "x" * ARGS.payload, "y" * ARGS.tool_payload
+    published = 0
+    for _ in range(ARGS.abandon):
+        sid = str(uuid.uuid4())
+        bus.create(sid)
+        for i in range(ARGS.events):
+            data = {"i": i, "text": tool if i % 10 == 0 else filler}
+            bus.publish(sid, "trace", data)
+            published += len(data["text"])
+        bus.publish(sid, "done", {"result": {"text": filler}})
+    retained = bus.retained_bytes()
+    event_bus.EVENT_BUS_UNCLAIMED_TTL_SECONDS = 0
+    reaped = bus.reap()
+    print(f"\nabandoned: {ARGS.abandon} sessions, {published / 1e6:.1f} MB published; "
+          f"retained {retained / 1e6:.1f} MB with caps ({event_bus.EVENT_BUS_MAX_EVENTS} events / "
+          f"{event_bus.EVENT_BUS_MAX_BYTES / 1e6:.1f} MB per session, {event_bus.EVENT_BUS_MAX_SESSIONS} sessions); "
+          f"reap dropped {reaped}, {bus.retained_bytes()} bytes left")
+
+
+def main():
+    print(f"{ARGS.sessions} sessions x {ARGS.events} events at {ARGS.rate:g}/s, ~{ARGS.payload} B each\n")
+    print(f"{'bus':<9} {'publish_us':>10} {'p50_ms':>7} {'p99_ms':>7} {'events/s':>9} {'replay_ms':>9}  ordered")
+    for name in ARGS.bus:
+        bus = event_bus.PostgresEventBus() if name == "postgres" else event_bus.LocalEventBus()
+        r = asyncio.run(_bench(bus))
+        print(f"{name:<9} {r['publish_us']:>10.1f} {r['p50']:>7.1f} {r['p99']:>7.1f} {r['rate']:>9.0f} "
+              f"{r['replay_ms']:>9.1f}  {'yes' if r['ordered'] else 'NO'} ({r['replayed']} events replayed)")
+    if ARGS.abandon:
+        _abandoned()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tail latency of one proposer agent with and without hedged invocations
+(app/hedging.py), served by the replay client from synthetic streams with a
+long-tailed latency distribution: most Research calls take 10-16s, a
+--tail-share of them 40-60s (real-time seconds, divided by --speed).
+
+The unhedged pass runs first and also fills the in-process latency history
+the hedge delay (HEDGE_PERCENTILE) is computed from; the hedged pass then
+replays the same fixture sequence. Reported: p50 / p95 / p99 / max, hedge
+rate, hedges won, and hedges withheld by the budget.
+
+Usage:
+  python scripts/bench_hedging.py
+  python scripts/bench_hedging.py --calls 400 --concurrency 8 --percentile 95 --budget 0.05
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENT = "research"
+PROMPT = "Search for clinical evidence of interactions between Curcuma longa and warfarin."
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Hedged proposer invocation benchmark (replayed agents)")
+    parser.add_argument("--calls", type=int, default=200, help="invocations per pass")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--speed", type=float, default=20.0,
+                        help="agent latency divisor (1 = real Bedrock timing)")
+    parser.add_argument("--tail-share", type=float, default=0.08, help="share of slow streams")
+    parser.add_argument("--percentile", type=float, default=90.0, help="HEDGE_PERCENTILE")
+    parser.add_argument("--budget", type=float, default=0.1, help="HEDGE_BUDGET_RATIO")
+    parser.add_argument("--seed", type=int, default=11)
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+
+# app.config reads these at import time
+os.environ["AGENT_CLIENT_MODE"] = "replay"
+os.environ["AGENT_FIXTURE_DIR"] = tempfile.mkdtemp(prefix="hedge_fixtures_")
+os.environ["HEDGE_AGENTS"] = AGENT
+os.environ["HEDGE_PERCENTILE"] = str(ARGS.percentile)
+os.environ["HEDGE_BUDGET_RATIO"] = str(ARGS.budget)
+
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+import logging  # noqa: E402
+
+from app import agent_replay, agent_service, hedging, instrumentation  # noqa: E402
+
+logging.getLogger().setLevel(logging.WARNING)
+
+
+def _write_fixtures(directory: str, n: int) -> None:
+    store = agent_replay.FixtureStore(directory)
+    rng = random.Random(ARGS.seed)
+    for i in range(n):
+        total = rng.uniform(40.0, 60.0) if rng.random() < ARGS.tail_share else rng.uniform(10.0, 16.0)
+        events = [{"t": round(total * k / 5, 3), "trace": {"trace": {"orchestrationTrace": {
+            "rationale": {"text": f"searching, step {k}"}}}}} for k in range(1, 5)]
+        events.append({"t": round(total, 3), "chunk": f"Research findings #{i}: https://pubmed.ncbi.nlm.nih.gov/22531131/"})
+        store.write({"kind": "agent", "target": AGENT, "input_sha": f"synthetic{i:04d}",
+                     "input_preview": "synthetic hedging-bench stream", "recorded_at": i,
+                     "first_byte": 0.5, "duration": total, "events": events})
+
+
+def _pct(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(pct / 100.0 * len(ordered)), len(ordered) - 1)]
+
+
+def _pass(hedged: bool) -> tuple:
+    agent_service._bedrock_runtime = agent_replay.ReplayBedrockClient(
+        agent_replay.FixtureStore(os.environ["AGENT_FIXTURE_DIR"]), ARGS.speed,
+    )
+
+    def one(i):
+        session_id = f"hedge-bench-{i}"
+        start = time.perf_counter()
+        if hedged:
+            _, _, stats = hedging.invoke(AGENT, lambda agent_session_id, cancel: agent_service._invoke_agent_collect(
+                AGENT, PROMPT, session_id, cancel_event=cancel, agent_session_id=agent_session_id))
+        else:
+            agent_service._invoke_agent_collect(AGENT, PROMPT, session_id)
+            hedging.record_latency(AGENT, time.perf_counter() - start)
+            stats = {}
+        return (time.perf_counter() - start) * ARGS.speed, stats
+
+    with ThreadPoolExecutor(max_workers=ARGS.concurrency) as pool:
+        results = list(pool.map(one, range(ARGS.calls)))
+    return [r[0] for r in results], [r[1] for r in results]
+
+
+def main():
+    _write_fixtures(os.environ["AGENT_FIXTURE_DIR"], ARGS.calls)
+    print(f"{ARGS.calls} {AGENT} calls per pass, concurrency {ARGS.concurrency}, speed {ARGS.speed:g}, "
+          f"hedge at p{ARGS.percentile:g}, budget {ARGS.budget:g}; seconds in real-time terms\n")
+    print(f"{'pass':<10} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7}  hedges")
+    rows = {}
+    for name, hedged in (("unhedged", False), ("hedged", True)):
+        latencies, stats = _pass(hedged)
+        rows[name] = latencies
+        note = "-"
+        if hedged:
+            n_hedged = sum(1 for s in stats if s.get("hedged"))
+            won = sum(1 for s in stats if s.get("winner") == "hedge")
+            withheld = sum(1 for s in stats if s.get("skipped"))
+            note = (f"{n_hedged}/{len(stats)} ({100 * n_hedged / len(stats):.1f}%), {won} won by the hedge, "
+                    f"{withheld} withheld; delay {hedging.hedge_delay(AGENT):.2f}s at replay speed")
+        print(f"{name:<10} {_pct(latencies, 50):>7.1f} {_pct(latencies, 95):>7.1f} "
+              f"{_pct(latencies, 99):>7.1f} {max(latencies):>7.1f}  {note}")
+
+    before, after = rows["unhedged"], rows["hedged"]
+    print(f"\np99 {_pct(before, 99):.1f}s -> {_pct(after, 99):.1f}s, "
+          f"p95 {_pct(before, 95):.1f}s -> {_pct(after, 95):.1f}s")
+    extra = instrumentation.counter_value("ausadhi_hedges_total", agent=AGENT)
+    print(f"extra agent invocations: {extra:g} ({100 * extra / ARGS.calls:.1f}% of calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Perceived latency of the Reasoning answer with and without streamed answer
+chunks (REASONING_STREAM_DELTAS): llm_delta events carry each chunk plus the
+top-level answer fields it completed (app/json_stream.py).
+
+Agents are served by the replay client (app/agent_replay.py) from synthetic
+streams at realistic real-time latency (divided by --speed): Planner 4s,
+proposers 10-15s, Reasoning --reasoning-seconds. Without streaming the
+Reasoning answer arrives as one chunk at the end of the call (Bedrock
+buffers the final response); with streamFinalResponse it is replayed as
+--chunks chunks spread over the last --answer-share of the call.
+
+Reported per mode, mean over --runs (seconds from the Reasoning call start):
+  first_text  first answer text the UI can show
+  summary     interaction_summary complete
+  all_fields  every top-level answer field complete
+  done        final result
+  parse_ms    JSONFieldStream cost over the whole answer (streamed only)
+
+Usage:
+  python scripts/bench_llm_delta.py
+  python scripts/bench_llm_delta.py --speed 1 --runs 1 --chunks 120
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAIR = ("Curcuma longa", "warfarin")
+
+ANSWER = {
+    "interaction_exists": True,
+    "interaction_summary": "Curcumin may potentiate warfarin through CYP2C9 inhibition and "
+                           "additive antiplatelet activity, raising bleeding risk.",
+    "mechanisms": {
+        "pharmacokinetic": ["CYP2C9 inhibition raises S-warfarin exposure"],
+        "pharmacodynamic": ["Additive antiplatelet effect"],
+    },
+    "phytochemicals_involved": ["Curcumin", "Demethoxycurcumin"],
+    "cyp_enzymes": [{"name": "CYP2C9", "effect": "inhibitor"}, {"name": "CYP3A4", "effect": "inhibitor"}],
+    "clinical_effects": ["Elevated INR", "Bleeding risk"],
+    "recommendations": ["Monitor INR when starting or stopping turmeric supplements."],
+    "sources": [{"url": "https://pubmed.ncbi.nlm.nih.gov/22531131/", "title": "Turmeric and warfarin"},
+                {"url": "https://pubmed.ncbi.nlm.nih.gov/30000001/", "title": "Curcumin antiplatelet"}],
+    "reasoning_chain": [{"step": i, "reasoning": "evidence review " * 8, "evidence": "proposer output"}
+                        for i in range(1, 7)],
+}
+
+RESPONSES = {
+    "planner": json.dumps({"agents": {k: {"run": True} for k in ("ayush", "allopathy", "research")}}),
+    "ayush": ("Curcuma longa contains Curcumin and Demethoxycurcumin as key bioactive compounds. "
+              "Curcumin inhibits CYP2C9 and CYP3A4 in human liver microsomes. "
+              "https://cb.imsc.res.in/imppat/phytochemical/Curcuma%20longa"),
+    "allopathy": ("Warfarin is a narrow therapeutic index drug. S-warfarin is metabolized by CYP2C9. "
+                  "See https://go.drugbank.com/drugs/DB00682"),
+    "research": ("Case reports describe elevated INR and bleeding with turmeric and warfarin. "
+                 "https://pubmed.ncbi.nlm.nih.gov/22531131/"),
+    "reasoning": json.dumps(ANSWER, indent=2),
+}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Streamed Reasoning answer benchmark (replayed agents)")
+    parser.add_argument("--runs", type=int, default=3, help="runs per mode")
+    parser.add_argument("--speed", type=float, default=10.0,
+                        help="agent latency divisor (1 = real Bedrock timing)")
+    parser.add_argument("--reasoning-seconds", type=float, default=25.0)
+    parser.add_argument("--answer-share", type=float, default=0.6,
+                        help="share of the Reasoning call spent writing the answer")
+    parser.add_argument("--chunks", type=int, default=60, help="answer chunks when streamed")
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+
+# app.config reads these at import time
+os.environ["AGENT_CLIENT_MODE"] = "replay"
+os.environ["AGENT_FIXTURE_DIR"] = tempfile.mkdtemp(prefix="llm_delta_fixtures_")
+os.environ["PROPOSER_CACHE_ENABLED"] = "false"
+os.environ["PRE_EVAL_ENABLED"] = "false"
+
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+import logging  # noqa: E402
+
+from app import agent_replay, agent_service  # noqa: E402
+from app.json_stream import JSONFieldStream  # noqa: E402
+
+logging.getLogger().setLevel(logging.WARNING)
+
+LATENCY = {"planner": 4.0, "ayush": 12.0, "allopathy": 10.0, "research": 15.0,
+           "reasoning": ARGS.reasoning_seconds}
+
+
+class _BenchReplayClient(agent_replay.ReplayBedrockClient):
+    """Serves streamFinalResponse calls from the chunked Reasoning fixture."""
+
+    def invoke_agent(self, **kwargs):
+        if kwargs.get("streamingConfigurations", {}).get("streamFinalResponse"):
+            kwargs = dict(kwargs, agentId="reasoning_streamed")
+        return super().invoke_agent(**kwargs)
+
+
+def _fixture_store() -> agent_replay.FixtureStore:
+    store = agent_replay.FixtureStore(os.environ["AGENT_FIXTURE_DIR"])
+    fixtures = {key: [(LATENCY[key], text)] for key, text in RESPONSES.items()}
+    answer = RESPONSES["reasoning"]
+    total = LATENCY["reasoning"]
+    writing_from = total * (1 - ARGS.answer_share)
+    size = -(-len(answer) // ARGS.chunks)
+    fixtures["reasoning_streamed"] = [
+        (round(writing_from + (total - writing_from) * (k + 1) / ARGS.chunks, 4), answer[k * size:(k + 1) * size])
+        for k in range(ARGS.chunks) if answer[k * size:(k + 1) * size]
+    ]
+    for i, (target, chunks) in enumerate(fixtures.items()):
+        total = LATENCY.get(target, LATENCY["reasoning"])
+        events = [{"t": round(total * k / 5, 3), "trace": {"trace": {"orchestrationTrace": {
+            "rationale": {"text": f"{target} step {k}"}}}}} for k in range(1, 3)]
+        events += [{"t": t, "chunk": text} for t, text in chunks]
+        store.write({"kind": "agent", "target": target, "input_sha": "synthetic",
+                     "input_preview": "synthetic llm-delta-bench stream", "recorded_at": i,
+                     "first_byte": 0.5, "duration": total, "events": events})
+    return store
+
+
+def _run_once() -> dict:
+    marks = {}
+    reasoning_start = None
+    start = time.perf_counter()
+    for event_type, data in agent_service.run_check(*PAIR):
+        now = time.perf_counter() - start
+        if reasoning_start is None and data.get("agent_key") == "reasoning":
+            reasoning_start = now
+        if event_type == "llm_delta":
+            marks.setdefault("first_text", now)
+            if "interaction_summary" in data.get("fields", {}):
+                marks.setdefault("summary", now)
+            if "reasoning_chain" in data.get("fields", {}):
+                marks.setdefault("all_fields", now)
+        elif event_type == "error":
+            sys.exit(f"pipeline error: {data.get('message')}")
+    done = time.perf_counter() - start
+    base = reasoning_start or 0.0
+    result = {k: marks.get(k, done) - base for k in ("first_text", "summary", "all_fields")}
+    result["done"] = done - base
+    return result
+
+
+def _parse_cost_ms(repeat: int = 200) -> float:
+    answer = RESPONSES["reasoning"]
+    size = -(-len(answer) // ARGS.chunks)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parser = JSONFieldStream()
+        for k in range(0, len(answer), size):
+            parser.feed(answer[k:k + size])
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    agent_service._bedrock_runtime = _BenchReplayClient(_fixture_store(), ARGS.speed)
+    scale = ARGS.speed or 1.0
+    print(f"speed {ARGS.speed:g}, {ARGS.runs} run(s) per mode, Reasoning {ARGS.reasoning_seconds:g}s, "
+          f"{ARGS.chunks} chunks; seconds in real-time terms from the Reasoning call start\n")
+    print(f"{'mode':<10} {'first_text':>10} {'summary':>8} {'all_fields':>10} {'done':>7}")
+    means = {}
+    for mode, enabled in (("buffered", False), ("streamed", True)):
+        agent_service.REASONING_STREAM_DELTAS = enabled
+        runs = [_run_once() for _ in range(ARGS.runs)]
+        means[mode] = {k: statistics.mean(r[k] for r in runs) * scale for k in runs[0]}
+        m = means[mode]
+        print(f"{mode:<10} {m['first_text']:>10.1f} {m['summary']:>8.1f} {m['all_fields']:>10.1f} {m['done']:>7.1f}")
+
+    before, after = means["buffered"], means["streamed"]
+    print(f"\nfirst answer text: {before['first_text']:.1f}s -> {after['first_text']:.1f}s; "
+          f"summary: {before['summary']:.1f}s -> {after['summary']:.1f}s; "
+          f"done: {before['done']:.1f}s -> {after['done']:.1f}s")
+    print(f"incremental parse: {_parse_cost_ms():.3f} ms per answer ({len(RESPONSES['reasoning'])} chars)")
+
+
+if __name__ == "__main__":
+    main()
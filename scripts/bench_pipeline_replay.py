@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Offline throughput / latency benchmark of the CO-MAS pipeline from recorded
+agent streams (backend/app/agent_replay.py).
+
+Record once against live Bedrock agents (host AWS credentials):
+  python scripts/bench_pipeline_replay.py --record
+  python scripts/bench_pipeline_replay.py --record --pairs "Curcuma longa:warfarin"
+
+Then replay with no network. --speed 0 (default) drops all recorded waits, so
+wall time is pure orchestration overhead (prompt building, parsing, evidence
+packing, scoring, reasoning_core); --speed 1 reproduces real agent timing.
+--ws drives the same runs through POST /api/check + /ws/{session_id} on an
+in-process uvicorn server to include the WebSocket path.
+
+  python scripts/bench_pipeline_replay.py --runs 50
+  python scripts/bench_pipeline_replay.py --runs 20 --concurrency 8 --speed 20
+  python scripts/bench_pipeline_replay.py --runs 20 --ws
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FIXTURES = os.path.join(REPO, "fixtures", "agent_streams")
+
+E2E_PAIRS = [
+    ("Curcuma longa", "warfarin"),
+    ("Withania somnifera", "atorvastatin"),
+]
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="CO-MAS pipeline record / replay benchmark")
+    parser.add_argument("--record", action="store_true", help="run live agents and write fixtures")
+    parser.add_argument("--pairs", nargs="*", help='"ayush:allopathy" pairs (default: e2e scenarios)')
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="fixture directory")
+    parser.add_argument("--runs", type=int, default=20, help="replayed runs per pair")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="replay speed: 0 = no recorded waits, 1 = real time")
+    parser.add_argument("--ws", action="store_true", help="go through the HTTP + WebSocket path")
+    parser.add_argument("--port", type=int, default=8765)
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+
+# app.config reads these at import time
+os.environ["AGENT_CLIENT_MODE"] = "record" if ARGS.record else "replay"
+os.environ["AGENT_FIXTURE_DIR"] = os.path.abspath(ARGS.fixtures)
+os.environ["AGENT_REPLAY_SPEED"] = str(ARGS.speed)
+os.environ.setdefault("PROPOSER_CACHE_ENABLED", "false")
+
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+from app import agent_service  # noqa: E402
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[idx]
+
+
+def _run_direct(ayush: str, allopathy: str) -> dict:
+    start = time.perf_counter()
+    first_event = None
+    events = 0
+    done = {}
+    for event_type, data in agent_service.run_check(ayush, allopathy):
+        events += 1
+        if first_event is None:
+            first_event = time.perf_counter() - start
+        if event_type == "done":
+            done = data
+        elif event_type == "error":
+            return {"error": data.get("message", "error")}
+    return {
+        "seconds": time.perf_counter() - start,
+        "first_event": first_event or 0.0,
+        "events": events,
+        "iterations": done.get("iterations", 0),
+    }
+
+
+def _start_server(port: int):
+    import uvicorn
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    for _ in range(100):
+        if server.started:
+            return server
+        time.sleep(0.05)
+    sys.exit(f"uvicorn did not start on port {port}")
+
+
+def _run_ws(ayush: str, allopathy: str) -> dict:
+    from websockets.sync.client import connect
+
+    start = time.perf_counter()
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{ARGS.port}/api/check",
+        data=json.dumps({"ayush_name": ayush, "allopathy_name": allopathy}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req) as resp:
+        session_id = json.loads(resp.read())["session_id"]
+
+    first_event = None
+    events = 0
+    with connect(f"ws://127.0.0.1:{ARGS.port}/ws/{session_id}", max_size=None) as ws:
+        for message in ws:
+            events += 1
+            if first_event is None:
+                first_event = time.perf_counter() - start
+            event = json.loads(message)
+            if event.get("type") == "error":
+                return {"error": event.get("message", "error")}
+            if event.get("type") == "complete":
+                break
+    return {
+        "seconds": time.perf_counter() - start,
+        "first_event": first_event or 0.0,
+        "events": events,
+        "iterations": 0,
+    }
+
+
+def _record(pairs: list) -> None:
+    for ayush, allopathy in pairs:
+        result = _run_direct(ayush, allopathy)
+        if "error" in result:
+            print(f"{ayush} + {allopathy}: ERROR {result['error']}")
+            continue
+        print(f"{ayush} + {allopathy}: recorded {result['iterations']} iteration(s) "
+              f"in {result['seconds']:.1f}s")
+    count = len([n for n in os.listdir(ARGS.fixtures) if n.endswith(".json")]) if os.path.isdir(ARGS.fixtures) else 0
+    print(f"\n{count} fixture files in {ARGS.fixtures}")
+
+
+def main():
+    pairs = [tuple(p.split(":", 1)) for p in ARGS.pairs] if ARGS.pairs else E2E_PAIRS
+
+    if ARGS.record:
+        _record(pairs)
+        return
+
+    if not os.path.isdir(ARGS.fixtures) or not os.listdir(ARGS.fixtures):
+        sys.exit(f"No fixtures in {ARGS.fixtures} — run with --record first")
+
+    run_one = _run_direct
+    if ARGS.ws:
+        _start_server(ARGS.port)
+        run_one = _run_ws
+
+    run_one(*pairs[0])  # warm-up: fixture load, reference JSON, reasoning_core import
+
+    jobs = [pair for pair in pairs for _ in range(ARGS.runs)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=ARGS.concurrency) as pool:
+        results = list(pool.map(lambda pair: run_one(*pair), jobs))
+    wall = time.perf_counter() - start
+
+    errors = [r for r in results if "error" in r]
+    ok = [r for r in results if "error" not in r]
+    path = "HTTP + WebSocket" if ARGS.ws else "run_check generator"
+    print(f"{path}, speed {ARGS.speed:g}, concurrency {ARGS.concurrency}: "
+          f"{len(ok)} runs ok, {len(errors)} errors")
+    if errors:
+        print(f"  first error: {errors[0]['error']}")
+    if not ok:
+        return
+
+    seconds = [r["seconds"] * 1000 for r in ok]
+    first = [r["first_event"] * 1000 for r in ok]
+    print(f"  run latency      p50 {_percentile(seconds, 50):>9.1f} ms   p95 {_percentile(seconds, 95):>9.1f} ms   "
+          f"mean {statistics.mean(seconds):.1f} ms")
+    print(f"  first event      p50 {_percentile(first, 50):>9.1f} ms   p95 {_percentile(first, 95):>9.1f} ms")
+    print(f"  events per run   {statistics.mean(r['events'] for r in ok):.0f}")
+    print(f"  throughput       {len(ok) / wall:.2f} runs/s ({wall:.1f}s wall)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency and time-to-provisional-severity with and without the
+pipelined Evaluator (PIPELINED_EVALUATOR): Reasoning starts on AYUSH /
+Allopathy evidence while Research is still searching, and research facts
+are folded in with a short incremental update.
+
+Agents are served by the replay client (app/agent_replay.py) from synthetic
+streams at realistic real-time latency (divided by --speed): Planner 4s,
+AYUSH 12s, Allopathy 10s, Research --research-seconds, full Reasoning 25s,
+incremental Reasoning update --delta-seconds.
+
+Reported per mode, mean over --runs:
+  provisional  run start -> provisional_severity event (pipelined only)
+  severity     run start -> first severity the UI can show
+  done         run start -> final result
+  reasoning    Reasoning calls made (early / delta / skip / full)
+
+Usage:
+  python scripts/bench_pipelined_evaluator.py
+  python scripts/bench_pipelined_evaluator.py --speed 1 --runs 1 --research-seconds 30
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAIR = ("Curcuma longa", "warfarin")
+
+RESPONSES = {
+    "planner": json.dumps({"agents": {k: {"run": True} for k in ("ayush", "allopathy", "research")}}),
+    "ayush": ("Curcuma longa contains Curcumin and Demethoxycurcumin as key bioactive compounds. "
+              "Curcumin inhibits CYP2C9 and CYP3A4 in human liver microsomes. "
+              "https://cb.imsc.res.in/imppat/phytochemical/Curcuma%20longa"),
+    "allopathy": ("Warfarin is a narrow therapeutic index drug. S-warfarin is metabolized by CYP2C9. "
+                  "See https://go.drugbank.com/drugs/DB00682"),
+    "research": ("Case reports describe elevated INR and bleeding with turmeric and warfarin. "
+                 "Curcumin has additive antiplatelet activity. "
+                 "https://pubmed.ncbi.nlm.nih.gov/22531131/ https://pubmed.ncbi.nlm.nih.gov/30000001/"),
+    "reasoning": json.dumps({
+        "interaction_exists": True,
+        "interaction_summary": "Curcumin may potentiate warfarin through CYP2C9 inhibition and "
+                               "additive antiplatelet activity, raising bleeding risk.",
+        "mechanisms": {
+            "pharmacokinetic": ["CYP2C9 inhibition raises S-warfarin exposure"],
+            "pharmacodynamic": ["Additive antiplatelet effect"],
+        },
+        "phytochemicals_involved": ["Curcumin", "Demethoxycurcumin"],
+        "cyp_enzymes": [{"name": "CYP2C9", "effect": "inhibitor"}, {"name": "CYP3A4", "effect": "inhibitor"}],
+        "clinical_effects": ["Elevated INR", "Bleeding risk"],
+        "recommendations": ["Monitor INR when starting or stopping turmeric supplements."],
+        "sources": [{"url": "https://pubmed.ncbi.nlm.nih.gov/22531131/", "title": "Turmeric and warfarin"},
+                    {"url": "https://pubmed.ncbi.nlm.nih.gov/30000001/", "title": "Curcumin antiplatelet"}],
+        "reasoning_chain": [{"step": i, "reasoning": "evidence review", "evidence": "proposer output"}
+                            for i in range(1, 4)],
+    }),
+}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Pipelined Evaluator benchmark (replayed agents)")
+    parser.add_argument("--runs", type=int, default=3, help="runs per mode")
+    parser.add_argument("--speed", type=float, default=10.0,
+                        help="agent latency divisor (1 = real Bedrock timing)")
+    parser.add_argument("--research-seconds", type=float, default=20.0)
+    parser.add_argument("--delta-seconds", type=float, default=8.0,
+                        help="incremental Reasoning update latency")
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+
+# app.config reads these at import time
+os.environ["AGENT_CLIENT_MODE"] = "replay"
+os.environ["AGENT_FIXTURE_DIR"] = tempfile.mkdtemp(prefix="pipelined_fixtures_")
+os.environ["PROPOSER_CACHE_ENABLED"] = "false"
+os.environ["PRE_EVAL_ENABLED"] = "false"
+os.environ["REASONING_EVIDENCE_PACKING"] = "true"  # the pipelined Evaluator builds on packed evidence
+
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+import logging  # noqa: E402
+
+from app import agent_replay, agent_service  # noqa: E402
+
+logging.getLogger().setLevel(logging.WARNING)
+
+# Real-time seconds to final chunk
+LATENCY = {
+    "planner": 4.0,
+    "ayush": 12.0,
+    "allopathy": 10.0,
+    "research": ARGS.research_seconds,
+    "reasoning": 25.0,
+    "reasoning_update": ARGS.delta_seconds,
+}
+
+
+class _BenchReplayClient(agent_replay.ReplayBedrockClient):
+    """Serves incremental Reasoning updates from their own (shorter) fixture."""
+
+    def invoke_agent(self, **kwargs):
+        if kwargs.get("inputText", "").startswith("UPDATE ("):
+            kwargs = dict(kwargs, agentId="reasoning_update")
+        return super().invoke_agent(**kwargs)
+
+
+def _fixture_store() -> agent_replay.FixtureStore:
+    store = agent_replay.FixtureStore(os.environ["AGENT_FIXTURE_DIR"])
+    responses = dict(RESPONSES, reasoning_update=RESPONSES["reasoning"])
+    for i, (target, text) in enumerate(responses.items()):
+        total = LATENCY[target]
+        events = [{"t": round(total * k / 5, 3), "trace": {"trace": {"orchestrationTrace": {
+            "rationale": {"text": f"{target} step {k}"}}}}} for k in range(1, 5)]
+        events.append({"t": total, "chunk": text})
+        store.write({"kind": "agent", "target": target, "input_sha": "synthetic",
+                     "input_preview": "synthetic pipelined-bench stream", "recorded_at": i,
+                     "first_byte": 0.5, "duration": total, "events": events})
+    return store
+
+
+def _run_once() -> dict:
+    start = time.perf_counter()
+    provisional = None
+    calls = []
+    for event_type, data in agent_service.run_check(*PAIR):
+        if event_type == "pipeline_status" and data.get("status") == "provisional_severity" and provisional is None:
+            provisional = time.perf_counter() - start
+        elif event_type == "done":
+            calls = [c["mode"] for c in data.get("stats", {}).get("reasoning_calls", [])]
+        elif event_type == "error":
+            sys.exit(f"pipeline error: {data.get('message')}")
+    done = time.perf_counter() - start
+    return {"provisional": provisional, "severity": provisional or done, "done": done, "calls": calls}
+
+
+def main():
+    agent_service._bedrock_runtime = _BenchReplayClient(_fixture_store(), ARGS.speed)
+    scale = ARGS.speed or 1.0
+    print(f"speed {ARGS.speed:g}, {ARGS.runs} run(s) per mode, research {ARGS.research_seconds:g}s, "
+          f"update {ARGS.delta_seconds:g}s; seconds in real-time terms\n")
+    print(f"{'mode':<12} {'provisional':>11} {'severity':>9} {'done':>8}  reasoning calls")
+    means = {}
+    for mode, enabled in (("sequential", False), ("pipelined", True)):
+        agent_service.PIPELINED_EVALUATOR = enabled
+        runs = [_run_once() for _ in range(ARGS.runs)]
+        provisional = [r["provisional"] for r in runs if r["provisional"] is not None]
+        means[mode] = {
+            "severity": statistics.mean(r["severity"] for r in runs) * scale,
+            "done": statistics.mean(r["done"] for r in runs) * scale,
+        }
+        prov = f"{statistics.mean(provisional) * scale:>11.1f}" if provisional else f"{'-':>11}"
+        print(f"{mode:<12} {prov} {means[mode]['severity']:>9.1f} {means[mode]['done']:>8.1f}  "
+              f"{', '.join(runs[-1]['calls'])}")
+
+    before, after = means["sequential"], means["pipelined"]
+    print(f"\nfirst severity: {before['severity']:.1f}s -> {after['severity']:.1f}s; "
+          f"end to end: {before['done']:.1f}s -> {after['done']:.1f}s "
+          f"({after['done'] - before['done']:+.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
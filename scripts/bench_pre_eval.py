@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+How many Reasoning calls the pre-evaluation scorer saves, measured against
+stubbed agents (no AWS needed).
+
+Each scenario controls what the first proposer pass is missing (phytochemicals,
+CYP pathway, sources, mechanisms); a TARGETED SEARCH re-run then fills it. The
+Reasoning stub can only report what appears in its prompt, so the scorer sees
+the same gaps a real run would. Every scenario runs with PRE_EVAL_ENABLED off
+and on, and the script reports Reasoning calls, total agent calls and simulated
+wall time (per-agent latencies scaled by --time-scale).
+
+Usage:
+  python scripts/bench_pre_eval.py
+  python scripts/bench_pre_eval.py --time-scale 0.02
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+os.environ.setdefault("PROPOSER_CACHE_ENABLED", "false")
+
+from app import agent_service  # noqa: E402
+
+# Typical Bedrock agent latencies (seconds), scaled down by --time-scale
+AGENT_LATENCY = {"planner": 4, "ayush": 12, "allopathy": 10, "research": 15, "reasoning": 25}
+
+FULL = {
+    "ayush": ("Curcuma longa contains Curcumin and Demethoxycurcumin as key bioactive compounds. "
+              "Curcumin inhibits CYP2C9 and CYP3A4 in human liver microsomes."),
+    "allopathy": ("Warfarin is a narrow therapeutic index drug. S-warfarin is metabolized by CYP2C9. "
+                  "See https://go.drugbank.com/drugs/DB00682"),
+    "research": ("Case reports describe elevated INR and bleeding with turmeric and warfarin. "
+                 "Curcumin has additive antiplatelet activity. "
+                 "https://pubmed.ncbi.nlm.nih.gov/22531131/ https://pubmed.ncbi.nlm.nih.gov/30000001/"),
+}
+THIN = {
+    "ayush": "Curcuma longa is a widely used culinary and medicinal plant in Ayurveda.",
+    "allopathy": "Warfarin is a commonly prescribed oral medication.",
+    "research": "Turmeric is commonly taken as a dietary supplement by patients.",
+}
+
+SCENARIOS = [
+    ("complete first pass", set()),
+    ("AYUSH thin", {"ayush"}),
+    ("Research thin", {"research"}),
+    ("AYUSH + Research thin", {"ayush", "research"}),
+    ("AYUSH + Allopathy thin", {"ayush", "allopathy"}),
+    ("all proposers thin", {"ayush", "allopathy", "research"}),
+]
+
+
+class StubAgents:
+    def __init__(self, thin_first_pass: set, time_scale: float):
+        self.thin = thin_first_pass
+        self.time_scale = time_scale
+        self.calls = {k: 0 for k in AGENT_LATENCY}
+
+    def invoke(self, agent_key, input_text, session_id, *args, **kwargs):
+        self.calls[agent_key] += 1
+        time.sleep(AGENT_LATENCY[agent_key] * self.time_scale)
+        yield ("trace", {"type": "thinking", "agent": agent_key, "message": "stub"})
+        if agent_key == "planner":
+            yield ("response", json.dumps({"agents": {k: {"run": True} for k in ("ayush", "allopathy", "research")}}))
+        elif agent_key == "reasoning":
+            yield ("response", json.dumps(self._reason(input_text)))
+        else:
+            targeted = input_text.startswith("TARGETED SEARCH")
+            thin = agent_key in self.thin and not targeted
+            yield ("response", THIN[agent_key] if thin else FULL[agent_key])
+
+    @staticmethod
+    def _reason(prompt: str) -> dict:
+        """Analysis containing only what the prompt gave evidence for."""
+        analysis = {
+            "interaction_exists": True,
+            "interaction_summary": "Turmeric may interact with warfarin; the evidence provided was "
+                                   "reviewed for pharmacokinetic and pharmacodynamic effects.",
+            "reasoning_chain": [{"step": 1, "reasoning": "evidence review"},
+                                {"step": 2, "reasoning": "severity assessment"}],
+            "mechanisms": {"pharmacokinetic": [], "pharmacodynamic": []},
+        }
+        phytos = sorted(set(re.findall(r"\b(Curcumin|Demethoxycurcumin)\b", prompt)))
+        if phytos:
+            analysis["phytochemicals_involved"] = phytos
+        cyps = sorted(set(re.findall(r"CYP\d[A-Z]\d+", prompt)))
+        if cyps:
+            analysis["cyp_enzymes"] = [{"name": c, "effect": "inhibitor"} for c in cyps]
+            analysis["mechanisms"]["pharmacokinetic"].append(f"{', '.join(cyps)} inhibition")
+        if re.search(r"antiplatelet|bleeding", prompt, re.I):
+            analysis["mechanisms"]["pharmacodynamic"].append("Additive antiplatelet effect")
+        return analysis
+
+
+def _run(thin: set, pre_eval: bool, time_scale: float) -> dict:
+    stub = StubAgents(thin, time_scale)
+    agent_service._invoke_agent = stub.invoke
+    agent_service.PRE_EVAL_ENABLED = pre_eval
+    start = time.perf_counter()
+    done = {}
+    for event_type, data in agent_service.run_comas_pipeline(
+        "turmeric", "warfarin", "Curcuma longa", "https://cb.imsc.res.in/imppat/", "bench",
+    ):
+        if event_type == "done":
+            done = data
+    elapsed = time.perf_counter() - start
+    calls = done["stats"]["reasoning_calls"]
+    return {
+        "reasoning_calls": stub.calls["reasoning"],
+        "agent_calls": sum(stub.calls.values()),
+        "iterations": done["iterations"],
+        "score": calls[-1].get("score", 0) if calls else 0,
+        "sim_seconds": elapsed / time_scale if time_scale else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-evaluation scorer benchmark (stubbed agents)")
+    parser.add_argument("--time-scale", type=float, default=0.005,
+                        help="fraction of real agent latency to sleep (default 0.005)")
+    args = parser.parse_args()
+
+    agent_service.log_iteration_gap = lambda *a, **k: None
+
+    print(f"{'scenario':<38} {'pre-eval':>8} {'reasoning':>9} {'agents':>6} {'iters':>5} {'score':>5} {'sim s':>7}")
+    totals = {False: [0, 0, 0.0], True: [0, 0, 0.0]}
+    for name, thin in SCENARIOS:
+        for pre_eval in (False, True):
+            r = _run(thin, pre_eval, args.time_scale)
+            t = totals[pre_eval]
+            t[0] += r["reasoning_calls"]
+            t[1] += r["agent_calls"]
+            t[2] += r["sim_seconds"]
+            print(f"{name:<38} {'on' if pre_eval else 'off':>8} {r['reasoning_calls']:>9} "
+                  f"{r['agent_calls']:>6} {r['iterations']:>5} {r['score']:>5.0f} {r['sim_seconds']:>7.0f}")
+
+    n = len(SCENARIOS)
+    print("\nPer run (mean over scenarios):")
+    for pre_eval in (False, True):
+        reasoning, agents, seconds = totals[pre_eval]
+        print(f"  pre-eval {'on ' if pre_eval else 'off'}: {reasoning / n:.2f} Reasoning calls, "
+              f"{agents / n:.1f} agent calls, ~{seconds / n:.0f}s simulated")
+    saved = (totals[False][0] - totals[True][0]) / n
+    print(f"  Reasoning calls saved per run: {saved:.2f}")
+
+
+if __name__ == "__main__":
+    main()
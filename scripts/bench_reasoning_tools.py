@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Per-iteration latency of the reasoning tools step: in-process reasoning_core
+vs invoking the ausadhi-reasoning-tools Lambda.
+
+Every CO-MAS iteration calls compile_and_validate_output once, plus
+calculate_severity when the Reasoning agent skipped it. The local numbers need
+no credentials. --remote also invokes the deployed Lambda (host AWS
+credentials) and reads Duration / Init Duration from the log tail, so cold
+starts show up separately from warm round trips.
+
+Usage:
+  python scripts/bench_reasoning_tools.py
+  python scripts/bench_reasoning_tools.py --remote --runs 20
+  python scripts/bench_reasoning_tools.py --remote --cold 3   # force 3 cold starts
+"""
+import argparse
+import base64
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+os.environ["REASONING_TOOLS_MODE"] = "local"
+
+from app import reasoning_tools  # noqa: E402
+
+LAMBDA_NAME = os.environ.get("REASONING_TOOLS_LAMBDA", "ausadhi-reasoning-tools")
+
+SEVERITY_INPUT = {
+    "cyp_enzymes": [
+        {"name": "CYP2C9", "effect": "inhibitor"},
+        {"name": "CYP3A4", "effect": "inhibitor"},
+        {"name": "CYP1A2", "effect": "interaction"},
+    ],
+}
+GRAPH_INPUT = {
+    "ayush_admet": {"absorption": "Poor oral bioavailability", "metabolism": "Hepatic glucuronidation"},
+    "allopathy_admet": {"absorption": "Rapid, complete", "metabolism": "CYP2C9 (S-warfarin)"},
+    "cyp_enzymes": SEVERITY_INPUT["cyp_enzymes"],
+}
+ANALYSIS_DATA = {
+    "interaction_exists": True,
+    "interaction_summary": "Curcumin may potentiate the anticoagulant effect of warfarin through "
+                           "CYP2C9 inhibition and additive antiplatelet activity.",
+    "mechanisms": {
+        "pharmacokinetic": ["CYP2C9 inhibition raises S-warfarin exposure"],
+        "pharmacodynamic": ["Additive antiplatelet effect"],
+    },
+    "phytochemicals_involved": ["Curcumin", "Demethoxycurcumin"],
+    "clinical_effects": ["Elevated INR", "Bleeding risk"],
+    "recommendations": ["Monitor INR closely when starting or stopping turmeric supplements."],
+    "sources": [{"url": f"https://pubmed.ncbi.nlm.nih.gov/{30000000 + i}/", "title": f"Study {i}"}
+                for i in range(12)],
+    "reasoning_chain": [{"step": i, "reasoning": "…", "evidence": "…"} for i in range(1, 5)],
+}
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[idx]
+
+
+def _summary(label: str, samples: list) -> None:
+    print(f"  {label:<34} p50 {_percentile(samples, 50):>9.2f} ms   "
+          f"p95 {_percentile(samples, 95):>9.2f} ms   n={len(samples)}")
+
+
+def _local_iteration() -> float:
+    start = time.perf_counter()
+    severity = reasoning_tools.calculate_severity(SEVERITY_INPUT, "warfarin")
+    graph = reasoning_tools.build_knowledge_graph("Curcuma longa", "warfarin", GRAPH_INPUT)
+    result = reasoning_tools.compile_and_validate_output(
+        "Curcuma longa", "warfarin", severity, graph["graph"], ANALYSIS_DATA,
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    assert result and result.get("success"), result
+    return elapsed
+
+
+def _remote_payloads() -> list:
+    severity = reasoning_tools.calculate_severity(SEVERITY_INPUT, "warfarin")
+    graph = reasoning_tools.build_knowledge_graph("Curcuma longa", "warfarin", GRAPH_INPUT)
+    return [
+        {"function": "calculate_severity", "actionGroup": "reasoning_tools", "parameters": [
+            {"name": "interactions_data", "value": json.dumps(SEVERITY_INPUT)},
+            {"name": "allopathy_name", "value": "warfarin"},
+        ]},
+        {"function": "compile_and_validate_output", "actionGroup": "reasoning_tools", "parameters": [
+            {"name": "ayush_name", "value": "Curcuma longa"},
+            {"name": "allopathy_name", "value": "warfarin"},
+            {"name": "severity_result_str", "value": json.dumps(severity)},
+            {"name": "knowledge_graph_str", "value": json.dumps(graph["graph"])},
+            {"name": "analysis_data_str", "value": json.dumps(ANALYSIS_DATA)},
+        ]},
+    ]
+
+
+def _invoke(client, payload: dict) -> tuple:
+    """Returns (client-observed ms, init duration ms or None)."""
+    start = time.perf_counter()
+    resp = client.invoke(
+        FunctionName=LAMBDA_NAME,
+        InvocationType="RequestResponse",
+        LogType="Tail",
+        Payload=json.dumps(payload).encode(),
+    )
+    outer = json.loads(resp["Payload"].read().decode("utf-8"))
+    json.loads(outer["response"]["functionResponse"]["responseBody"]["TEXT"]["body"])
+    elapsed = (time.perf_counter() - start) * 1000
+    log_tail = base64.b64decode(resp.get("LogResult", "")).decode("utf-8", "replace")
+    m = re.search(r"Init Duration: ([\d.]+) ms", log_tail)
+    return elapsed, float(m.group(1)) if m else None
+
+
+def _force_cold_start(client) -> None:
+    """Touch the function environment so the next invoke lands on a fresh container."""
+    cfg = client.get_function_configuration(FunctionName=LAMBDA_NAME)
+    env = cfg.get("Environment", {}).get("Variables", {})
+    env["BENCH_COLD_START_NONCE"] = str(time.time())
+    client.update_function_configuration(FunctionName=LAMBDA_NAME, Environment={"Variables": env})
+    client.get_waiter("function_updated_v2").wait(FunctionName=LAMBDA_NAME)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="reasoning_tools local vs Lambda latency")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--remote", action="store_true", help="also invoke the deployed Lambda")
+    parser.add_argument("--cold", type=int, default=0,
+                        help="force N cold starts (updates the Lambda env; requires --remote)")
+    args = parser.parse_args()
+
+    if reasoning_tools.get_core() is None:
+        sys.exit("reasoning_core.py not found")
+
+    _local_iteration()  # first call loads reference JSON
+    local = [_local_iteration() for _ in range(args.runs)]
+    print("In-process (severity + graph + compile per iteration):")
+    _summary("local iteration", local)
+
+    if not args.remote:
+        print("\nRun with --remote to compare against the deployed Lambda.")
+        return
+
+    import boto3
+    client = boto3.client("lambda", region_name=os.environ.get("AWS_REGION", "us-east-1"))
+    payloads = _remote_payloads()
+
+    warm, cold, init_durations = [], [], []
+    for i in range(args.cold):
+        _force_cold_start(client)
+        total, init = 0.0, None
+        for payload in payloads:
+            elapsed, payload_init = _invoke(client, payload)
+            total += elapsed
+            init = init or payload_init
+        cold.append(total)
+        if init:
+            init_durations.append(init)
+        print(f"  cold run {i + 1}: {total:.0f} ms (init {init or 0:.0f} ms)")
+
+    for _ in range(args.runs):
+        total = 0.0
+        for payload in payloads:
+            elapsed, payload_init = _invoke(client, payload)
+            total += elapsed
+            if payload_init:
+                init_durations.append(payload_init)
+        warm.append(total)
+
+    print("\nLambda (severity + compile invokes per iteration):")
+    _summary("remote iteration, warm", warm)
+    if cold:
+        _summary("remote iteration, cold", cold)
+    if init_durations:
+        print(f"  cold starts observed: {len(init_durations)}, "
+              f"mean Init Duration {statistics.mean(init_durations):.0f} ms")
+
+    local_p50 = _percentile(local, 50)
+    print("\nSaved per iteration:")
+    print(f"  warm: {_percentile(warm, 50) - local_p50:.0f} ms (p50)")
+    if cold:
+        print(f"  cold: {_percentile(cold, 50) - local_p50:.0f} ms (p50)")
+
+
+if __name__ == "__main__":
+    main()
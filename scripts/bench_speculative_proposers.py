@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-result with and without speculative proposers
+(SPECULATIVE_PROPOSERS): iteration-1 AYUSH / Allopathy / Research started
+alongside the Planner instead of after it.
+
+Agents are served by the replay client (app/agent_replay.py) from synthetic
+streams with realistic per-agent latency (Planner ~4s, proposers 10-15s,
+Reasoning ~25s at --speed 1). Two plans are replayed:
+  all            the Planner runs every proposer (speculation fully used)
+  skip-research  the Planner skips Research (speculative Research cancelled)
+
+Reported per mode, mean over --runs:
+  first_result  run start -> first proposer result event
+  proposers     run start -> proposer phase joined (last proposer result)
+  done          run start -> final result
+
+Usage:
+  python scripts/bench_speculative_proposers.py
+  python scripts/bench_speculative_proposers.py --speed 1 --runs 1
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAIR = ("Curcuma longa", "warfarin")
+PROPOSERS = ("ayush", "allopathy", "research")
+
+# Real-time seconds to final chunk, trace events before it
+AGENT_PROFILES = {
+    "planner": (4.0, 3),
+    "ayush": (12.0, 6),
+    "allopathy": (10.0, 6),
+    "research": (15.0, 8),
+    "reasoning": (25.0, 8),
+}
+
+RESPONSES = {
+    "ayush": ("Curcuma longa contains Curcumin and Demethoxycurcumin as key bioactive compounds. "
+              "Curcumin inhibits CYP2C9 and CYP3A4 in human liver microsomes. "
+              "https://cb.imsc.res.in/imppat/phytochemical/Curcuma%20longa"),
+    "allopathy": ("Warfarin is a narrow therapeutic index drug. S-warfarin is metabolized by CYP2C9. "
+                  "See https://go.drugbank.com/drugs/DB00682"),
+    "research": ("Case reports describe elevated INR and bleeding with turmeric and warfarin. "
+                 "Curcumin has additive antiplatelet activity. "
+                 "https://pubmed.ncbi.nlm.nih.gov/22531131/ https://pubmed.ncbi.nlm.nih.gov/30000001/"),
+    "reasoning": json.dumps({
+        "interaction_exists": True,
+        "interaction_summary": "Curcumin may potentiate warfarin through CYP2C9 inhibition and "
+                               "additive antiplatelet activity, raising bleeding risk.",
+        "mechanisms": {
+            "pharmacokinetic": ["CYP2C9 inhibition raises S-warfarin exposure"],
+            "pharmacodynamic": ["Additive antiplatelet effect"],
+        },
+        "phytochemicals_involved": ["Curcumin", "Demethoxycurcumin"],
+        "cyp_enzymes": [{"name": "CYP2C9", "effect": "inhibitor"}, {"name": "CYP3A4", "effect": "inhibitor"}],
+        "clinical_effects": ["Elevated INR", "Bleeding risk"],
+        "recommendations": ["Monitor INR when starting or stopping turmeric supplements."],
+        "sources": [{"url": "https://pubmed.ncbi.nlm.nih.gov/22531131/", "title": "Turmeric and warfarin"},
+                    {"url": "https://pubmed.ncbi.nlm.nih.gov/30000001/", "title": "Curcumin antiplatelet"}],
+        "reasoning_chain": [{"step": i, "reasoning": "evidence review", "evidence": "proposer output"}
+                            for i in range(1, 4)],
+    }),
+}
+
+PLANS = {
+    "all": {k: {"run": True} for k in PROPOSERS},
+    "skip-research": {"ayush": {"run": True}, "allopathy": {"run": True}, "research": {"run": False}},
+}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Speculative proposer benchmark (replayed agents)")
+    parser.add_argument("--runs", type=int, default=3, help="runs per mode and plan")
+    parser.add_argument("--speed", type=float, default=10.0,
+                        help="agent latency divisor (1 = real Bedrock timing)")
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+
+# app.config reads these at import time
+os.environ["AGENT_CLIENT_MODE"] = "replay"
+os.environ["AGENT_FIXTURE_DIR"] = tempfile.mkdtemp(prefix="speculative_fixtures_")
+os.environ["PROPOSER_CACHE_ENABLED"] = "false"
+os.environ["PRE_EVAL_ENABLED"] = "false"
+
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+import logging  # noqa: E402
+
+from app import agent_replay, agent_service  # noqa: E402
+
+logging.getLogger().setLevel(logging.WARNING)
+
+
+def _events(agent_key: str, text: str) -> tuple:
+    total, n_traces = AGENT_PROFILES[agent_key]
+    first_byte = min(1.0, total * 0.05)
+    events = []
+    for i in range(n_traces):
+        t = first_byte + (total - first_byte) * (i + 1) / (n_traces + 1)
+        events.append({"t": round(t, 4), "trace": {"trace": {"orchestrationTrace": {
+            "rationale": {"text": f"{agent_key} reviewing evidence, step {i}."}}}}})
+    events.append({"t": total, "trace": {"trace": {"orchestrationTrace": {
+        "observation": {"finalResponse": {"text": text}}}}}})
+    events.append({"t": total, "chunk": text})
+    return first_byte, total, events
+
+
+def _fixture_store(plan: dict) -> agent_replay.FixtureStore:
+    store = agent_replay.FixtureStore(tempfile.mkdtemp(prefix="speculative_fixtures_"))
+    responses = dict(RESPONSES, planner=json.dumps({"agents": plan}))
+    for i, (agent_key, text) in enumerate(responses.items()):
+        first_byte, duration, events = _events(agent_key, text)
+        store.write({"kind": "agent", "target": agent_key, "input_sha": "synthetic",
+                     "input_preview": "synthetic speculative-bench stream", "recorded_at": i,
+                     "first_byte": first_byte, "duration": duration, "events": events})
+    return store
+
+
+def _run_once() -> dict:
+    start = time.perf_counter()
+    proposer_results = []
+    stats = {}
+    for event_type, data in agent_service.run_check(*PAIR):
+        now = time.perf_counter() - start
+        if event_type == "trace" and data.get("agent_key") in PROPOSERS and data.get("type") != "thinking":
+            proposer_results.append(now)
+        elif event_type == "done":
+            stats = data.get("stats", {})
+        elif event_type == "error":
+            sys.exit(f"pipeline error: {data.get('message')}")
+    return {
+        "first_result": proposer_results[0] if proposer_results else 0.0,
+        "proposers": proposer_results[-1] if proposer_results else 0.0,
+        "done": time.perf_counter() - start,
+        "speculation": stats.get("speculative_proposers", []),
+    }
+
+
+def main():
+    print(f"speed {ARGS.speed:g}, {ARGS.runs} run(s) per mode; seconds at replay speed\n")
+    print(f"{'plan':<14} {'mode':<12} {'first_result':>12} {'proposers':>10} {'done':>8}  speculation")
+    for plan_name, plan in PLANS.items():
+        agent_service._bedrock_runtime = agent_replay.ReplayBedrockClient(_fixture_store(plan), ARGS.speed)
+        means = {}
+        for mode, keys in (("sequential", ()), ("speculative", PROPOSERS)):
+            agent_service.SPECULATIVE_PROPOSERS = keys
+            runs = [_run_once() for _ in range(ARGS.runs)]
+            means[mode] = {k: statistics.mean(r[k] for r in runs) for k in ("first_result", "proposers", "done")}
+            outcomes = ", ".join(f"{s['agent']}={s['outcome']}" for s in runs[-1]["speculation"]) or "-"
+            m = means[mode]
+            print(f"{plan_name:<14} {mode:<12} {m['first_result']:>12.2f} {m['proposers']:>10.2f} "
+                  f"{m['done']:>8.2f}  {outcomes}")
+        before, after = means["sequential"], means["speculative"]
+        print(f"{'':<14} {'saved':<12} {before['first_result'] - after['first_result']:>12.2f} "
+              f"{before['proposers'] - after['proposers']:>10.2f} {before['done'] - after['done']:>8.2f}  "
+              f"({100 * (1 - after['first_result'] / before['first_result']):.0f}% faster first result)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Server work and bandwidth per WebSocket verbosity (/ws/{session_id}?verbosity=
+full, status, result_only): one pair is run through start_check -> pipeline
+thread -> event bus -> /ws/{session_id} with a client that reads as fast as
+it can.
+
+Agents are served by the replay client (app/agent_replay.py) with no
+delays, from synthetic streams of --steps orchestration steps per agent
+(rationale, model input with a --prompt-chars prompt, model output, tool
+call, --tool-chars tool result) and a final response.
+
+Reported per verbosity, mean over --runs:
+  cpu_ms     process CPU time for the run (all threads)
+  published  events published to the session's bus (the same at every verbosity)
+  frames     WebSocket frames sent
+  kB         bytes sent to the client
+and the CPU / bytes saved relative to full. Then a full and a status client
+POST the same pair; both must get one session and one Bedrock run.
+
+Usage:
+  python scripts/bench_verbosity.py
+  python scripts/bench_verbosity.py --runs 10 --steps 12
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAIR = ("Curcuma longa", "warfarin")
+
+RESPONSES = {
+    "planner": json.dumps({"agents": {k: {"run": True} for k in ("ayush", "allopathy", "research")}}),
+    "ayush": ("Curcuma longa contains Curcumin and Demethoxycurcumin as key bioactive compounds. "
+              "Curcumin inhibits CYP2C9 and CYP3A4 in human liver microsomes. "
+              "https://cb.imsc.res.in/imppat/phytochemical/Curcuma%20longa"),
+    "allopathy": ("Warfarin is a narrow therapeutic index drug. S-warfarin is metabolized by CYP2C9. "
+                  "See https://go.drugbank.com/drugs/DB00682"),
+    "research": ("Case reports describe elevated INR and bleeding with turmeric and warfarin. "
+                 "https://pubmed.ncbi.nlm.nih.gov/22531131/ https://pubmed.ncbi.nlm.nih.gov/30000001/"),
+    "reasoning": json.dumps({
+        "interaction_exists": True,
+        "interaction_summary": "Curcumin may potentiate warfarin through CYP2C9 inhibition and "
+                               "additive antiplatelet activity, raising bleeding risk.",
+        "mechanisms": {"pharmacokinetic": ["CYP2C9 inhibition raises S-warfarin exposure"],
+                       "pharmacodynamic": ["Additive antiplatelet effect"]},
+        "phytochemicals_involved": ["Curcumin", "Demethoxycurcumin"],
+        "cyp_enzymes": [{"name": "CYP2C9", "effect": "inhibitor"}],
+        "clinical_effects": ["Elevated INR", "Bleeding risk"],
+        "recommendations": ["Monitor INR when starting or stopping turmeric supplements."],
+        "reasoning_chain": [{"step": i, "reasoning": "evidence review", "evidence": "proposer output"}
+                            for i in range(1, 4)],
+    }),
+}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Trace verbosity CPU / bandwidth benchmark (replayed agents)")
+    parser.add_argument("--runs", type=int, default=5, help="runs per verbosity")
+    parser.add_argument("--steps", type=int, default=8, help="orchestration steps per agent call")
+    parser.add_argument("--prompt-chars", type=int, default=6000)
+    parser.add_argument("--tool-chars", type=int, default=4000)
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+
+# app.config reads these at import time
+os.environ["AGENT_CLIENT_MODE"] = "replay"
+os.environ["AGENT_FIXTURE_DIR"] = tempfile.mkdtemp(prefix="verbosity_fixtures_")
+os.environ["PROPOSER_CACHE_ENABLED"] = "false"
+os.environ["PRE_EVAL_ENABLED"] = "false"
+
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+import logging  # noqa: E402
+
+from app import agent_replay, agent_service, event_bus, main as server  # noqa: E402
+from app.models import InteractionRequest  # noqa: E402
+
+logging.getLogger().setLevel(logging.ERROR)
+
+
+def _orchestration(step: dict) -> dict:
+    return {"trace": {"trace": {"orchestrationTrace": step}}}
+
+
+def _fixture_store() -> agent_replay.FixtureStore:
+    store = agent_replay.FixtureStore(os.environ["AGENT_FIXTURE_DIR"])
+    for i, (target, text) in enumerate(RESPONSES.items()):
+        events = []
+        for k in range(ARGS.steps):
+            events += [
+                _orchestration({"rationale": {"text": f"{target} considers step {k}. " * 20}}),
+                _orchestration({"modelInvocationInput": {"text": "p" * ARGS.prompt_chars}}),
+                _orchestration({"modelInvocationOutput": {"metadata": {"usage": {
+                    "inputTokens": ARGS.prompt_chars // 4, "outputTokens": 200}}}}),
+                _orchestration({"invocationInput": {"actionGroupInvocationInput": {
+                    "actionGroupName": f"{target}_tools", "function": f"lookup_{k}",
+                    "parameters": [{"name": "query", "value": "curcumin warfarin"}]}}}),
+                _orchestration({"observation": {"actionGroupInvocationOutput": {
+                    "text": json.dumps({"success": True, "data": "r" * ARGS.tool_chars})}}}),
+            ]
+        events.append(_orchestration({"observation": {"finalResponse": {"text": text}}}))
+        events.append({"chunk": text})
+        store.write({"kind": "agent", "target": target, "input_sha": "synthetic",
+                     "input_preview": "synthetic verbosity-bench stream", "recorded_at": i,
+                     "first_byte": 0.0, "duration": 0.0, "events": events})
+    return store
+
+
+class _CountingClient:
+    """Replay client wrapper counting Planner invocations (one per pipeline run)."""
+
+    def __init__(self, client):
+        self._client = client
+        self.runs = 0
+
+    def invoke_agent(self, **kwargs):
+        if kwargs.get("agentId") == agent_service.AGENTS["planner"]["id"]:
+            self.runs += 1
+        return self._client.invoke_agent(**kwargs)
+
+
+class _Client:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.frames += 1
+        self.bytes += len(text.encode("utf-8"))
+
+    async def close(self):
+        pass
+
+
+async def _run_once(verbosity: str) -> dict:
+    client = _Client()
+    cpu = time.process_time()
+    req = InteractionRequest(ayush_name=PAIR[0], allopathy_name=PAIR[1], verbosity=verbosity)
+    session_id = (await server.start_check(req))["session_id"]
+    await server.ws_stream(client, session_id, verbosity=verbosity)
+    cpu = time.process_time() - cpu
+    published = event_bus.get_bus().depths().get(session_id, 0)
+    event_bus.get_bus().close(session_id)
+    return {"cpu_ms": cpu * 1000, "published": published, "frames": client.frames, "kB": client.bytes / 1024}
+
+
+async def _shared_run() -> tuple:
+    """A full and a status client POST the same pair: (session ids, runs started, frames each)."""
+    clients = {"full": _Client(), "status": _Client()}
+    sessions = {}
+    for verbosity in clients:
+        req = InteractionRequest(ayush_name=PAIR[0], allopathy_name=PAIR[1], verbosity=verbosity)
+        sessions[verbosity] = (await server.start_check(req))["session_id"]
+    await asyncio.gather(*(server.ws_stream(clients[v], sessions[v], verbosity=v) for v in clients))
+    return sessions, {v: c.frames for v, c in clients.items()}
+
+
+def main():
+    counter = _CountingClient(agent_replay.ReplayBedrockClient(_fixture_store(), 0))
+    agent_service._bedrock_runtime = counter
+    server.lookup_curated = lambda *a, **k: None
+    attach_run = server._attach_run
+    server._attach_run = lambda key: None
+    print(f"{ARGS.runs} run(s) per verbosity, {ARGS.steps} steps per agent call, replay speed 0\n")
+    print(f"{'verbosity':<12} {'cpu_ms':>8} {'published':>9} {'frames':>6} {'kB':>8}")
+    means = {}
+    for verbosity in ("full", "status", "result_only"):
+        runs = [asyncio.run(_run_once(verbosity)) for _ in range(ARGS.runs)]
+        means[verbosity] = m = {k: statistics.mean(r[k] for r in runs) for k in runs[0]}
+        print(f"{verbosity:<12} {m['cpu_ms']:>8.1f} {m['published']:>9.0f} {m['frames']:>6.0f} {m['kB']:>8.1f}")
+    full = means["full"]
+    for verbosity in ("status", "result_only"):
+        m = means[verbosity]
+        print(f"{verbosity}: {1 - m['cpu_ms'] / full['cpu_ms']:.0%} less CPU, "
+              f"{1 - m['kB'] / full['kB']:.0%} fewer bytes than full")
+
+    server._attach_run = attach_run
+    runs_before = counter.runs
+    sessions, frames = asyncio.run(_shared_run())
+    shared = len(set(sessions.values())) == 1
+    print(f"\nfull + status clients for one pair: {'one session' if shared else 'two sessions'}, "
+          f"{counter.runs - runs_before} pipeline run(s); frames full {frames['full']}, status {frames['status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Bytes on the wire and serialization time for the WebSocket "complete" event:
+full vs lean payload, starlette send_json (json.dumps) vs payloads.dumps
+(orjson when installed), with and without permessage-deflate.
+
+The pipeline result is compiled in-process by reasoning_core from a realistic
+analysis; the cached result is a curated_interactions row (response_data plus
+the duplicated knowledge_graph column and timestamps) with its
+interaction_sources rows. Deflated sizes use the same raw-deflate settings as
+the websockets permessage-deflate extension uvicorn negotiates.
+
+Usage:
+  python scripts/bench_ws_payload.py
+  python scripts/bench_ws_payload.py --sources 20 --iterations 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+from app import agent_service, payloads, reasoning_tools  # noqa: E402
+
+
+def _analysis(n_sources: int) -> dict:
+    return {
+        "interaction_exists": True,
+        "interaction_summary": "Curcumin may potentiate the anticoagulant effect of warfarin through "
+                               "CYP2C9 inhibition and additive antiplatelet activity.",
+        "mechanisms": {
+            "pharmacokinetic": ["CYP2C9 inhibition raises S-warfarin exposure",
+                                "CYP3A4 inhibition may slow R-warfarin clearance"],
+            "pharmacodynamic": ["Additive antiplatelet effect", "Possible reduced vitamin K recycling"],
+        },
+        "phytochemicals_involved": ["Curcumin", "Demethoxycurcumin", "Bisdemethoxycurcumin", "ar-Turmerone"],
+        "cyp_enzymes": [{"name": "CYP2C9", "effect": "inhibitor"}, {"name": "CYP3A4", "effect": "inhibitor"}],
+        "clinical_effects": ["Elevated INR", "Bleeding risk", "Bruising"],
+        "recommendations": ["Monitor INR closely when starting or stopping turmeric supplements.",
+                            "Avoid high-dose curcumin extracts in patients on warfarin."],
+        "sources": [{"url": f"https://pubmed.ncbi.nlm.nih.gov/{30000000 + i}/",
+                     "title": f"Pharmacokinetic interaction study {i} of curcumin and warfarin",
+                     "snippet": "Co-administration increased the AUC of S-warfarin and prolonged "
+                                "prothrombin time in healthy volunteers. " * 2}
+                    for i in range(n_sources)],
+        "reasoning_chain": [{"step": i, "reasoning": "Curcumin is a CYP2C9 inhibitor in vitro; S-warfarin "
+                             "is the more potent enantiomer and is cleared by CYP2C9.",
+                             "evidence": "IMPPAT, DrugBank, PubMed case reports"} for i in range(1, 7)],
+    }
+
+
+def _pipeline_result(n_sources: int) -> dict:
+    analysis = _analysis(n_sources)
+    severity = reasoning_tools.calculate_severity({"cyp_enzymes": analysis["cyp_enzymes"]}, "warfarin")
+    graph = reasoning_tools.build_knowledge_graph("Curcuma longa", "warfarin", {
+        "ayush_admet": {"absorption": "Poor oral bioavailability", "metabolism": "Hepatic glucuronidation"},
+        "allopathy_admet": {"absorption": "Rapid, complete", "metabolism": "CYP2C9 (S-warfarin)"},
+        "cyp_enzymes": analysis["cyp_enzymes"],
+    })
+    compiled = reasoning_tools.compile_and_validate_output(
+        "Curcuma longa", "warfarin", severity, graph["graph"], analysis,
+    )
+    result = agent_service._parse_reasoning_output(json.dumps(analysis), compiled)
+    return agent_service._format_final_json(
+        result, ayush_traces=[], allopathy_traces=[],
+        imppat_url="https://cb.imsc.res.in/imppat/phytochemical/Curcuma%20longa",
+        scientific_name="Curcuma longa",
+    )
+
+
+def _cached_row(interaction_data: dict) -> tuple:
+    now = datetime.now(timezone.utc)
+    row = {
+        "interaction_key": interaction_data.get("interaction_key", "curcuma longa#warfarin"),
+        "ayush_name": interaction_data.get("ayush_name", "Curcuma longa"),
+        "allopathy_name": interaction_data.get("allopathy_name", "warfarin"),
+        "severity": interaction_data.get("severity"),
+        "severity_score": interaction_data.get("severity_score"),
+        "response_data": interaction_data,
+        "knowledge_graph": interaction_data.get("knowledge_graph", {}),
+        "created_at": now,
+        "updated_at": now,
+    }
+    sources = [{"source_id": i, "interaction_key": row["interaction_key"], "url": s.get("url"),
+                "title": s.get("title"), "snippet": s.get("snippet", ""), "category": "pubmed",
+                "relevance_score": 0.9} for i, s in enumerate(interaction_data.get("sources", []))]
+    return row, sources
+
+
+def _starlette_dumps(payload) -> str:
+    """What websocket.send_json does (no default= hook)."""
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def _deflated_size(text: str) -> int:
+    """permessage-deflate payload size (websockets defaults: raw deflate, memLevel 5, sync flush)."""
+    comp = zlib.compressobj(wbits=-15, memLevel=5)
+    data = comp.compress(text.encode("utf-8")) + comp.flush(zlib.Z_SYNC_FLUSH)
+    return len(data) - 4 if data.endswith(b"\x00\x00\xff\xff") else len(data)
+
+
+def _time_us(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket complete-event payload benchmark")
+    parser.add_argument("--sources", type=int, default=12)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    result = _pipeline_result(args.sources)
+    timings = {"total_ms": 48210.4, "phases": [{"phase": p, "iteration": 1, "ms": 1000.0}
+                                               for p in ("planner", "ayush", "allopathy", "research",
+                                                         "reasoning", "severity", "compile", "scorer")]}
+    row, source_rows = _cached_row(result["interaction_data"])
+    session_id = "550e8400-e29b-41d4-a716-446655440000"
+
+    def pipeline_full():
+        return {"type": "complete", "result": result, "cached": False,
+                "session_id": session_id, "timings": timings}
+
+    def pipeline_lean():
+        return {"type": "complete", "result": payloads.lean_result(result), "cached": False,
+                "session_id": session_id}
+
+    def cached_before():
+        # Old path: sources round-tripped through json; the row went to send_json as-is
+        # (its datetime columns need a default= hook, which send_json does not pass)
+        srcs = json.loads(json.dumps(source_rows, default=str))
+        return _starlette_dumps(json.loads(json.dumps(
+            {"type": "complete", "result": row, "cached": True, "sources": srcs, "session_id": session_id},
+            default=str)))
+
+    def cached_full():
+        return {"type": "complete", "result": row, "cached": True, "sources": source_rows,
+                "session_id": session_id}
+
+    def cached_lean():
+        return {"type": "complete", "result": payloads.lean_cached_result(row, source_rows),
+                "cached": True, "session_id": session_id}
+
+    cases = [
+        ("pipeline full, send_json", lambda: _starlette_dumps(pipeline_full())),
+        ("pipeline full, dumps", lambda: payloads.dumps(pipeline_full())),
+        ("pipeline lean, dumps", lambda: payloads.dumps(pipeline_lean())),
+        ("cached full, old round trip", cached_before),
+        ("cached full, dumps", lambda: payloads.dumps(cached_full())),
+        ("cached lean, dumps", lambda: payloads.dumps(cached_lean())),
+    ]
+
+    print(f"serializer: {'orjson' if payloads.orjson else 'json (orjson not installed)'}, "
+          f"{args.sources} sources, {args.iterations} iterations\n")
+    print(f"{'payload':<30} {'bytes':>8} {'deflated':>9} {'serialize µs':>13}")
+    rows = {}
+    for name, fn in cases:
+        text = fn()
+        rows[name] = (len(text.encode("utf-8")), _deflated_size(text), _time_us(fn, args.iterations))
+        raw, deflated, us = rows[name]
+        print(f"{name:<30} {raw:>8} {deflated:>9} {us:>13.1f}")
+
+    def saving(before, after):
+        b, a = rows[before], rows[after]
+        return (f"{b[0]} -> {a[1]} bytes on the wire ({100 * (1 - a[1] / b[0]):.0f}% smaller), "
+                f"{b[2]:.0f} -> {a[2]:.0f} µs")
+
+    print("\nBefore (send_json, no deflate) -> after (lean + dumps + permessage-deflate):")
+    print(f"  pipeline: {saving('pipeline full, send_json', 'pipeline lean, dumps')}")
+    print(f"  cached:   {saving('cached full, old round trip', 'cached lean, dumps')}")
+
+
+if __name__ == "__main__":
+    main()
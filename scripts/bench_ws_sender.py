@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+WebSocket sender benchmark (app/ws_sender.py): one session streamed through
+ws_stream to a slow client, with an unbounded outbound buffer (one frame per
+event, the previous behaviour), the bounded buffer, and the bounded buffer
+with ?batch=1.
+
+The pipeline is simulated: over --duration seconds it publishes --traces
+trace events (agent_thinking / llm_call / llm_response / tool_call /
+tool_result for three proposers), a pipeline_status every 20 events, --deltas
+llm_delta chunks and a ~60 kB complete event. The fake client takes
+--client-ms per frame plus --client-us-per-kb per kB.
+
+Reported per mode:
+  frames / fps   frames sent and frames per second
+  events         UI events delivered (batched events counted individually)
+  dropped        trace events the sender dropped
+  coalesced      trace events superseded by a newer one, plus llm_deltas
+                 merged into the previous chunk (lossless)
+  complete_s     pipeline done -> complete event received by the client
+  status_lag_ms  worst delay of a pipeline_status event
+
+Usage:
+  python scripts/bench_ws_sender.py
+  python scripts/bench_ws_sender.py --client-ms 20 --traces 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Backpressure-aware WebSocket sender benchmark")
+    parser.add_argument("--traces", type=int, default=1200, help="trace events per run")
+    parser.add_argument("--deltas", type=int, default=120, help="llm_delta events per run")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds the simulated pipeline runs")
+    parser.add_argument("--client-ms", type=float, default=8.0, help="client cost per frame")
+    parser.add_argument("--client-us-per-kb", type=float, default=200.0, help="client cost per kB")
+    parser.add_argument("--buffer", type=int, default=128, help="WS_SEND_BUFFER for the bounded modes")
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+
+os.environ["WS_SEND_BUFFER"] = str(ARGS.buffer)
+os.environ["REASONING_STREAM_DELTAS"] = "true"
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+import logging  # noqa: E402
+
+from app import main as server, ws_sender  # noqa: E402
+from app.models import InteractionRequest  # noqa: E402
+
+logging.getLogger().setLevel(logging.WARNING)
+
+TRACE_TYPES = ("thinking", "model_input", "model_output", "tool_call", "tool_result")
+AGENTS = ("ayush", "allopathy", "research")
+
+
+def _events():
+    """The simulated pipeline's events with their offsets in seconds."""
+    out = []
+    for i in range(ARGS.traces):
+        t = ARGS.duration * 0.8 * i / ARGS.traces
+        if i % 20 == 0:
+            out.append((t, "pipeline_status", {"status": "phase_proposer", "iteration": 1,
+                                               "message": f"status {i}"}))
+        agent = AGENTS[i % len(AGENTS)]
+        out.append((t, "trace", {"type": TRACE_TYPES[i % len(TRACE_TYPES)], "agent": agent.title(),
+                                 "agent_key": agent, "iteration": 1, "message": "m" * 300,
+                                 "prompt_preview": "p" * 500}))
+    for k in range(ARGS.deltas):
+        t = ARGS.duration * (0.8 + 0.2 * k / ARGS.deltas)
+        out.append((t, "llm_delta", {"agent": "Reasoning", "agent_key": "reasoning", "iteration": 1,
+                                     "delta": "d" * 40, "fields": {}}))
+    result = {"status": "Success", "interaction_data": {"severity": "MAJOR", "sources": ["s" * 200] * 300}}
+    out.append((ARGS.duration, "done", {"result": result, "timings": {}}))
+    return out
+
+
+class _SlowClient:
+    def __init__(self):
+        self.frames = 0
+        self.events = 0
+        self.complete_at = None
+        self.status_lags = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        await asyncio.sleep(ARGS.client_ms / 1000 + ARGS.client_us_per_kb * len(text) / 1024 / 1e6)
+        self.frames += 1
+        now = time.perf_counter()
+        frame = json.loads(text)
+        for e in frame["events"] if frame.get("type") == "batch" else [frame]:
+            self.events += 1
+            if e.get("type") == "complete":
+                self.complete_at = now
+            elif e.get("type") == "pipeline_status" and e.get("iteration") == 1:
+                self.status_lags.append(now - _SENT[e["seq"]])
+
+    async def close(self):
+        pass
+
+
+_SENT = {}
+_DONE_AT = [0.0]
+
+
+def _fake_run_check(ayush_name, allopathy_name, session_id=None, verbosity="full"):
+    start = time.perf_counter()
+    seq = 0
+    for offset, event_type, data in _events():
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        seq += 1
+        _SENT[seq] = time.perf_counter()
+        if event_type == "done":
+            _DONE_AT[0] = time.perf_counter()
+        yield event_type, data
+
+
+class _UnboundedSender(ws_sender.SessionSender):
+    """Every event sent in its own frame, however far behind: the previous behaviour."""
+
+    def __init__(self, send, batch=False):
+        super().__init__(send, batch=batch, limit=10 ** 9)
+
+    async def close(self, timeout: float = 3600.0) -> None:
+        await super().close(timeout)
+
+
+async def _run(mode: str) -> dict:
+    _SENT.clear()
+    if mode == "unbounded":
+        server.SessionSender = _UnboundedSender
+    else:
+        server.SessionSender = lambda send, batch=False: ws_sender.SessionSender(send, batch=batch,
+                                                                                 limit=ARGS.buffer)
+    server.run_check = _fake_run_check
+    server.lookup_curated = lambda *a, **k: None
+    server._attach_run = lambda key: None
+    req = InteractionRequest(ayush_name="Curcuma longa", allopathy_name="warfarin")
+    session_id = (await server.start_check(req))["session_id"]
+    client = _SlowClient()
+    shed_before = {r: server.instrumentation.counter_value("ausadhi_ws_events_shed_total", reason=r)
+                   for r in ("dropped", "coalesced")}
+    start = time.perf_counter()
+    await server.ws_stream(client, session_id, deltas=True, batch=(mode == "batch"))
+    wall = time.perf_counter() - start
+    shed = {r: server.instrumentation.counter_value("ausadhi_ws_events_shed_total", reason=r) - n
+            for r, n in shed_before.items()}
+    return {
+        "frames": client.frames,
+        "fps": client.frames / wall,
+        "events": client.events,
+        "dropped": shed["dropped"],
+        "coalesced": shed["coalesced"],
+        "complete_s": (client.complete_at or time.perf_counter()) - _DONE_AT[0],
+        "status_lag_ms": max(client.status_lags or [0.0]) * 1000,
+    }
+
+
+def main():
+    print(f"{ARGS.traces} traces + {ARGS.deltas} deltas over {ARGS.duration:g}s; client {ARGS.client_ms:g} ms/frame "
+          f"+ {ARGS.client_us_per_kb:g} us/kB; bounded buffer {ARGS.buffer}\n")
+    print(f"{'mode':<10} {'frames':>6} {'fps':>6} {'events':>6} {'dropped':>7} {'coalesced':>9} "
+          f"{'complete_s':>10} {'status_lag_ms':>13}")
+    for mode in ("unbounded", "bounded", "batch"):
+        r = asyncio.run(_run(mode))
+        print(f"{mode:<10} {r['frames']:>6} {r['fps']:>6.0f} {r['events']:>6} {r['dropped']:>7.0f} "
+              f"{r['coalesced']:>9.0f} {r['complete_s']:>10.2f} {r['status_lag_ms']:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+A/B the Reasoning prompt: packed evidence vs the old fixed 2000-char truncation.
+
+Runs the e2e scenarios (scripts/test_e2e.py) through the pipeline in-process,
+once per mode.
+
+Live (host AWS credentials): prints per-run Reasoning prompt tokens,
+Reasoning seconds, iterations and final scorer score. The proposer cache is
+left on, so iteration-1 proposer output is shared between the two modes and
+the comparison isolates the prompt.
+
+--replay scores recorded agent streams (scripts/bench_pipeline_replay.py
+--record) with no AWS calls. The Reasoning answers are recordings, so instead
+of the scorer it reports how much of the proposers' evidence reaches the
+Reasoning prompt: the share of the CYP enzymes, phytochemicals, PubMed IDs
+and NTI status named in the full AYUSH / Allopathy / Research responses that
+appear in the last full Reasoning prompt of the run, and that prompt's size.
+
+Usage:
+  python scripts/eval_evidence_packing.py
+  python scripts/eval_evidence_packing.py --budget 800 --pairs "Curcuma longa:warfarin"
+  python scripts/eval_evidence_packing.py --replay
+  python scripts/eval_evidence_packing.py --replay --fixtures /path/to/agent_streams --budget 800
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FIXTURES = os.path.join(REPO, "fixtures", "agent_streams")
+
+E2E_PAIRS = [
+    ("Curcuma longa", "warfarin"),
+    ("Withania somnifera", "atorvastatin"),
+]
+
+_PROPOSERS = ("ayush", "allopathy", "research")
+_CYP_RE = re.compile(r'\bCYP\s?\d{1,2}[A-Z]\d{0,2}\b', re.I)
+_NTI_RE = re.compile(r'narrow[\s-]+therapeutic[\s-]+(?:index|window|range)|\bNTI\b', re.I)
+_PMID_RE = re.compile(r'(?:pubmed\.ncbi\.nlm\.nih\.gov/|PMID:?\s*)(\d{6,9})', re.I)
+_RECALL_KINDS = ("cyp", "phytochemical", "pmid", "nti")
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Evidence packing A/B on the e2e scenarios")
+    parser.add_argument("--budget", type=int, help="REASONING_EVIDENCE_TOKEN_BUDGET (default: config)")
+    parser.add_argument("--pairs", nargs="*", help='"ayush:allopathy" pairs (default: e2e scenarios)')
+    parser.add_argument("--replay", action="store_true", help="score recorded agent streams instead of live agents")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="fixture directory for --replay")
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+
+if ARGS.replay:
+    # app.config reads these at import time
+    os.environ["AGENT_CLIENT_MODE"] = "replay"
+    os.environ["AGENT_FIXTURE_DIR"] = os.path.abspath(ARGS.fixtures)
+    os.environ["AGENT_REPLAY_SPEED"] = "0"
+    os.environ.setdefault("PROPOSER_CACHE_ENABLED", "false")
+
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+from app import agent_service, evidence  # noqa: E402
+
+
+class _PromptCapture:
+    """Bedrock client wrapper that keeps every Reasoning agent inputText."""
+
+    def __init__(self, client):
+        self._client = client
+        self.prompts = []
+
+    def invoke_agent(self, **kwargs):
+        if kwargs.get("agentId") == agent_service.AGENTS["reasoning"]["id"]:
+            self.prompts.append(kwargs.get("inputText", ""))
+        return self._client.invoke_agent(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def _reference_items(responses: dict, ayush_traces: list) -> dict:
+    """Evidence items named in the full proposer responses, by kind."""
+    text = "\n".join(responses.values())
+    ayush_facts = evidence.extract_facts(
+        "ayush", responses.get("ayush", ""), evidence.phytochemical_names(ayush_traces))
+    return {
+        "cyp": {m.upper().replace(" ", "") for m in _CYP_RE.findall(text)},
+        "phytochemical": {f["text"].lower() for f in ayush_facts if f["type"] == "phytochemical"},
+        "pmid": set(_PMID_RE.findall(text)),
+        "nti": {"nti"} if _NTI_RE.search(responses.get("allopathy", "")) else set(),
+    }
+
+
+def _recall(items: dict, prompt: str) -> dict:
+    flat = prompt.upper().replace(" ", "")
+    lower = prompt.lower()
+    found = {
+        "cyp": {e for e in items["cyp"] if e in flat},
+        "phytochemical": {p for p in items["phytochemical"] if p in lower},
+        "pmid": {p for p in items["pmid"] if p in prompt},
+        "nti": items["nti"] if _NTI_RE.search(prompt) else set(),
+    }
+    return {kind: (len(found[kind]), len(items[kind])) for kind in _RECALL_KINDS}
+
+
+def _run(ayush: str, allopathy: str, capture: _PromptCapture = None) -> dict:
+    start = time.time()
+    done = {}
+    responses, ayush_traces = {}, []
+    if capture:
+        capture.prompts.clear()
+    for event_type, data in agent_service.run_check(ayush, allopathy):
+        if event_type == "done":
+            done = data
+        elif event_type == "error":
+            return {"error": data.get("message", "error")}
+        elif event_type == "trace" and data.get("agent_key") in _PROPOSERS:
+            if data.get("type") == "agent_complete":
+                responses[data["agent_key"]] = data.get("response", "")
+            elif data.get("type") == "tool_result" and data["agent_key"] == "ayush":
+                ayush_traces.append(data)
+    calls = done.get("stats", {}).get("reasoning_calls", [])
+    result = {
+        "iterations": done.get("iterations", 0),
+        "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+        "reasoning_seconds": sum(c["seconds"] for c in calls),
+        "final_score": calls[-1].get("score", 0) if calls else 0,
+        "total_seconds": time.time() - start,
+    }
+    if capture:
+        full = [p for p in capture.prompts if not p.startswith("UPDATE")]
+        prompt = full[-1] if full else ""
+        result["last_prompt_tokens"] = evidence.estimate_tokens(prompt)
+        result["recall"] = _recall(_reference_items(responses, ayush_traces), prompt)
+    return result
+
+
+def _recall_text(recall: dict) -> str:
+    return " ".join(f"{kind}={found}/{total}" for kind, (found, total) in recall.items())
+
+
+def _pooled_recall(results: list) -> str:
+    parts = []
+    for kind in _RECALL_KINDS:
+        found = sum(r["recall"][kind][0] for r in results)
+        total = sum(r["recall"][kind][1] for r in results)
+        parts.append(f"{kind} {found / total:.0%}" if total else f"{kind} n/a")
+    return ", ".join(parts)
+
+
+def main():
+    pairs = [tuple(p.split(":", 1)) for p in ARGS.pairs] if ARGS.pairs else E2E_PAIRS
+    if ARGS.budget:
+        agent_service.REASONING_EVIDENCE_TOKEN_BUDGET = ARGS.budget
+    budget = agent_service.REASONING_EVIDENCE_TOKEN_BUDGET
+
+    capture = None
+    if ARGS.replay:
+        if not os.path.isdir(ARGS.fixtures) or not os.listdir(ARGS.fixtures):
+            sys.exit(f"No fixtures in {ARGS.fixtures} — record with scripts/bench_pipeline_replay.py --record")
+        capture = _PromptCapture(agent_service._get_bedrock())
+        agent_service._bedrock_runtime = capture
+
+    rows = {"truncated": [], "packed": []}
+    for ayush, allopathy in pairs:
+        for mode in ("truncated", "packed"):
+            agent_service.REASONING_EVIDENCE_PACKING = mode == "packed"
+            result = _run(ayush, allopathy, capture)
+            rows[mode].append(result)
+            if "error" in result:
+                print(f"{ayush} + {allopathy}: ERROR {result['error']}")
+                continue
+            if capture:
+                print(f"{ayush} + {allopathy} [{mode:>9}]: last prompt ~{result['last_prompt_tokens']} tokens, "
+                      f"evidence reaching it {_recall_text(result['recall'])}")
+            else:
+                print(f"{ayush} + {allopathy} [{mode:>9}]: iterations={result['iterations']} "
+                      f"prompt_tokens={result['prompt_tokens']} reasoning_s={result['reasoning_seconds']:.1f} "
+                      f"score={result['final_score']:.0f} total_s={result['total_seconds']:.1f}")
+
+    print(f"\nSummary (budget {budget} tokens):")
+    for mode, results in rows.items():
+        ok = [r for r in results if "error" not in r]
+        if not ok:
+            continue
+        if capture:
+            print(f"  {mode:>9}: mean last prompt tokens {statistics.mean(r['last_prompt_tokens'] for r in ok):.0f}, "
+                  f"evidence reaching the prompt: {_pooled_recall(ok)}")
+        else:
+            print(f"  {mode:>9}: mean prompt tokens {statistics.mean(r['prompt_tokens'] for r in ok):.0f}, "
+                  f"mean reasoning s {statistics.mean(r['reasoning_seconds'] for r in ok):.1f}, "
+                  f"mean score {statistics.mean(r['final_score'] for r in ok):.1f}, "
+                  f"mean iterations {statistics.mean(r['iterations'] for r in ok):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Load test for POST /api/check + /ws/{session_id} on one in-process uvicorn
+worker, with no AWS or database.
+
+Bedrock and Lambda are served by the replay clients (app/agent_replay.py):
+either fixtures recorded with scripts/bench_pipeline_replay.py --record, or
+synthetic streams written here with realistic per-agent latency, trace
+cadence and token usage. A --cached-ratio share of sessions hits a stubbed
+curated-interaction lookup instead of running the pipeline.
+
+Reported (and written as JSON for diffing between releases):
+  start_latency_ms   POST /api/check round trip
+  first_event_ms     POST start -> first WebSocket message
+  final_result_ms    POST start -> "complete" message
+  event_lag_ms       pipeline queue put -> ws_stream dequeue
+  loop_block_ms      event-loop stalls (10 ms heartbeat overshoot)
+  threads / rss_mb   process baseline and peak during the run
+
+Usage:
+  python scripts/load_test.py --sessions 100 --concurrency 20
+  python scripts/load_test.py --sessions 200 --concurrency 50 --speed 20 --out load_report.json
+  python scripts/load_test.py --fixtures fixtures/agent_streams --cached-ratio 0
+"""
+import argparse
+import asyncio
+import json
+import os
+import queue
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import types
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PIPELINE_PAIRS = [("Curcuma longa", "warfarin"), ("Withania somnifera", "atorvastatin")]
+CACHED_PAIR = ("Ocimum sanctum", "metformin")
+
+# Real-time agent profiles: (total seconds, trace events, input tokens, output tokens)
+AGENT_PROFILES = {
+    "planner": (4.0, 4, 900, 220),
+    "ayush": (12.0, 10, 2600, 700),
+    "allopathy": (10.0, 8, 2400, 650),
+    "research": (15.0, 12, 3800, 900),
+    "reasoning": (25.0, 14, 5200, 1600),
+}
+
+RESPONSES = {
+    "planner": json.dumps({"agents": {k: {"run": True} for k in ("ayush", "allopathy", "research")}}),
+    "ayush": ("Curcuma longa contains Curcumin and Demethoxycurcumin as key bioactive compounds. "
+              "Curcumin inhibits CYP2C9 and CYP3A4 in human liver microsomes. "
+              "https://cb.imsc.res.in/imppat/phytochemical/Curcuma%20longa"),
+    "allopathy": ("Warfarin is a narrow therapeutic index drug. S-warfarin is metabolized by CYP2C9. "
+                  "See https://go.drugbank.com/drugs/DB00682"),
+    "research": ("Case reports describe elevated INR and bleeding with turmeric and warfarin. "
+                 "Curcumin has additive antiplatelet activity. "
+                 "https://pubmed.ncbi.nlm.nih.gov/22531131/ https://pubmed.ncbi.nlm.nih.gov/30000001/"),
+    "reasoning": json.dumps({
+        "interaction_exists": True,
+        "interaction_summary": "Curcumin may potentiate warfarin through CYP2C9 inhibition and "
+                               "additive antiplatelet activity, raising bleeding risk.",
+        "mechanisms": {
+            "pharmacokinetic": ["CYP2C9 inhibition raises S-warfarin exposure"],
+            "pharmacodynamic": ["Additive antiplatelet effect"],
+        },
+        "phytochemicals_involved": ["Curcumin", "Demethoxycurcumin"],
+        "cyp_enzymes": [{"name": "CYP2C9", "effect": "inhibitor"}, {"name": "CYP3A4", "effect": "inhibitor"}],
+        "clinical_effects": ["Elevated INR", "Bleeding risk"],
+        "recommendations": ["Monitor INR when starting or stopping turmeric supplements."],
+        "sources": [{"url": "https://pubmed.ncbi.nlm.nih.gov/22531131/", "title": "Turmeric and warfarin"},
+                    {"url": "https://pubmed.ncbi.nlm.nih.gov/30000001/", "title": "Curcumin antiplatelet"}],
+        "reasoning_chain": [{"step": i, "reasoning": "evidence review", "evidence": "proposer output"}
+                            for i in range(1, 4)],
+    }),
+}
+
+CURATED = {
+    "interaction_key": f"{CACHED_PAIR[0].lower()}#{CACHED_PAIR[1].lower()}",
+    "ayush_name": CACHED_PAIR[0],
+    "allopathy_name": CACHED_PAIR[1],
+    "severity": "MODERATE",
+    "interaction_data": {"interaction_summary": "Additive hypoglycaemic effect."},
+}
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Concurrent /api/check + /ws load test (stubbed AWS)")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--cached-ratio", type=float, default=0.3,
+                        help="share of sessions served from the curated cache")
+    parser.add_argument("--speed", type=float, default=10.0,
+                        help="agent latency divisor (1 = real Bedrock timing)")
+    parser.add_argument("--fixtures", help="recorded fixture dir (default: synthetic streams)")
+    parser.add_argument("--variants", type=int, default=3, help="synthetic timing variants per agent")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--out", help="write the JSON report here")
+    return parser.parse_args()
+
+
+ARGS = _parse_args()
+
+_FIXTURE_DIR = os.path.abspath(ARGS.fixtures) if ARGS.fixtures else tempfile.mkdtemp(prefix="load_fixtures_")
+
+# app.config reads these at import time
+os.environ["AGENT_CLIENT_MODE"] = "replay"
+os.environ["AGENT_FIXTURE_DIR"] = _FIXTURE_DIR
+os.environ["AGENT_REPLAY_SPEED"] = str(ARGS.speed)
+os.environ["PROPOSER_CACHE_ENABLED"] = "false"
+
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+import logging  # noqa: E402
+
+import uvicorn  # noqa: E402
+from websockets.asyncio.client import connect  # noqa: E402
+
+from app import agent_replay, main as app_main  # noqa: E402
+
+logging.getLogger().setLevel(logging.WARNING)
+
+
+# ──────────────────────────────────────────────────────────────
+# Synthetic agent streams
+# ──────────────────────────────────────────────────────────────
+
+def _trace(payload: dict) -> dict:
+    return {"trace": {"trace": {"orchestrationTrace": payload}}}
+
+
+def _synthetic_events(agent_key: str, rng: random.Random) -> tuple:
+    total, n_traces, in_tokens, out_tokens = AGENT_PROFILES[agent_key]
+    total *= rng.uniform(0.7, 1.3)
+    first_byte = min(1.0, total * 0.05)
+    step = (total - first_byte) / (n_traces + 1)
+    events = []
+    t = first_byte
+    for i in range(n_traces):
+        kind = i % 4
+        if kind == 0:
+            payload = {"modelInvocationInput": {"text": f"{agent_key} step {i}"}}
+        elif kind == 1:
+            payload = {"rationale": {"text": f"{agent_key} reviewing evidence, step {i}."}}
+        elif kind == 2:
+            payload = {"modelInvocationOutput": {"metadata": {"usage": {
+                "inputTokens": in_tokens // max(1, n_traces // 4),
+                "outputTokens": out_tokens // max(1, n_traces // 4)}}}}
+        else:
+            payload = {"invocationInput": {"actionGroupInvocationInput": {
+                "actionGroupName": f"{agent_key}_tools", "function": "search", "parameters": []}}}
+        events.append({"t": round(t, 4), **_trace(payload)})
+        t += step * rng.uniform(0.5, 1.5)
+    text = RESPONSES[agent_key]
+    events.append({"t": round(t, 4), **_trace({"observation": {"finalResponse": {"text": text}}})})
+    for i in range(0, len(text), 400):
+        events.append({"t": round(t + 0.01 * (i // 400 + 1), 4), "chunk": text[i:i + 400]})
+    return first_byte, round(t, 4), events
+
+
+def _write_synthetic_fixtures(directory: str, variants: int, seed: int) -> int:
+    store = agent_replay.FixtureStore(directory)
+    rng = random.Random(seed)
+    count = 0
+    for agent_key in AGENT_PROFILES:
+        for v in range(variants):
+            first_byte, duration, events = _synthetic_events(agent_key, rng)
+            store.write({
+                "kind": "agent",
+                "target": agent_key,
+                "input_sha": f"synthetic{v}",
+                "input_preview": "synthetic load-test stream",
+                "recorded_at": count,
+                "first_byte": round(first_byte, 4),
+                "duration": duration,
+                "events": events,
+            })
+            count += 1
+    return count
+
+
+# ──────────────────────────────────────────────────────────────
+# Server-side probes
+# ──────────────────────────────────────────────────────────────
+
+EVENT_LAG: list = []
+LOOP_STALLS: list = []
+SAMPLES: list = []
+
+
+class _TimedQueue(queue.Queue):
+    """Session queue that records put -> get sojourn for pipeline events."""
+
+    def _put(self, item):
+        super()._put((time.perf_counter(), item))
+
+    def _get(self):
+        put_at, item = super()._get()
+        if not str(item[0]).startswith("__"):
+            EVENT_LAG.append(time.perf_counter() - put_at)
+        return item
+
+
+def _install_stubs() -> None:
+    app_main.queue = types.SimpleNamespace(Queue=_TimedQueue, Empty=queue.Empty)
+    app_main.lookup_curated = lambda ayush, allopathy: (
+        dict(CURATED) if f"{ayush.lower().strip()}#{allopathy.lower().strip()}" == CURATED["interaction_key"]
+        else None
+    )
+    app_main.get_sources = lambda key: [{"url": "https://pubmed.ncbi.nlm.nih.gov/22531131/", "title": "cached"}]
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (IOError, ValueError, OSError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def _sampler(stop: threading.Event) -> None:
+    while not stop.is_set():
+        SAMPLES.append((threading.active_count(), _rss_mb()))
+        stop.wait(0.1)
+
+
+async def _loop_monitor(interval: float = 0.01) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        overshoot = time.perf_counter() - start - interval
+        if overshoot > 0.001:
+            LOOP_STALLS.append(overshoot)
+
+
+def _start_server(port: int) -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    server = uvicorn.Server(uvicorn.Config(app_main.app, host="127.0.0.1", port=port, log_level="warning"))
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.serve())
+
+    threading.Thread(target=run, daemon=True).start()
+    for _ in range(200):
+        if server.started:
+            asyncio.run_coroutine_threadsafe(_loop_monitor(), loop)
+            return loop
+        time.sleep(0.05)
+    sys.exit(f"uvicorn did not start on port {port}")
+
+
+# ──────────────────────────────────────────────────────────────
+# Client sessions
+# ──────────────────────────────────────────────────────────────
+
+def _post_check(port: int, ayush: str, allopathy: str) -> str:
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}/api/check",
+        data=json.dumps({"ayush_name": ayush, "allopathy_name": allopathy}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return json.loads(resp.read())["session_id"]
+
+
+async def _session(pair: tuple, cached: bool, pool: ThreadPoolExecutor) -> dict:
+    loop = asyncio.get_running_loop()
+    result = {"cached": cached, "events": 0}
+    start = time.perf_counter()
+    try:
+        session_id = await loop.run_in_executor(pool, _post_check, ARGS.port, *pair)
+        result["start_latency"] = time.perf_counter() - start
+        async with connect(f"ws://127.0.0.1:{ARGS.port}/ws/{session_id}", max_size=None) as ws:
+            async for message in ws:
+                result["events"] += 1
+                if "first_event" not in result:
+                    result["first_event"] = time.perf_counter() - start
+                event = json.loads(message)
+                if event.get("type") == "error":
+                    result["error"] = event.get("message", "error")
+                    break
+                if event.get("type") == "complete":
+                    result["final_result"] = time.perf_counter() - start
+                    break
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    if "final_result" not in result and "error" not in result:
+        result["error"] = "stream closed without a complete event"
+    return result
+
+
+async def _drive(plan: list) -> tuple:
+    sem = asyncio.Semaphore(ARGS.concurrency)
+    pool = ThreadPoolExecutor(max_workers=ARGS.concurrency)
+
+    async def bounded(pair, cached):
+        async with sem:
+            return await _session(pair, cached, pool)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(bounded(pair, cached) for pair, cached in plan))
+    pool.shutdown(wait=False)
+    return results, time.perf_counter() - start
+
+
+# ──────────────────────────────────────────────────────────────
+# Report
+# ──────────────────────────────────────────────────────────────
+
+def _dist(values: list) -> dict:
+    if not values:
+        return {"n": 0}
+    ordered = sorted(v * 1000 for v in values)
+
+    def pct(p):
+        return round(ordered[min(int(round(p / 100.0 * (len(ordered) - 1))), len(ordered) - 1)], 2)
+
+    return {"n": len(ordered), "p50": pct(50), "p95": pct(95), "p99": pct(99),
+            "max": round(ordered[-1], 2), "mean": round(statistics.mean(ordered), 2)}
+
+
+def _report(results: list, wall: float, baseline: tuple) -> dict:
+    ok = [r for r in results if "error" not in r]
+    pipeline = [r for r in ok if not r["cached"]]
+    cached = [r for r in ok if r["cached"]]
+    errors = [r["error"] for r in results if "error" in r]
+    threads = [s[0] for s in SAMPLES] or [baseline[0]]
+    rss = [s[1] for s in SAMPLES] or [baseline[1]]
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "app_version": app_main.app.version,
+        "config": {
+            "sessions": ARGS.sessions, "concurrency": ARGS.concurrency,
+            "cached_ratio": ARGS.cached_ratio, "speed": ARGS.speed,
+            "fixtures": "recorded" if ARGS.fixtures else f"synthetic x{ARGS.variants}",
+        },
+        "sessions": {"ok": len(ok), "pipeline": len(pipeline), "cached": len(cached),
+                     "errors": len(errors), "error_samples": sorted(set(errors))[:5]},
+        "throughput_sessions_per_s": round(len(ok) / wall, 3) if wall else 0.0,
+        "wall_seconds": round(wall, 2),
+        "start_latency_ms": _dist([r["start_latency"] for r in ok]),
+        "first_event_ms": {"pipeline": _dist([r["first_event"] for r in pipeline]),
+                           "cached": _dist([r["first_event"] for r in cached])},
+        "final_result_ms": {"pipeline": _dist([r["final_result"] for r in pipeline]),
+                            "cached": _dist([r["final_result"] for r in cached])},
+        "events_per_pipeline_session": round(statistics.mean(r["events"] for r in pipeline), 1) if pipeline else 0,
+        "event_lag_ms": _dist(EVENT_LAG),
+        "loop_block_ms": {**_dist(LOOP_STALLS), "total": round(sum(LOOP_STALLS) * 1000, 1)},
+        "threads": {"baseline": baseline[0], "peak": max(threads)},
+        "rss_mb": {"baseline": round(baseline[1], 1), "peak": round(max(rss), 1)},
+    }
+
+
+def _print_summary(report: dict) -> None:
+    s = report["sessions"]
+    print(f"{s['ok']} ok ({s['pipeline']} pipeline, {s['cached']} cached), {s['errors']} errors "
+          f"in {report['wall_seconds']}s — {report['throughput_sessions_per_s']} sessions/s")
+    for err in s["error_samples"]:
+        print(f"  error: {err}")
+
+    def line(label, d):
+        if d.get("n"):
+            print(f"  {label:<28} p50 {d['p50']:>9.1f}  p95 {d['p95']:>9.1f}  max {d['max']:>9.1f} ms")
+
+    line("start latency", report["start_latency_ms"])
+    line("first event (pipeline)", report["first_event_ms"]["pipeline"])
+    line("first event (cached)", report["first_event_ms"]["cached"])
+    line("final result (pipeline)", report["final_result_ms"]["pipeline"])
+    line("final result (cached)", report["final_result_ms"]["cached"])
+    line("event lag (queue -> ws)", report["event_lag_ms"])
+    line("event-loop stalls", report["loop_block_ms"])
+    print(f"  event-loop blocked total      {report['loop_block_ms']['total']} ms")
+    print(f"  threads                       {report['threads']['baseline']} -> {report['threads']['peak']} peak")
+    print(f"  RSS                           {report['rss_mb']['baseline']} -> {report['rss_mb']['peak']} MB peak")
+
+
+def main():
+    if not ARGS.fixtures:
+        n = _write_synthetic_fixtures(_FIXTURE_DIR, ARGS.variants, ARGS.seed)
+        print(f"Wrote {n} synthetic agent streams to {_FIXTURE_DIR}")
+
+    _install_stubs()
+    _start_server(ARGS.port)
+
+    rng = random.Random(ARGS.seed)
+    plan = []
+    for i in range(ARGS.sessions):
+        cached = rng.random() < ARGS.cached_ratio
+        plan.append((CACHED_PAIR if cached else PIPELINE_PAIRS[i % len(PIPELINE_PAIRS)], cached))
+
+    baseline = (threading.active_count(), _rss_mb())
+    stop = threading.Event()
+    threading.Thread(target=_sampler, args=(stop,), daemon=True).start()
+    results, wall = asyncio.run(_drive(plan))
+    stop.set()
+
+    report = _report(results, wall, baseline)
+    _print_summary(report)
+    if ARGS.out:
+        with open(ARGS.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {ARGS.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Migrate curated_interactions to the JSONB layout lookup_curated projects
+from, and measure what cached lookups cost per projection.
+
+Idempotent steps (skip any with --measure-only):
+  1. response_data / knowledge_graph TEXT -> JSONB (only if not JSONB already)
+  2. move the knowledge graph out of response_data into the knowledge_graph
+     column, so it is stored once (lookup_curated "full" merges it back)
+  3. GIN / btree indexes on severity and phytochemicals_involved
+     (CREATE INDEX CONCURRENTLY, no table lock)
+  4. ANALYZE
+
+Measurement: average row bytes (pg_column_size of the projected row) and
+lookup latency for SELECT * versus each db.CURATED_PROJECTIONS entry, plus
+the search_curated filters. Uses the backend's DB_* environment.
+
+Usage:
+  python scripts/migrate_curated_jsonb.py
+  python scripts/migrate_curated_jsonb.py --measure-only --samples 50 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO, "backend"))
+
+from app import db  # noqa: E402
+
+JSONB_COLUMNS = ("response_data", "knowledge_graph")
+
+INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_curated_severity ON curated_interactions(severity)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_curated_response_gin ON curated_interactions "
+    "USING GIN (response_data jsonb_path_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_curated_phytochemicals_gin ON curated_interactions "
+    "USING GIN ((response_data -> 'phytochemicals_involved'))",
+]
+
+
+def _column_types(cur) -> dict:
+    cur.execute(
+        """SELECT column_name, data_type FROM information_schema.columns
+           WHERE table_name = 'curated_interactions' AND column_name = ANY(%s)""",
+        (list(JSONB_COLUMNS),),
+    )
+    return {r["column_name"]: r["data_type"] for r in cur.fetchall()}
+
+
+def migrate() -> None:
+    with db.get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SET LOCAL statement_timeout = 0")  # pool default is 5s
+        for column, data_type in _column_types(cur).items():
+            if data_type == "jsonb":
+                print(f"{column}: already JSONB")
+                continue
+            cur.execute(
+                f"ALTER TABLE curated_interactions ALTER COLUMN {column} TYPE JSONB "
+                f"USING NULLIF({column}::text, '')::jsonb"
+            )
+            print(f"{column}: {data_type} -> JSONB")
+
+        cur.execute(
+            """UPDATE curated_interactions
+               SET knowledge_graph = COALESCE(knowledge_graph, response_data -> 'knowledge_graph'),
+                   response_data = response_data - 'knowledge_graph'
+               WHERE response_data ? 'knowledge_graph'"""
+        )
+        print(f"knowledge graph moved out of response_data: {cur.rowcount} rows")
+
+    # CONCURRENTLY cannot run inside a transaction block
+    conn = db.get_pool().getconn()
+    try:
+        conn.autocommit = True
+        cur = conn.cursor()
+        cur.execute("SET statement_timeout = 0")
+        for sql in INDEXES:
+            cur.execute(sql)
+            print(sql.split(" ON ")[0].replace("CREATE INDEX CONCURRENTLY IF NOT EXISTS ", "index "))
+        cur.execute("ANALYZE curated_interactions")
+        cur.execute("RESET statement_timeout")
+    finally:
+        conn.autocommit = False
+        db.get_pool().putconn(conn)
+
+
+def _time_ms(cur, sql: str, params: tuple, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def measure(samples: int, repeat: int) -> None:
+    projections = {"select *": "*", **db.CURATED_PROJECTIONS}
+    with db.get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT interaction_key FROM curated_interactions ORDER BY random() LIMIT %s", (samples,))
+        keys = [r["interaction_key"] for r in cur.fetchall()]
+        if not keys:
+            sys.exit("curated_interactions is empty — nothing to measure")
+
+        print(f"\n{len(keys)} sampled rows, {repeat} lookups each\n")
+        print(f"{'projection':<12} {'row bytes':>10} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, columns in projections.items():
+            cur.execute(
+                f"SELECT avg(pg_column_size(p.*))::int AS bytes FROM "
+                f"(SELECT {columns} FROM curated_interactions WHERE interaction_key = ANY(%s)) p",
+                (keys,),
+            )
+            row_bytes = cur.fetchone()["bytes"]
+            sql = f"SELECT {columns} FROM curated_interactions WHERE interaction_key = %s"
+            timings = []
+            for key in keys:
+                timings += _time_ms(cur, sql, (key,), repeat)
+            timings.sort()
+            print(f"{name:<12} {row_bytes:>10} {statistics.median(timings):>8.2f} "
+                  f"{timings[int(0.95 * (len(timings) - 1))]:>8.2f}")
+
+        cur.execute(
+            """SELECT severity, response_data -> 'phytochemicals_involved' -> 0 AS phyto
+               FROM curated_interactions WHERE jsonb_typeof(response_data -> 'phytochemicals_involved') = 'array'
+               AND jsonb_array_length(response_data -> 'phytochemicals_involved') > 0 LIMIT 1"""
+        )
+        probe = cur.fetchone()
+    if not probe:
+        return
+    phyto = probe["phyto"]
+    phyto = phyto.get("name") if isinstance(phyto, dict) else phyto
+    print()
+    for label, kwargs in (("severity", {"severity": probe["severity"]}),
+                          ("phytochemical", {"phytochemical": phyto})):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = db.search_curated(**kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"search_curated {label}={list(kwargs.values())[0]!r}: {len(rows)} rows, "
+              f"p50 {statistics.median(timings):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="curated_interactions JSONB migration + lookup measurement")
+    parser.add_argument("--measure-only", action="store_true", help="skip the migration steps")
+    parser.add_argument("--samples", type=int, default=20, help="rows sampled for the measurement")
+    parser.add_argument("--repeat", type=int, default=10, help="lookups per sampled row")
+    args = parser.parse_args()
+
+    if not args.measure_only:
+        migrate()
+    measure(args.samples, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
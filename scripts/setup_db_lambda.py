@@ -85,6 +85,52 @@ def lambda_handler(event, context):
         )
         """)
 
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS agent_output_cache (
+            agent_key VARCHAR(50) NOT NULL,
+            cache_key VARCHAR(255) NOT NULL,
+            response_text TEXT NOT NULL,
+            source_url TEXT,
+            traces_summary JSONB,
+            cached_at TIMESTAMP DEFAULT NOW(),
+            expires_at TIMESTAMP DEFAULT NOW() + INTERVAL '7 days',
+            PRIMARY KEY (agent_key, cache_key)
+        )
+        """)
+
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS pipeline_checkpoints (
+            interaction_key VARCHAR(255) NOT NULL,
+            session_id VARCHAR(255) NOT NULL,
+            iteration INTEGER NOT NULL,
+            step VARCHAR(64) NOT NULL,
+            prompt_sha CHAR(64) NOT NULL,
+            payload JSONB NOT NULL,
+            created_at TIMESTAMP DEFAULT NOW(),
+            PRIMARY KEY (interaction_key, session_id, step, prompt_sha)
+        )
+        """)
+
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS session_events (
+            session_id VARCHAR(255) NOT NULL,
+            seq INTEGER NOT NULL,
+            event_type VARCHAR(64) NOT NULL,
+            data JSONB NOT NULL,
+            created_at TIMESTAMP DEFAULT NOW(),
+            PRIMARY KEY (session_id, seq)
+        )
+        """)
+
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS search_cache (
+            cache_key CHAR(64) PRIMARY KEY,
+            query TEXT,
+            response JSONB NOT NULL,
+            cached_at TIMESTAMP DEFAULT NOW()
+        )
+        """)
+
         cur.execute("""
         CREATE TABLE IF NOT EXISTS sessions (
             session_id VARCHAR(255) PRIMARY KEY,
@@ -107,8 +153,17 @@ def lambda_handler(event, context):
             "CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at)",
             "CREATE INDEX IF NOT EXISTS idx_curated_ayush ON curated_interactions(ayush_name)",
             "CREATE INDEX IF NOT EXISTS idx_curated_allopathy ON curated_interactions(allopathy_name)",
+            "CREATE INDEX IF NOT EXISTS idx_curated_severity ON curated_interactions(severity)",
+            "CREATE INDEX IF NOT EXISTS idx_curated_response_gin ON curated_interactions "
+            "USING GIN (response_data jsonb_path_ops)",
+            "CREATE INDEX IF NOT EXISTS idx_curated_phytochemicals_gin ON curated_interactions "
+            "USING GIN ((response_data -> 'phytochemicals_involved'))",
             "CREATE INDEX IF NOT EXISTS idx_sources_interaction ON interaction_sources(interaction_key)",
             "CREATE INDEX IF NOT EXISTS idx_allopathy_cache_expires ON allopathy_cache(expires_at)",
+            "CREATE INDEX IF NOT EXISTS idx_agent_output_cache_expires ON agent_output_cache(expires_at)",
+            "CREATE INDEX IF NOT EXISTS idx_search_cache_cached_at ON search_cache(cached_at)",
+            "CREATE INDEX IF NOT EXISTS idx_pipeline_checkpoints_created ON pipeline_checkpoints(created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_session_events_created ON session_events(created_at)",
         ]
         for idx_sql in indexes:
             cur.execute(idx_sql)
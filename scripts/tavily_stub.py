@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Tavily search API.
+
+Answers POST /search with deterministic fake results after a simulated latency
+(log-normal around --median-ms, clipped at --max-ms). Used by the search
+benchmarks so Lambda search code can be timed without network or API credits.
+
+Usage:
+  python scripts/tavily_stub.py --port 8765 --median-ms 600
+  TAVILY_API_URL=http://127.0.0.1:8765/search python ...
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _TavilyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; avoid Nagle / delayed-ACK stalls
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, fmt, *args):  # silence default stderr logging
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        server.request_count += 1
+
+        delay = min(random.lognormvariate(math.log(server.median_ms), server.sigma), server.max_ms)
+        time.sleep(delay / 1000.0)
+
+        query = body.get("query", "")
+        seed = int(hashlib.md5(query.encode()).hexdigest()[:8], 16)
+        results = []
+        for i in range(int(body.get("max_results", 5))):
+            pmid = 30000000 + (seed + i) % 9000000
+            results.append({
+                "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
+                "title": f"Study {pmid}: {query[:60]}",
+                "content": f"Stub abstract for '{query}'. " * 8,
+                "score": round(0.95 - i * 0.07, 3),
+            })
+        payload = json.dumps({"query": query, "answer": "stub answer", "results": results}).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_stub_server(port: int = 0, median_ms: float = 600, sigma: float = 0.35,
+                      max_ms: float = 5000) -> ThreadingHTTPServer:
+    """Start the stub on a background thread; returns the server (use .server_port)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _TavilyHandler)
+    server.daemon_threads = True
+    server.median_ms = median_ms
+    server.sigma = sigma
+    server.max_ms = max_ms
+    server.request_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Tavily API stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--median-ms", type=float, default=600)
+    parser.add_argument("--sigma", type=float, default=0.35)
+    parser.add_argument("--max-ms", type=float, default=5000)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.port, args.median_ms, args.sigma, args.max_ms)
+    print(f"Tavily stub listening on http://127.0.0.1:{server.server_port}/search")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()